@@ -30,9 +30,33 @@ class User(AbstractUser):
         return f"{self.email} ({self.get_user_type_display()})"
 
 
-class CustomerProfile(models.Model):
+class CounterFieldsModel(models.Model):
+    """Base for profiles whose COUNTER_FIELDS are maintained with F() and queryset updates"""
+    
+    COUNTER_FIELDS = ()
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        """Full saves of an existing row leave the counters to their updates"""
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            # A stale in-memory count would undo concurrent increments
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class CustomerProfile(CounterFieldsModel):
     """Profile model for customers who post jobs"""
     
+    COUNTER_FIELDS = ('total_jobs_posted', 'average_rating')
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='customer_profile')
     address = models.TextField(blank=True)
     city = models.CharField(max_length=100, blank=True)
@@ -51,9 +75,11 @@ class CustomerProfile(models.Model):
         return f"Customer: {self.user.email}"
 
 
-class WorkerProfile(models.Model):
+class WorkerProfile(CounterFieldsModel):
     """Profile model for workers who accept jobs"""
     
+    COUNTER_FIELDS = ('total_jobs_completed', 'total_earnings', 'average_rating')
+    
     SKILL_CHOICES = [
         ('cleaning', 'House Cleaning'),
         ('plumbing', 'Plumbing'),
@@ -1,3 +1,46 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from jobs import counters
+
+from .models import CustomerProfile, User, WorkerProfile
+
+
+class ProfileCounterTests(TestCase):
+    """Profile edits never write back stale counters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email='poster@example.com', username='poster', password='pass', user_type='customer'
+        )
+        cls.worker = User.objects.create_user(
+            email='doer@example.com', username='doer', password='pass', user_type='worker'
+        )
+        CustomerProfile.objects.create(user=cls.customer)
+        WorkerProfile.objects.create(user=cls.worker)
+
+    def test_save_keeps_concurrent_increments(self):
+        profile = WorkerProfile.objects.get(user=self.worker)
+        counters.add_jobs_completed({self.worker.pk: 1})
+
+        profile.bio = 'Ten years of plumbing'
+        profile.save()
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.bio, 'Ten years of plumbing')
+        self.assertEqual(profile.total_jobs_completed, 1)
+
+    def test_profile_patch_leaves_counters(self):
+        counters.add_jobs_posted({self.customer.pk: 2})
+        client = APIClient()
+        client.force_authenticate(self.customer)
+
+        response = client.patch('/api/auth/profile/customer/', {'city': 'Pune'}, format='json')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200, response.content)
+        profile = CustomerProfile.objects.get(user=self.customer)
+        self.assertEqual((profile.city, profile.total_jobs_posted), ('Pune', 2))
+        self.assertEqual(profile.average_rating, Decimal('0.00'))
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from jobs.conditional import conditional_get
 from .models import User, CustomerProfile, WorkerProfile
 from .serializers import (
     UserRegistrationSerializer, 
@@ -52,8 +53,21 @@ def login(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _profile_validators(request):
+    """The user row is already loaded; only the profile's timestamp is queried"""
+    user = request.user
+    profile_model = {'customer': CustomerProfile, 'worker': WorkerProfile}.get(user.user_type)
+    profile_updated = None
+    if profile_model is not None:
+        profile_updated = profile_model.objects.filter(user=user).values_list('updated_at', flat=True).first()
+    last_modified = max(filter(None, [user.updated_at, profile_updated]))
+    stamp = profile_updated.timestamp() if profile_updated else 0
+    return f'profile-{user.pk}-{user.updated_at.timestamp()}-{stamp}', last_modified
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(_profile_validators)
 def user_profile(request):
     """Get current user profile"""
     user = request.user
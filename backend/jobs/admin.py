@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db.models import Q
 from .models import Job, JobResponse, Assignment, Transaction, Payment, Earning, Rating, RatingHelpful
+from .search import get_search_backend
 
 
 @admin.register(Job)
@@ -28,6 +30,16 @@ class JobAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index for text fields, icontains only for email"""
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        backend = get_search_backend(queryset.db)
+        ids = backend.matching_ids(search_term)
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(Q(id__in=ids) | Q(customer__email__icontains=search_term)), False
+    
     def budget_display(self, obj):
         return obj.budget_display
     budget_display.short_description = 'Budget'
@@ -0,0 +1,166 @@
+"""
+Platform analytics cube.
+
+DailyStats holds one row per (day, category, city, status), days in local
+time, with these measures:
+
+* ``jobs_count``: jobs posted that day that are now in ``status``,
+* ``payments_count``, ``gmv``, ``platform_fees``: payment transactions
+  made that day for jobs of that category and city. Payments are only
+  recorded for completed jobs, so they are booked under status
+  'completed'; cancelled and failed payments are left out.
+
+A job's city is the last comma-separated part of its location.
+
+Rows change by deltas wherever the underlying rows do: Job.save(),
+create_many() and delete(), the status UPDATEs in assignments.py,
+workflow.py and retention.py, and Transaction.save()/delete(). Settlement
+only moves payments between statuses that count the same, so it leaves
+the cube alone. Archived jobs stay counted. ``rebuild()`` (the
+rebuild_analytics command) recomputes a range of days from the source
+tables and ``query()`` serves the staff analytics endpoints.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+DIMENSIONS = ('day', 'category', 'city', 'status')
+MEASURES = ('jobs_count', 'payments_count', 'gmv', 'platform_fees')
+
+PAYMENT_STATUS = 'completed'
+EXCLUDED_PAYMENT_STATUSES = ('cancelled', 'failed')
+
+
+def city_of(location):
+    """City named by a free-text location: its last comma-separated part"""
+    parts = [part.strip() for part in (location or '').split(',') if part.strip()]
+    return parts[-1].title()[:100] if parts else ''
+
+
+def day_of(moment):
+    return timezone.localtime(moment).date()
+
+
+def job_entry(created_at, category, location, status):
+    """(key, measures) a job adds to the cube"""
+    if created_at is None:
+        return None
+    return (day_of(created_at), category or '', city_of(location), status), {'jobs_count': 1}
+
+
+def payment_entry(created_at, category, location, transaction_type, status, amount, platform_fee):
+    """(key, measures) a transaction adds to the cube, None unless it is a live payment"""
+    if created_at is None or transaction_type != 'payment' or status in EXCLUDED_PAYMENT_STATUSES:
+        return None
+    return (day_of(created_at), category or '', city_of(location), PAYMENT_STATUS), {
+        'payments_count': 1,
+        'gmv': Decimal(amount or 0),
+        'platform_fees': Decimal(platform_fee or 0),
+    }
+
+
+def move_jobs(rows, new_status, using=None):
+    """
+    Book jobs given as (created_at, category, location, status) rows
+    under ``new_status``, for set-based status UPDATEs.
+    """
+    from .models import DailyStats
+
+    DailyStats.apply(
+        [job_entry(*row) for row in rows],
+        [job_entry(*row[:3], new_status) for row in rows],
+        using=using,
+    )
+
+
+def _day_range(start, end):
+    """created_at filter for local days start..end (either may be None)"""
+    condition = Q()
+    if start:
+        condition &= Q(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    if end:
+        condition &= Q(created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+    return condition
+
+
+def aggregate(job_models, transaction_model, start=None, end=None,
+              job_fields=('assignment__job__category', 'assignment__job__location')):
+    """
+    {key: measures} for days start..end computed from the source tables.
+    The models are parameters so migrations can pass historical ones;
+    ``job_fields`` read a payment's job category and location.
+    """
+    totals = {}
+
+    def add(key, measures):
+        bucket = totals.setdefault(key, dict.fromkeys(MEASURES, 0))
+        for field, value in measures.items():
+            bucket[field] += value
+
+    day = TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+    for model in job_models:
+        rows = (
+            model.objects.filter(_day_range(start, end)).order_by()
+            .values_list(day, 'category', 'location', 'status').annotate(count=Count('pk'))
+        )
+        for created_on, category, location, status, count in rows:
+            add((created_on, category, city_of(location), status), {'jobs_count': count})
+
+    payments = (
+        transaction_model.objects.filter(_day_range(start, end), transaction_type='payment')
+        .exclude(status__in=EXCLUDED_PAYMENT_STATUSES).order_by()
+        .values_list(day, *job_fields)
+        .annotate(count=Count('pk'), gmv=Sum('amount'), fees=Sum('platform_fee'))
+    )
+    for created_on, category, location, count, gmv, fees in payments:
+        add((created_on, category or '', city_of(location), PAYMENT_STATUS), {
+            'payments_count': count, 'gmv': gmv or 0, 'platform_fees': fees or 0,
+        })
+    return totals
+
+
+def rebuild(start=None, end=None):
+    """Recompute the cube for days start..end (default: all); returns the rows written"""
+    from .models import ArchivedJob, DailyStats, Job, Transaction
+
+    totals = aggregate(
+        [Job, ArchivedJob], Transaction, start, end,
+        job_fields=(Transaction.job_field('category'), Transaction.job_field('location'))
+    )
+    rows = DailyStats.objects.all()
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    with transaction.atomic():
+        rows.delete()
+        DailyStats.objects.bulk_create(
+            [
+                DailyStats(day=day, category=category, city=city, status=status, **measures)
+                for (day, category, city, status), measures in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
+
+
+def query(start, end, group_by=('day',), category=None, city=None, status=None):
+    """Measures summed over days start..end, grouped by ``group_by`` dimensions"""
+    from .models import DailyStats
+
+    rows = DailyStats.objects.filter(day__gte=start, day__lte=end)
+    if category:
+        rows = rows.filter(category__in=category)
+    if city:
+        rows = rows.filter(city__in=[city_of(name) for name in city])
+    if status:
+        rows = rows.filter(status__in=status)
+    return list(
+        rows.order_by().values(*group_by)
+        .annotate(**{measure: Sum(measure) for measure in MEASURES})
+        .order_by(*group_by)
+    )
@@ -0,0 +1,93 @@
+"""
+Accepting a worker's response.
+
+The job is claimed with a compare-and-set UPDATE (status 'open' ->
+'accepted') in the same transaction that creates the assignment and
+settles every other response. Concurrent accepts for one job serialize on
+that single row: exactly one UPDATE matches, the others match nothing and
+return before writing anything, and the row lock is held only for the
+few statements of the winning transaction.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events, feed_cache
+from .models import Assignment, DailyStats, Job, JobResponse
+
+
+class AcceptError(Exception):
+    """Accepting failed; ``status_code`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def agreed_amount_for(response):
+    """Quote amount, else the job's fixed amount or budget (max, then min)"""
+    job = response.job
+    if response.response_type == 'quote' and response.quote_amount:
+        return response.quote_amount
+    return job.fixed_amount or job.budget_max or job.budget_min
+
+
+def accept_response(response, customer):
+    """
+    Accept ``response`` on behalf of ``customer`` and return the new
+    Assignment. Raises AcceptError when not allowed or when another accept
+    for the same job won the race.
+    """
+    job = response.job
+    if customer.user_type != 'customer' or job.customer_id != customer.id:
+        raise AcceptError("Only job owner can accept responses.", 403)
+    if job.status != 'open':
+        raise AcceptError("Cannot accept response for a closed job.")
+    
+    agreed_amount = agreed_amount_for(response)
+    if not agreed_amount:
+        raise AcceptError(
+            "Cannot determine agreed amount. Job must have a fixed amount or budget range."
+        )
+    
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            claimed = Job.objects.filter(pk=job.pk, status='open').update(
+                status='accepted', pending_responses_count=0,
+                version=F('version') + 1, updated_at=now
+            )
+            if not claimed:
+                raise AcceptError("Job is already assigned.", 409)
+            
+            assignment = Assignment.objects.create(
+                job=job,
+                worker=response.worker,
+                job_response=response,
+                agreed_amount=agreed_amount,
+                status='assigned'
+            )
+            JobResponse.objects.filter(pk=response.pk).update(status='accepted', updated_at=now)
+            
+            others = JobResponse.objects.filter(job_id=job.pk).exclude(pk=response.pk)
+            rejected_worker_ids = list(others.exclude(status='rejected').values_list('worker_id', flat=True))
+            others.update(status='rejected', updated_at=now)
+            
+            # The job left the open feed without going through Job.save()
+            feed_cache.invalidate_job((job.geohash, job.category))
+            DailyStats.apply([job._stats_entry('open')], [job._stats_entry('accepted')])
+            payload = {'job_id': job.pk, 'job_title': job.title}
+            events.publish_many([
+                ('response_accepted', dict(payload, response_id=response.pk, assignment_id=assignment.pk),
+                 [response.worker_id], ''),
+                ('response_rejected', payload, rejected_worker_ids, ''),
+            ])
+    except IntegrityError:
+        # Assignment.job is unique: an assignment already exists for this job
+        raise AcceptError("Job is already assigned.", 409)
+    
+    job.status = 'accepted'
+    job._loaded_stats_entry = job._stats_entry()
+    response.status = response._loaded_status = 'accepted'
+    return assignment
@@ -0,0 +1,62 @@
+"""
+Conditional GET support for read endpoints.
+
+Views provide cheap validators, an ETag built from version counters or a
+small aggregate and optionally a Last-Modified time, computed with one
+indexed query before the view body runs. A request whose If-None-Match /
+If-Modified-Since still matches gets a bare 304 without the payload being
+loaded or serialized; successful responses carry the validators so the
+client can revalidate on its next poll.
+"""
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+
+def conditional_response(request, validators_func, view_func, *args, **kwargs):
+    """
+    Run ``view_func`` unless the client's cached copy is still current.
+    ``validators_func(request, *args, **kwargs)`` returns (etag, last_modified).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return view_func(request, *args, **kwargs)
+
+    etag, last_modified = validators_func(request, *args, **kwargs)
+    etag = quote_etag(etag) if etag else None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = view_func(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    if timestamp is not None and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(timestamp)
+    # Per-user data: browsers may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(validators_func):
+    """Decorator for function views; place it below ``@api_view``"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            return conditional_response(request, validators_func, view_func, *args, **kwargs)
+        return inner
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Generic view mixin answering GET with 304 based on get_validators()"""
+
+    def get_validators(self, request, *args, **kwargs):
+        """Return (etag, last_modified); either may be None"""
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        return conditional_response(request, self.get_validators, super().get, *args, **kwargs)
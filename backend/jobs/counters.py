@@ -0,0 +1,141 @@
+"""
+Profile counters.
+
+CustomerProfile.total_jobs_posted, WorkerProfile.total_jobs_completed and
+WorkerProfile.total_earnings are kept current with F() increments where
+the underlying rows are written: Job.save()/create_many()/delete() for
+posted jobs (archived jobs stay counted), workflow.transition() for
+completed jobs and Earning.save()/delete() for earnings (the sum of
+``final_amount``). Reading a profile therefore never needs an aggregate.
+Every change also moves the profile's ``updated_at``, which the profile
+endpoint's ETag is derived from.
+
+``rebuild()`` recomputes the counters of a chunk of users from the source
+tables; the rebuild_profile_counters command runs it over every profile,
+several chunks in parallel, while the site keeps taking writes.
+"""
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest, Now
+
+from accounts.models import CustomerProfile, WorkerProfile
+
+
+def _increment(model, field, deltas, using=None, floor=None):
+    """Add {user_id: delta} to ``field`` of the users' profiles"""
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        value = F(field) + delta
+        if floor is not None and delta < 0:
+            value = Greatest(value, Value(floor))
+        model.objects.using(using).filter(user_id=user_id).update(**{field: value}, updated_at=Now())
+
+
+def add_jobs_posted(counts, using=None):
+    """{customer_id: number of jobs posted (negative when deleted)}"""
+    _increment(CustomerProfile, 'total_jobs_posted', counts, using, floor=0)
+
+
+def add_jobs_completed(counts, using=None):
+    """{worker_id: number of jobs completed}"""
+    _increment(WorkerProfile, 'total_jobs_completed', counts, using, floor=0)
+
+
+def add_earnings(old_entry, new_entry, using=None):
+    """Move an earning's final amount from ``old_entry`` to ``new_entry`` (Earning._rollup_entry())"""
+    deltas = defaultdict(Decimal)
+    for entry, sign in ((old_entry, -1), (new_entry, 1)):
+        if entry is not None:
+            worker_id, _, amounts = entry
+            deltas[worker_id] += sign * amounts['final_amount']
+    _increment(WorkerProfile, 'total_earnings', deltas, using)
+
+
+def _set(model, field, values, user_ids, output_field):
+    """Set ``field`` to {user_id: value} (0 for the rest of ``user_ids``) in one UPDATE"""
+    model.objects.filter(user_id__in=user_ids).update(updated_at=Now(), **{field: Case(
+        *[When(user_id=user_id, then=Value(value)) for user_id, value in values.items()],
+        default=Value(0),
+        output_field=output_field,
+    )})
+
+
+def rebuild(customer_ids=(), worker_ids=()):
+    """Recompute the counters of the given customers and workers"""
+    from .models import ArchivedAssignment, ArchivedJob, Assignment, Earning, Job
+
+    customer_ids, worker_ids = list(customer_ids), list(worker_ids)
+    with transaction.atomic():
+        # Lock the profiles before reading the source tables, so an F()
+        # increment cannot land between the read and the write and be
+        # overwritten. An UPDATE rather than select_for_update(): it also
+        # takes SQLite's write lock up front, where a transaction that has
+        # only read cannot start writing while another thread writes.
+        if customer_ids:
+            CustomerProfile.objects.filter(user_id__in=customer_ids).update(updated_at=Now())
+        if worker_ids:
+            WorkerProfile.objects.filter(user_id__in=worker_ids).update(updated_at=Now())
+
+        posted = Counter()
+        for model in (Job, ArchivedJob):
+            posted.update(dict(
+                model.objects.filter(customer_id__in=customer_ids).order_by()
+                .values_list('customer_id').annotate(count=Count('pk'))
+            ))
+        completed = Counter()
+        for model in (Assignment, ArchivedAssignment):
+            completed.update(dict(
+                model.objects.filter(worker_id__in=worker_ids, status='completed').order_by()
+                .values_list('worker_id').annotate(count=Count('pk'))
+            ))
+        earned = dict(
+            Earning.objects.filter(worker_id__in=worker_ids).order_by()
+            .values_list('worker_id').annotate(total=Sum('final_amount'))
+        )
+
+        if customer_ids:
+            _set(CustomerProfile, 'total_jobs_posted', posted, customer_ids, IntegerField())
+        if worker_ids:
+            _set(WorkerProfile, 'total_jobs_completed', completed, worker_ids, IntegerField())
+            _set(
+                WorkerProfile, 'total_earnings', earned, worker_ids,
+                DecimalField(max_digits=10, decimal_places=2)
+            )
+    return len(customer_ids) + len(worker_ids)
+
+
+def _chunks(model, chunk_size):
+    """User ids of ``model`` profiles, ``chunk_size`` at a time"""
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            model.objects.filter(user_id__gt=last_user_id).order_by('user_id')
+            .values_list('user_id', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+
+def _rebuild_in_thread(customer_ids, worker_ids):
+    try:
+        return rebuild(customer_ids, worker_ids)
+    finally:
+        # Threads get their own connections, which Django does not close for them
+        connections.close_all()
+
+
+def rebuild_all(chunk_size=1000, workers=4):
+    """rebuild() every profile, ``workers`` chunks at a time; returns the profile count"""
+    chunks = [(ids, ()) for ids in _chunks(CustomerProfile, chunk_size)]
+    chunks += [((), ids) for ids in _chunks(WorkerProfile, chunk_size)]
+    if workers <= 1:
+        return sum(rebuild(*chunk) for chunk in chunks)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda chunk: _rebuild_in_thread(*chunk), chunks))
@@ -0,0 +1,95 @@
+"""
+Worker earnings summary.
+
+Totals come from EarningRollup, one row per worker and month, which
+Earning.save()/delete() keep up to date, and the pending amount is the
+worker's ledger balance (snapshot plus recent entries) and the completed
+job count is the WorkerProfile counter (see jobs/counters.py). A summary's cost
+therefore does not grow with the length of the worker's history.
+``rebuild_rollups()`` recomputes the rows from Earning (see the
+rebuild_earning_rollups command).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import WorkerProfile
+
+from . import ledger
+from .models import Earning, EarningRollup, Transaction
+
+ZERO = Decimal('0.00')
+
+
+def recent_months(count, today=None):
+    """First days of the last ``count`` months, oldest first, ending with this one"""
+    today = today or timezone.localdate()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(today.replace(year=year, month=month, day=1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def earnings_summary_for(worker, months=12):
+    """Data for EarningsSummarySerializer"""
+    rollups = list(EarningRollup.objects.filter(worker=worker).values(
+        'month', 'gross_amount', 'final_amount', 'rating_total', 'rating_count'
+    ))
+    by_month = {row['month']: row for row in rollups}
+    this_month = by_month.get(recent_months(1)[0], {})
+
+    rating_count = sum(row['rating_count'] for row in rollups)
+    rating_total = sum((row['rating_total'] for row in rollups), ZERO)
+
+    return {
+        'total_earnings': sum((row['final_amount'] for row in rollups), ZERO),
+        'gross_total_earnings': sum((row['gross_amount'] for row in rollups), ZERO),
+        'this_month_earnings': this_month.get('final_amount', ZERO),
+        'this_month_gross_earnings': this_month.get('gross_amount', ZERO),
+        'pending_amount': ledger.balance(ledger.WORKER_PENDING, worker.id),
+        'completed_jobs': WorkerProfile.objects.filter(user=worker).values_list(
+            'total_jobs_completed', flat=True
+        ).first() or 0,
+        'average_rating': rating_total / rating_count if rating_count else ZERO,
+        'recent_transactions': Transaction.objects.filter(worker=worker).select_related(
+            'assignment__job', 'worker', 'customer'
+        ).order_by('-created_at')[:10],
+        'monthly_earnings': [
+            {
+                'month': month.strftime('%Y-%m'),
+                'month_name': month.strftime('%B %Y'),
+                'amount': float(by_month.get(month, {}).get('final_amount', ZERO)),
+            }
+            for month in recent_months(months)
+        ],
+    }
+
+
+def rebuild_rollups(worker_ids=None):
+    """Recompute rollup rows from Earning; returns the number of rows written"""
+    earnings = Earning.objects.all()
+    rollups = EarningRollup.objects.all()
+    if worker_ids is not None:
+        earnings = earnings.filter(worker_id__in=worker_ids)
+        rollups = rollups.filter(worker_id__in=worker_ids)
+
+    totals = {}
+    for earning in earnings.iterator(chunk_size=2000):
+        worker_id, month, amounts = earning._rollup_entry()
+        bucket = totals.setdefault((worker_id, month), dict.fromkeys(EarningRollup.SUM_FIELDS, 0))
+        for field, value in amounts.items():
+            bucket[field] += value
+
+    with transaction.atomic():
+        rollups.delete()
+        EarningRollup.objects.bulk_create(
+            [
+                EarningRollup(worker_id=worker_id, month=month, **bucket)
+                for (worker_id, month), bucket in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -0,0 +1,182 @@
+"""
+Push channel for job and response updates.
+
+Write paths call ``publish()``, which stores JobEvent rows in the current
+transaction: one per recipient, or a single row for a broadcast topic
+such as ``category:plumbing``. Clients hold a Server-Sent Events stream
+open (``/api/events/stream/``, served by the ASGI application) that
+reads new rows by id. Browsers open it with a short-lived ``?ticket=``
+from ``/api/events/ticket/``, so access tokens never appear in URLs. Streams in the same process are woken as soon as
+the write commits; streams in other processes pick events up on their
+next poll of the indexed (recipient, id) / (topic, id) ranges.
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import Q
+
+from .models import JobEvent
+
+# asyncio.Event per open stream in this process, with the loop it runs on
+_waiters = set()
+_waiters_lock = threading.Lock()
+
+TICKET_SALT = 'jobs.events.stream'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def category_topic(category):
+    return f'category:{category}'
+
+
+def publish(event_type, payload, recipients=(), topic=''):
+    """Record an event for each recipient and/or a broadcast topic"""
+    publish_many([(event_type, payload, recipients, topic)])
+
+
+def publish_many(entries):
+    """publish() for several (event_type, payload, recipients, topic) entries at once"""
+    rows = []
+    for event_type, payload, recipients, topic in entries:
+        rows += [
+            JobEvent(recipient_id=recipient_id, event_type=event_type, payload=payload)
+            for recipient_id in set(recipients) if recipient_id is not None
+        ]
+        if topic:
+            rows.append(JobEvent(topic=topic, event_type=event_type, payload=payload))
+    if not rows:
+        return
+    JobEvent.objects.bulk_create(rows)
+    transaction.on_commit(_wake_streams)
+
+
+def _wake_streams():
+    with _waiters_lock:
+        waiters = list(_waiters)
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+
+def issue_ticket(user):
+    """Signed ticket that opens an event stream for ``user`` and nothing else"""
+    return signing.dumps(user.pk, salt=TICKET_SALT)
+
+
+def _ticket_user(ticket):
+    from django.contrib.auth import get_user_model
+
+    try:
+        user_id = signing.loads(
+            ticket, salt=TICKET_SALT, max_age=_setting('JOB_EVENTS_TICKET_SECONDS', 30)
+        )
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def authenticate(request):
+    """
+    Resolve the user for a stream request from the usual Bearer header or,
+    since EventSource cannot set headers, a ``?ticket=`` from issue_ticket().
+    """
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header is None:
+        ticket = request.GET.get('ticket')
+        return _ticket_user(ticket) if ticket else None
+    raw_token = auth.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+def stream_topics(user):
+    """Broadcast topics a user follows: workers follow their skill categories"""
+    if user.user_type != 'worker':
+        return []
+    from accounts.models import WorkerProfile
+
+    skills = WorkerProfile.objects.filter(user=user).values_list('skills', flat=True).first()
+    return [category_topic(skill) for skill in skills or []]
+
+
+def latest_event_id():
+    return JobEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def fetch_events(user_id, topics, after_id, limit=100):
+    """Events for a user (direct or via topics) newer than ``after_id``"""
+    condition = Q(recipient_id=user_id)
+    if topics:
+        condition |= Q(recipient__isnull=True, topic__in=topics)
+    return list(
+        JobEvent.objects.filter(condition, id__gt=after_id)
+        .order_by('id')
+        .values('id', 'event_type', 'payload', 'created_at')[:limit]
+    )
+
+
+def format_event(event):
+    data = dict(event['payload'], created_at=event['created_at'].isoformat())
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event_type']}\n"
+        f"data: {json.dumps(data, default=str)}\n\n"
+    )
+
+
+async def stream_events(user_id, topics, after_id):
+    """
+    Async generator of SSE frames. Ends after JOB_EVENTS_STREAM_SECONDS so
+    connections are recycled; EventSource reconnects with Last-Event-ID.
+    """
+    poll_seconds = _setting('JOB_EVENTS_POLL_SECONDS', 2)
+    heartbeat_seconds = _setting('JOB_EVENTS_HEARTBEAT_SECONDS', 15)
+    lifetime = _setting('JOB_EVENTS_STREAM_SECONDS', 300)
+
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    waiter = (loop, wakeup)
+    with _waiters_lock:
+        _waiters.add(waiter)
+
+    fetch = sync_to_async(fetch_events)
+    deadline = loop.time() + lifetime
+    last_sent = loop.time()
+    try:
+        yield f"retry: {int(poll_seconds * 1000)}\n\n"
+        while loop.time() < deadline:
+            wakeup.clear()
+            events = await fetch(user_id, topics, after_id)
+            for event in events:
+                after_id = event['id']
+                yield format_event(event)
+            if events:
+                last_sent = loop.time()
+                continue
+
+            if loop.time() - last_sent >= heartbeat_seconds:
+                yield ": keep-alive\n\n"
+                last_sent = loop.time()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        with _waiters_lock:
+            _waiters.discard(waiter)
@@ -0,0 +1,155 @@
+"""
+Streaming CSV / JSON Lines exports of transactions and earnings.
+
+Rows are read as ``values_list()`` projections with
+``.iterator(chunk_size=EXPORT_CHUNK_SIZE)`` (a server-side cursor on
+PostgreSQL) and encoded a chunk at a time, so an export of any size is
+produced in constant memory. The views wrap ``stream_export()`` in a
+StreamingHttpResponse; the export_records command writes it to a file.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Earning, Transaction
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# (column name, values() lookup or expression)
+TRANSACTION_COLUMNS = [
+    ('transaction_id', 'transaction_id'),
+    ('created_at', 'created_at'),
+    ('transaction_type', 'transaction_type'),
+    ('status', 'status'),
+    ('amount', 'amount'),
+    ('platform_fee', 'platform_fee'),
+    ('net_amount', 'net_amount'),
+    ('worker_id', 'worker_id'),
+    ('worker_email', 'worker__email'),
+    ('customer_id', 'customer_id'),
+    ('customer_email', 'customer__email'),
+    ('job_id', Transaction.job_field('id')),
+    ('job_title', Transaction.job_field('title')),
+    ('payment_method', 'payment_method'),
+    ('payout_id', 'payout_id'),
+    ('processed_at', 'processed_at'),
+]
+
+EARNING_COLUMNS = [
+    ('id', 'id'),
+    ('earned_at', 'earned_at'),
+    ('worker_id', 'worker_id'),
+    ('worker_email', 'worker__email'),
+    ('transaction_id', 'transaction__transaction_id'),
+    ('gross_amount', 'gross_amount'),
+    ('platform_fee', 'platform_fee'),
+    ('net_amount', 'net_amount'),
+    ('tax_deducted', 'tax_deducted'),
+    ('bonus_amount', 'bonus_amount'),
+    ('final_amount', 'final_amount'),
+    ('job_category', 'job_category'),
+    ('job_duration_hours', 'job_duration_hours'),
+    ('customer_rating', 'customer_rating'),
+]
+
+EXPORTS = {
+    'transactions': (Transaction, TRANSACTION_COLUMNS, 'created_at'),
+    'earnings': (Earning, EARNING_COLUMNS, 'earned_at'),
+}
+
+
+def _bound_filter(date_field, value, end=False):
+    """Filter for a start or end bound given as a date (whole day) or a datetime"""
+    day = parse_date(value)
+    if day is not None:
+        # A bare end date includes the whole day
+        if end:
+            return {f'{date_field}__lt': timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))}
+        return {f'{date_field}__gte': timezone.make_aware(datetime.combine(day, time.min))}
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return {f'{date_field}__{"lte" if end else "gte"}': moment}
+
+
+def export_queryset(kind, user=None, start=None, end=None):
+    """
+    Rows of ``kind`` visible to ``user`` (everything for staff or when
+    ``user`` is None, as in the management command) within [start, end].
+    """
+    model, _, date_field = EXPORTS[kind]
+    queryset = model.objects.all()
+    if user is not None and not user.is_staff:
+        if user.user_type == 'worker':
+            queryset = queryset.filter(worker=user)
+        elif user.user_type == 'customer' and kind == 'transactions':
+            queryset = queryset.filter(customer=user)
+        else:
+            queryset = queryset.none()
+    if start:
+        queryset = queryset.filter(**_bound_filter(date_field, start))
+    if end:
+        queryset = queryset.filter(**_bound_filter(date_field, end, end=True))
+    return queryset
+
+
+class _Echo:
+    """File-like object whose write() returns the line for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+# Leading characters that make spreadsheet apps read a CSV cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _format_value(value, file_format='jsonl'):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if file_format == 'csv' and isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Quote user-entered text such as job titles so it stays text
+        return "'" + value
+    return value
+
+
+def stream_export(kind, queryset, file_format='csv'):
+    """Iterator of text chunks encoding ``queryset`` as CSV or JSON Lines"""
+    _, columns, _ = EXPORTS[kind]
+    names = [name for name, _ in columns]
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    rows = queryset.order_by('pk').values_list(
+        *[lookup for _, lookup in columns]
+    ).iterator(chunk_size=chunk_size)
+
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names)
+
+        def encode(row):
+            return writer.writerow([_format_value(value, 'csv') for value in row])
+    else:
+        def encode(row):
+            return json.dumps(dict(zip(names, map(_format_value, row))), default=str) + '\n'
+
+    buffer = []
+    for row in rows:
+        buffer.append(encode(row))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_filename(kind, file_format):
+    return f"{kind}-{timezone.localdate():%Y%m%d}.{file_format}"
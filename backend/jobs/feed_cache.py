@@ -0,0 +1,179 @@
+"""
+Shared cache for the worker open-jobs feed.
+
+Open jobs are partitioned into geohash cells at a few precisions
+(JOB_FEED_CELL_PRECISIONS; 5, 4 and 3 characters are roughly 5km, 40km
+and 150km across). For every (cell, category) pair the cache holds the
+cell's open jobs, newest first, as ready-to-send summaries plus their
+coordinates. A radius request reads the few cells covering its bounding
+box at the finest precision that needs no more than
+JOB_FEED_CACHE_MAX_CELLS of them, drops the jobs the worker already
+responded to, applies the haversine check and sorts by distance, so every
+worker in a neighbourhood shares the same cached rows.
+
+Entries are versioned: writes bump the version of the affected
+(cell, category) and (cell, all-categories) keys after the transaction
+commits, which both invalidates them and stops a slow reader from
+re-populating the cache with rows it read before the write. Version
+bumps only reach other processes through a shared cache, so
+JOB_FEED_CACHE_ENABLED is off by default unless REDIS_URL is set.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .geo import boxes_at_precision, bounding_boxes, geohash_prefix_q, haversine_km
+
+ALL_CATEGORIES = '*'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_enabled():
+    return _setting('JOB_FEED_CACHE_ENABLED', False)
+
+
+def cell_precisions():
+    return sorted(_setting('JOB_FEED_CELL_PRECISIONS', (5, 4, 3)), reverse=True)
+
+
+def cells_for(geohash):
+    """Every feed cell containing a job with this geohash"""
+    if not geohash:
+        # Jobs without coordinates never match a radius search
+        return []
+    return [geohash[:precision] for precision in cell_precisions()]
+
+
+def _version_key(cell, category):
+    return f'jobs:feed:v:{cell}:{category}'
+
+
+def _data_key(cell, category, version):
+    return f'jobs:feed:{cell}:{category}:{version}'
+
+
+def _get_versions(pairs):
+    keys = {_version_key(cell, category): (cell, category) for cell, category in pairs}
+    found = cache.get_many(list(keys))
+    # Seed fresh versions from the clock so an evicted version key can never
+    # point back at data cached under an older version
+    seed = time.time_ns()
+    missing = {key: seed for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_cells(feed_keys):
+    """Bump the versions of the given (cell, category) feeds"""
+    for cell, category in feed_keys:
+        for key in {_version_key(cell, category), _version_key(cell, ALL_CATEGORIES)}:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Never read yet, nothing cached under it
+                pass
+
+
+def invalidate_job(*entries):
+    """
+    Invalidate the feeds a job was and is listed in, once the write commits.
+    Each entry is a (geohash, category) pair.
+    """
+    feed_keys = {
+        (cell, category)
+        for geohash, category in entries
+        for cell in cells_for(geohash)
+    }
+    if feed_keys:
+        transaction.on_commit(lambda: invalidate_cells(feed_keys))
+
+
+def _build_cell(cell, category):
+    """Read one cell's open jobs from the database as cache entries"""
+    from .models import Job
+    from .serializers import WorkerJobListSerializer
+
+    limit = _setting('JOB_FEED_CACHE_MAX_JOBS', 500)
+    queryset = Job.objects.filter(status='open').filter(geohash_prefix_q([cell]))
+    if category != ALL_CATEGORIES:
+        queryset = queryset.filter(category=category)
+    jobs = list(queryset.select_related('customer').order_by('-created_at', '-id')[:limit + 1])
+
+    complete = len(jobs) <= limit
+    jobs = jobs[:limit]
+    summaries = WorkerJobListSerializer(jobs, many=True).data
+    entries = [
+        (dict(summary), float(job.latitude), float(job.longitude), job.created_at.timestamp())
+        for job, summary in zip(jobs, summaries)
+    ]
+    return {'complete': complete, 'entries': entries}
+
+
+def get_radius_feed(worker, lat, lng, radius_km, category=None):
+    """
+    Return the worker's radius feed as a list of serialized jobs, nearest
+    first, or None when the request cannot be answered from the cache.
+    """
+    if not is_enabled():
+        return None
+
+    from . import responded
+
+    category = category or ALL_CATEGORIES
+    boxes = bounding_boxes(lat, lng, radius_km)
+    max_cells = _setting('JOB_FEED_CACHE_MAX_CELLS', 9)
+    for precision in cell_precisions():
+        cells = boxes_at_precision(boxes, precision, max_cells)
+        if cells is not None:
+            break
+    else:
+        return None
+
+    versions = _get_versions([(cell, category) for cell in cells])
+    data_keys = {_data_key(cell, category, versions[(cell, category)]): cell for cell in cells}
+    cached = cache.get_many(list(data_keys))
+
+    timeout = _setting('JOB_FEED_CACHE_TIMEOUT', 300)
+    for key, cell in data_keys.items():
+        if key not in cached:
+            cached[key] = _build_cell(cell, category)
+            cache.set(key, cached[key], timeout)
+
+    if not all(feed['complete'] for feed in cached.values()):
+        # A cell holds more open jobs than we cache; let the database answer
+        return None
+
+    responded_ids = responded.get_responded_ids(worker.id) if responded.is_enabled() else None
+
+    results = []
+    for feed in cached.values():
+        for summary, job_lat, job_lng, created_ts in feed['entries']:
+            job_id = summary['id']
+            if responded_ids is not None and job_id in responded_ids:
+                continue
+            distance = haversine_km(lat, lng, job_lat, job_lng)
+            if distance <= radius_km:
+                results.append((distance, -created_ts, summary))
+
+    if responded_ids is None and results:
+        from .models import JobResponse
+
+        seen = set(
+            JobResponse.objects.filter(
+                worker=worker, job_id__in=[summary['id'] for _, _, summary in results]
+            ).values_list('job_id', flat=True)
+        )
+        results = [row for row in results if row[2]['id'] not in seen]
+
+    results.sort(key=lambda row: (row[0], row[1]))
+    return [
+        dict(summary, distance=f"{distance:.1f} km", has_responded=False)
+        for distance, _, summary in results
+    ]
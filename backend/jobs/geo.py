@@ -0,0 +1,205 @@
+"""
+Geospatial helpers for the job feed.
+
+Jobs are indexed by a geohash of their coordinates. A radius search is
+turned into bounding boxes, the boxes into a handful of geohash
+cells (each one an index prefix scan), and the surviving rows are then
+checked and ranked with the haversine distance.
+"""
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Precision stored on Job.geohash (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+
+# Upper bound on the number of cells a single radius query expands to
+MAX_QUERY_CELLS = 16
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Coordinates are stored with 6 decimal places; pad the box so rounding
+# never drops a row that the haversine check would keep
+_COORD_SLACK = 1e-6
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return (height, width) in degrees of a geohash cell at this precision"""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_boxes(latitude, longitude, radius_km):
+    """
+    Return the (min_lat, min_lng, max_lat, max_lng) boxes that together
+    enclose the circle: one box, or two when the circle crosses the
+    antimeridian. A circle that reaches a pole spans every longitude.
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angle)
+    max_lat = latitude + math.degrees(angle)
+    cos_lat = math.cos(math.radians(latitude))
+    if min_lat <= -90.0 or max_lat >= 90.0 or math.sin(angle) >= cos_lat:
+        return [(max(-90.0, min_lat), -180.0, min(90.0, max_lat), 180.0)]
+
+    # Widest longitude offset of the circle, reached north of its centre
+    # in the northern hemisphere (and south in the southern one)
+    lng_delta = math.degrees(math.asin(math.sin(angle) / cos_lat))
+    min_lng = longitude - lng_delta
+    max_lng = longitude + lng_delta
+    if min_lng < -180.0:
+        return [(min_lat, min_lng + 360.0, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+    if max_lng > 180.0:
+        return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng - 360.0)]
+    return [(min_lat, min_lng, max_lat, max_lng)]
+
+
+def covering_cells(boxes, max_cells=MAX_QUERY_CELLS):
+    """
+    Return the geohash prefixes covering the bounding boxes, at the
+    finest precision that needs no more than ``max_cells`` cells per box.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cells = boxes_at_precision(boxes, precision, max_cells)
+        if cells is not None:
+            return cells
+    return []
+
+
+def boxes_at_precision(boxes, precision, max_cells=MAX_QUERY_CELLS):
+    """cells_at_precision() for several boxes; None when any box takes more than ``max_cells``"""
+    cells = set()
+    for box in boxes:
+        box_cells = cells_at_precision(*box, precision=precision, max_cells=max_cells)
+        if box_cells is None:
+            return None
+        cells.update(box_cells)
+    return sorted(cells)
+
+
+def cells_at_precision(min_lat, min_lng, max_lat, max_lng, precision, max_cells=MAX_QUERY_CELLS):
+    """
+    Return the geohash cells of one precision covering a bounding box,
+    or None when that would take more than ``max_cells`` cells.
+    """
+    height, width = cell_size(precision)
+    rows = int(max_lat // height) - int(min_lat // height) + 1
+    cols = int(max_lng // width) - int(min_lng // width) + 1
+    if rows * cols > max_cells:
+        return None
+
+    cells = set()
+    lat = min_lat
+    for _ in range(rows):
+        lng = min_lng
+        for _ in range(cols):
+            cells.add(encode_geohash(min(lat, max_lat), min(lng, max_lng), precision))
+            lng += width
+        lat += height
+    return sorted(cells)
+
+
+def geohash_prefix_q(cells, field='geohash'):
+    """
+    Build an OR of prefix conditions, one per geohash cell. LIKE 'cell%'
+    does not depend on the column collation; on PostgreSQL it is served by
+    the pattern_ops index on Job.geohash.
+    """
+    condition = Q()
+    for cell in cells:
+        condition |= Q(**{f'{field}__startswith': cell})
+    return condition
+
+
+def haversine_expression(latitude, longitude, lat_field='latitude', lng_field='longitude'):
+    """
+    Database expression computing the distance in kilometres from a fixed
+    origin to each row. Works on PostgreSQL and on SQLite, where Django
+    registers the math functions itself.
+    """
+    origin_lat = math.radians(float(latitude))
+    origin_lng = math.radians(float(longitude))
+    row_lat = Radians(Cast(F(lat_field), FloatField()))
+    row_lng = Radians(Cast(F(lng_field), FloatField()))
+
+    a = (
+        Power(Sin((row_lat - origin_lat) / 2.0), 2)
+        + math.cos(origin_lat) * Cos(row_lat) * Power(Sin((row_lng - origin_lng) / 2.0), 2)
+    )
+    return 2.0 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Restrict a Job queryset to rows within ``radius_km`` of the origin.
+    Geohash cells and the bounding box prune candidates through indexes
+    before the haversine check runs on what is left.
+    """
+    boxes = bounding_boxes(latitude, longitude, radius_km)
+    cells = covering_cells(boxes)
+    if cells:
+        queryset = queryset.filter(geohash_prefix_q(cells))
+    in_boxes = Q()
+    for min_lat, min_lng, max_lat, max_lng in boxes:
+        in_boxes |= Q(
+            latitude__range=(min_lat - _COORD_SLACK, max_lat + _COORD_SLACK),
+            longitude__range=(min_lng - _COORD_SLACK, max_lng + _COORD_SLACK),
+        )
+    queryset = queryset.filter(in_boxes)
+    return queryset.annotate(
+        distance_km=haversine_expression(latitude, longitude)
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,208 @@
+"""
+Append-only double-entry ledger.
+
+Money movements are recorded as LedgerEntry rows grouped into postings;
+the entries of a posting always sum to zero. Accounts are an account
+kind plus a user (no user for the platform's fee account):
+
+* ``customer``: what a customer has been charged (negative balance),
+* ``worker_pending``: earned by a worker and not paid out yet,
+* ``worker_paid``: paid out to a worker,
+* ``platform_fee``: fees kept by the platform.
+
+Transaction.save() posts the difference between what the stored row
+and the new row contribute (``transaction_lines()``), so creating,
+settling, cancelling or correcting a transaction never rewrites earlier
+entries. Set-based writes that bypass save() post through ``post()``.
+
+``take_snapshots()`` (the snapshot_ledger command) checkpoints every
+account that moved since the previous snapshot, and ``balances()`` reads
+the latest snapshot at or before the requested time plus the entries
+after it, so a balance costs two indexed queries whatever the history.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, When
+from django.utils import timezone
+
+from .ids import new_id
+
+CUSTOMER = 'customer'
+WORKER_PENDING = 'worker_pending'
+WORKER_PAID = 'worker_paid'
+PLATFORM_FEE = 'platform_fee'
+
+# Accounts each kind of user holds
+USER_ACCOUNTS = {
+    'worker': [WORKER_PENDING, WORKER_PAID],
+    'customer': [CUSTOMER],
+}
+
+# Transaction types that take money from the worker rather than pay them
+WORKER_DEBIT_TYPES = ('refund', 'penalty', 'platform_fee')
+
+ZERO = Decimal('0.00')
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class UnbalancedPosting(ValueError):
+    pass
+
+
+def transaction_lines(transaction_type, status, amount, platform_fee, net_amount, worker_id, customer_id):
+    """
+    {(account, user_id): amount} a transaction with these values
+    contributes to the ledger. Cancelled and failed transactions
+    contribute nothing; completed ones have been paid out to the worker.
+    """
+    if status in ('cancelled', 'failed'):
+        return {}
+    amount = Decimal(amount or 0)
+    platform_fee = Decimal(platform_fee or 0)
+    net_amount = Decimal(net_amount or 0)
+    worker = (WORKER_PAID if status == 'completed' else WORKER_PENDING, worker_id)
+    platform = (PLATFORM_FEE, None)
+    customer = (CUSTOMER, customer_id)
+
+    if transaction_type == 'payment':
+        lines = {customer: -amount, worker: net_amount, platform: platform_fee}
+    elif transaction_type == 'refund':
+        lines = {customer: amount, worker: -amount}
+    elif transaction_type == 'bonus':
+        lines = {platform: -amount, worker: amount}
+    else:  # penalty, platform_fee
+        lines = {worker: -amount, platform: amount}
+    return {key: value for key, value in lines.items() if value}
+
+
+def worker_amount():
+    """Expression for what a Transaction row adds to the worker's account"""
+    return Case(
+        When(transaction_type__in=WORKER_DEBIT_TYPES, then=-F('net_amount')),
+        default=F('net_amount'),
+    )
+
+
+def difference(old_lines, new_lines):
+    """Lines that turn ``old_lines`` into ``new_lines``"""
+    lines = defaultdict(Decimal)
+    for key, value in (new_lines or {}).items():
+        lines[key] += value
+    for key, value in (old_lines or {}).items():
+        lines[key] -= value
+    return {key: value for key, value in lines.items() if value}
+
+
+def post(lines, transaction_id=None, memo='', using=None):
+    """Record one posting of {(account, user_id): amount} lines, which must sum to zero"""
+    return post_many([(lines, transaction_id, memo)], using=using)
+
+
+def post_many(postings, using=None):
+    """post() for several (lines, transaction_id, memo) postings; returns the entry count"""
+    from .models import LedgerEntry
+
+    entries = []
+    for lines, transaction_id, memo in postings:
+        if not lines:
+            continue
+        if sum(lines.values()) != 0:
+            raise UnbalancedPosting(f"Posting does not balance: {lines}")
+        posting_id = new_id()
+        entries += [
+            LedgerEntry(
+                posting_id=posting_id, account=account, user_id=user_id, amount=amount,
+                transaction_id=transaction_id, memo=memo
+            )
+            for (account, user_id), amount in lines.items()
+        ]
+    if entries:
+        LedgerEntry.objects.using(using).bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def _account_q(accounts):
+    condition = Q()
+    for account, user_id in accounts:
+        condition |= Q(account=account, user_id=user_id) if user_id is not None else Q(account=account, user__isnull=True)
+    return condition
+
+
+def _same_account():
+    """Correlates a snapshot subquery with the outer row's account"""
+    # Only the platform account has no user, so NULL users match each other
+    return Q(account=OuterRef('account')) & (Q(user=OuterRef('user')) | Q(user__isnull=True))
+
+
+def balances(accounts, at=None):
+    """
+    {(account, user_id): balance} as of ``at`` (default: now) for the
+    given (account, user_id) pairs.
+    """
+    from .models import LedgerEntry, LedgerSnapshot
+
+    accounts = list(accounts)
+    at = at or timezone.now()
+    snapshots = LedgerSnapshot.objects.filter(_account_q(accounts), as_of__lte=at)
+    latest = snapshots.filter(_same_account()).order_by('-as_of').values('as_of')[:1]
+    found = {
+        (row['account'], row['user_id']): (row['balance'], row['as_of'])
+        for row in snapshots.filter(as_of=Subquery(latest)).values('account', 'user_id', 'balance', 'as_of')
+    }
+
+    tail = Q()
+    for key in accounts:
+        since = found.get(key, (ZERO, EPOCH))[1]
+        tail |= _account_q([key]) & Q(created_at__gt=since)
+    totals = {
+        (row['account'], row['user_id']): row['total']
+        for row in LedgerEntry.objects.filter(tail, created_at__lte=at).order_by()
+        .values('account', 'user_id').annotate(total=Sum('amount'))
+    }
+    return {
+        key: found.get(key, (ZERO, EPOCH))[0] + (totals.get(key) or ZERO)
+        for key in accounts
+    }
+
+
+def balance(account, user_id=None, at=None):
+    return balances([(account, user_id)], at)[(account, user_id)]
+
+
+def snapshot_cutoff():
+    """Entries newer than this may still belong to uncommitted transactions"""
+    lag = getattr(settings, 'LEDGER_SNAPSHOT_LAG_SECONDS', 300)
+    return timezone.now() - timedelta(seconds=lag)
+
+
+def take_snapshots(cutoff=None):
+    """
+    Checkpoint every account with entries since the last snapshot round,
+    up to ``cutoff``. Returns the number of snapshots written.
+    """
+    from .models import LedgerEntry, LedgerSnapshot
+
+    cutoff = cutoff or snapshot_cutoff()
+    with transaction.atomic():
+        previous_round = LedgerSnapshot.objects.order_by('-as_of').values_list('as_of', flat=True).first() or EPOCH
+        if previous_round >= cutoff:
+            return 0
+        previous = LedgerSnapshot.objects.filter(_same_account()).order_by('-as_of').values('balance')[:1]
+        moved = (
+            LedgerEntry.objects.filter(created_at__gt=previous_round, created_at__lte=cutoff)
+            .order_by().values('account', 'user_id')
+            .annotate(total=Sum('amount'), previous=Subquery(previous))
+        )
+        snapshots = [
+            LedgerSnapshot(
+                account=row['account'], user_id=row['user_id'], as_of=cutoff,
+                balance=(row['previous'] or ZERO) + row['total']
+            )
+            for row in moved
+        ]
+        LedgerSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from jobs.retention import archivable_jobs, archive_jobs
+
+
+class Command(BaseCommand):
+    help = "Move terminal jobs without an assignment, and their responses, to the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Archive jobs not updated for this many days (default: JOB_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jobs moved per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many jobs would be archived without moving them',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_jobs(options['days']).count()
+            self.stdout.write(self.style.SUCCESS(f"Would archive {count} jobs"))
+            return
+
+        moved = archive_jobs(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} jobs"))
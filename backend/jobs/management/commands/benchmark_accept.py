@@ -0,0 +1,113 @@
+import statistics
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from jobs.assignments import AcceptError, accept_response
+from jobs.models import Assignment, Job, JobResponse
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure accept_job_response latency with many clients accepting responses "
+        "on the same job at once. Creates throwaway users and jobs in the configured "
+        "database and deletes them afterwards; do not point it at production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=50,
+            help='Concurrent accept requests per job (default: 50)',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Jobs contended for, one after another (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        clients = options['clients']
+        tag = uuid.uuid4().hex[:8]
+        customer = User.objects.create(
+            username=f'bench-{tag}-customer', email=f'bench-{tag}-customer@example.invalid',
+            user_type='customer'
+        )
+        workers = User.objects.bulk_create([
+            User(username=f'bench-{tag}-w{i}', email=f'bench-{tag}-w{i}@example.invalid', user_type='worker')
+            for i in range(clients)
+        ])
+        latencies, outcomes = [], {'accepted': 0, 'conflict': 0, 'error': 0}
+        try:
+            for round_number in range(options['rounds']):
+                round_latencies, round_outcomes = self.run_round(customer, workers, round_number)
+                latencies += round_latencies
+                for outcome, count in round_outcomes.items():
+                    outcomes[outcome] += count
+                if round_outcomes['accepted'] != 1:
+                    self.stderr.write(f"Round {round_number}: {round_outcomes['accepted']} accepts succeeded")
+        finally:
+            User.objects.filter(username__startswith=f'bench-{tag}-').delete()
+
+        latencies.sort()
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{options['rounds']} jobs x {clients} clients on {connection.vendor}: "
+            f"{outcomes['accepted']} accepted, {outcomes['conflict']} conflicts, {outcomes['error']} errors"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"latency ms: p50 {statistics.median(latencies) * 1000:.1f}, "
+            f"p95 {p95 * 1000:.1f}, max {latencies[-1] * 1000:.1f}"
+        ))
+
+    def run_round(self, customer, workers, round_number):
+        job = Job.objects.create(
+            customer=customer, title=f'Benchmark job {round_number}', category='other',
+            description='Accept contention benchmark', location='Benchmark',
+            fixed_amount=Decimal('100.00')
+        )
+        JobResponse.objects.bulk_create([
+            JobResponse(job=job, worker=worker, response_type='accept') for worker in workers
+        ])
+        response_ids = list(JobResponse.objects.filter(job=job).values_list('id', flat=True))
+
+        barrier = threading.Barrier(len(response_ids))
+        latencies, outcomes = [], {'accepted': 0, 'conflict': 0, 'error': 0}
+        lock = threading.Lock()
+
+        def client(response_id):
+            try:
+                response = JobResponse.objects.select_related('job__customer', 'worker').get(pk=response_id)
+                barrier.wait()
+                started = time.perf_counter()
+                try:
+                    accept_response(response, customer)
+                    outcome = 'accepted'
+                except AcceptError:
+                    outcome = 'conflict'
+                except Exception:
+                    outcome = 'error'
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client, args=(response_id,)) for response_id in response_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert Assignment.objects.filter(job=job).count() <= 1
+        return latencies, outcomes
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from jobs.retention import expire_stale_jobs, stale_open_jobs
+
+
+class Command(BaseCommand):
+    help = "Expire open jobs older than JOB_OPEN_TTL_DAYS and reject their pending responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Expire open jobs posted more than this many days ago (default: JOB_OPEN_TTL_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jobs expired per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many jobs would expire without changing them',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = stale_open_jobs(options['days']).count()
+            self.stdout.write(self.style.SUCCESS(f"Would expire {count} jobs"))
+            return
+
+        expired, rejected = expire_stale_jobs(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {expired} jobs, rejected {rejected} pending responses"
+        ))
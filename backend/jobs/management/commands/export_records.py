@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.exports import EXPORTS, FORMATS, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = "Export all transactions or earnings as CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--file-format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--start', help='First date or datetime to include')
+        parser.add_argument('--end', help='Last date or datetime to include')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(options['kind'], start=options['start'], end=options['end'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = stream_export(options['kind'], queryset, options['file_format'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import JobEvent
+
+
+class Command(BaseCommand):
+    help = "Delete pushed job events older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'JOB_EVENTS_RETENTION_DAYS', 7),
+            help='Keep events newer than this many days',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = JobEvent.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} events older than {cutoff:%Y-%m-%d %H:%M}"))
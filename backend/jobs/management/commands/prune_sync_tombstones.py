@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import SyncTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync tombstones older than the retention window"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'JOB_SYNC_TOMBSTONE_RETENTION_DAYS', 30),
+            help='Keep tombstones newer than this many days',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}"))
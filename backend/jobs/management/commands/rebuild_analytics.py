@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from jobs.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the DailyStats analytics rows from jobs and transactions (to repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild, YYYY-MM-DD (default: the beginning)')
+        parser.add_argument('--end', help='Last day to rebuild, YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        days = {}
+        for name in ('start', 'end'):
+            value = options[name]
+            try:
+                days[name] = parse_date(value) if value else None
+            except ValueError:
+                days[name] = None
+            if value and days[name] is None:
+                raise CommandError(f"--{name} must be a date (YYYY-MM-DD)")
+
+        written = rebuild(days['start'], days['end'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} analytics rows"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.earnings import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly EarningRollup rows from Earning (run once after deploying, or to repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker',
+            type=int,
+            action='append',
+            dest='workers',
+            help='Only rebuild this worker id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} monthly rollup rows"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs.counters import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute profile job and earning counters from jobs, assignments and earnings (to repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Profiles recomputed per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Chunks recomputed in parallel, each on its own connection (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_all(options['chunk_size'], options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters of {rebuilt} profiles"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.ratings import rebuild_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute the RatingAggregate rows and profile averages from Rating (to repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='Only rebuild this ratee id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_aggregates(options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rating aggregate rows"))
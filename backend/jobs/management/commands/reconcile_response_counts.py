@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Recompute Job.responses_count / pending_responses_count from JobResponse rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jobs checked per query (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted jobs without fixing them',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        checked = fixed = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                Job.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .annotate(
+                    actual_total=Count('responses'),
+                    actual_pending=Count('responses', filter=Q(responses__status='pending')),
+                )
+                .only('id', *Job.COUNTER_FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            checked += len(batch)
+
+            drifted = []
+            for job in batch:
+                if (job.responses_count, job.pending_responses_count) != (job.actual_total, job.actual_pending):
+                    job.responses_count = job.actual_total
+                    job.pending_responses_count = job.actual_pending
+                    drifted.append(job)
+
+            if drifted and not dry_run:
+                Job.objects.bulk_update(drifted, Job.COUNTER_FIELDS)
+            fixed += len(drifted)
+
+        verb = 'would fix' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} jobs, {verb} {fixed}"))
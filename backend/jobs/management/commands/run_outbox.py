@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from jobs import outbox
+
+
+class Command(BaseCommand):
+    help = "Run queued side effects (payments, rating averages) from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Tasks claimed per batch')
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run one batch and exit instead of polling',
+        )
+        parser.add_argument(
+            '--stop-after',
+            type=float,
+            default=None,
+            help='Exit after this many seconds (useful under a process supervisor)',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            ran, succeeded = outbox.run_batch(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} tasks, {succeeded} succeeded"))
+            return
+
+        self.stdout.write("Running outbox worker, Ctrl+C to stop")
+        try:
+            outbox.run_worker(
+                batch_size=options['batch_size'],
+                stop_after=options['stop_after'],
+                stdout=self.stdout,
+            )
+        except KeyboardInterrupt:
+            pass
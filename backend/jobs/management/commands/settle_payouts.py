@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from jobs.settlement import settle_pending
+
+
+class Command(BaseCommand):
+    help = "Pay workers for their pending transactions, one payout per worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Workers settled per batch (default: PAYOUT_BATCH_WORKERS)',
+        )
+
+    def handle(self, *args, **options):
+        completed, failed, settled = settle_pending(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Completed {completed} payouts settling {settled} transactions, {failed} payouts failed"
+        ))
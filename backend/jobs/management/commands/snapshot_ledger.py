@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from jobs.ledger import snapshot_cutoff, take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Checkpoint ledger balances so balance lookups only scan recent entries"
+
+    def handle(self, *args, **options):
+        cutoff = snapshot_cutoff()
+        written = take_snapshots(cutoff)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} balance snapshots as of {cutoff:%Y-%m-%d %H:%M:%S}"))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+from jobs.geo import encode_geohash
+
+
+def populate_geohash(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    jobs = Job.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for job in jobs.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        job.geohash = encode_geohash(job.latitude, job.longitude)
+        batch.append(job)
+        if len(batch) >= 2000:
+            Job.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0003_rating_ratinghelpful_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Geohash of latitude/longitude, maintained on save for radius search",
+                max_length=12,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="category",
+            field=models.CharField(
+                choices=[
+                    ("cleaning", "House Cleaning"),
+                    ("plumbing", "Plumbing"),
+                    ("electrical", "Electrical Work"),
+                    ("carpentry", "Carpentry"),
+                    ("repair", "Repair & Maintenance"),
+                    ("painting", "Painting"),
+                    ("gardening", "Gardening"),
+                    ("cooking", "Cooking"),
+                    ("babysitting", "Babysitting"),
+                    ("elderly_care", "Elderly Care"),
+                    ("pet_care", "Pet Care"),
+                    ("laundry", "Laundry"),
+                    ("tutoring", "Tutoring"),
+                    ("delivery", "Delivery"),
+                    ("moving", "Moving/Packing"),
+                    ("other", "Other"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "geohash"], name="jobs_job_status_41e28b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0004_job_geohash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobresponse",
+            index=models.Index(
+                fields=["worker", "job"], name="jobs_jobres_worker__eb5adb_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:40
+
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE TABLE jobs_job_search (
+        job_id bigint PRIMARY KEY
+            REFERENCES jobs_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX jobs_job_search_document_gin ON jobs_job_search USING gin (document)",
+    """
+    INSERT INTO jobs_job_search (job_id, document)
+    SELECT id,
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(requirements, '')), 'D')
+    FROM jobs_job
+    """,
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE jobs_job_fts USING fts5(
+        title, location, description, requirements,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO jobs_job_fts (rowid, title, location, description, requirements)
+    SELECT id, title, location, description, requirements FROM jobs_job
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        statements = POSTGRES_FORWARD
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        if "ENABLE_FTS5" not in options:
+            # No FTS5 in this SQLite build; search falls back to icontains
+            return
+        statements = SQLITE_FORWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_search")
+    elif connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0005_jobresponse_worker_job_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_response_counters(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    JobResponse = apps.get_model("jobs", "JobResponse")
+
+    def count(condition):
+        return Coalesce(
+            Subquery(
+                JobResponse.objects.filter(condition, job=OuterRef("pk"))
+                .order_by()
+                .values("job")
+                .annotate(total=Count("pk"))
+                .values("total")[:1]
+            ),
+            0,
+        )
+
+    Job.objects.update(
+        responses_count=count(Q()),
+        pending_responses_count=count(Q(status="pending")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0006_job_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="pending_responses_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of pending responses, maintained by JobResponse",
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="responses_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of responses, maintained by JobResponse",
+            ),
+        ),
+        migrations.RunPython(populate_response_counters, migrations.RunPython.noop),
+    ]
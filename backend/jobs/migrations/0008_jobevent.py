@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0007_job_response_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "topic",
+                    models.CharField(
+                        blank=True,
+                        help_text="Broadcast topic, e.g. 'category:plumbing'",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("job_posted", "Job Posted"),
+                            ("job_status_changed", "Job Status Changed"),
+                            ("response_created", "Response Created"),
+                            ("response_accepted", "Response Accepted"),
+                            ("response_rejected", "Response Rejected"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User the event is for (empty for topic broadcasts)",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["recipient", "id"],
+                        name="jobs_jobeve_recipie_5415cb_idx",
+                    ),
+                    models.Index(
+                        fields=["topic", "id"], name="jobs_jobeve_topic_561ea7_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="jobs_jobeve_created_1eda28_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0008_jobevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Bumped whenever the job, its responses or its assignment change",
+            ),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_assignment_updated_at(apps, schema_editor):
+    Assignment = apps.get_model("jobs", "Assignment")
+    Assignment.objects.update(updated_at=F("assigned_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0009_job_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("job", "Job"),
+                            ("response", "Job Response"),
+                            ("assignment", "Assignment"),
+                            ("transaction", "Transaction"),
+                            ("rating", "Rating"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(populate_assignment_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(
+                fields=["worker", "updated_at"], name="jobs_assign_worker__699dfc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["customer", "updated_at"], name="jobs_job_custome_387826_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["updated_at"], name="jobs_job_updated_2a4757_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobresponse",
+            index=models.Index(
+                fields=["worker", "updated_at"], name="jobs_jobres_worker__355567_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rating",
+            index=models.Index(
+                fields=["rater", "updated_at"], name="jobs_rating_rater_i_190e7e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rating",
+            index=models.Index(
+                fields=["ratee", "updated_at"], name="jobs_rating_ratee_i_0842be_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["worker", "updated_at"], name="jobs_transa_worker__959555_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["customer", "updated_at"], name="jobs_transa_custome_9e3aca_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="synctombstone",
+            name="user",
+            field=models.ForeignKey(
+                help_text="User who could see the deleted object",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sync_tombstones",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="synctombstone",
+            index=models.Index(
+                fields=["user", "deleted_at"], name="jobs_syncto_user_id_a80140_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="synctombstone",
+            index=models.Index(
+                fields=["deleted_at"], name="jobs_syncto_deleted_076bd3_idx"
+            ),
+        ),
+    ]
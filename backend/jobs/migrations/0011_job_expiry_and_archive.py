@@ -0,0 +1,241 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0010_sync_tombstones"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedJob",
+            fields=[
+                (
+                    "id",
+                    models.PositiveIntegerField(
+                        help_text="Id the job had while live",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title", models.CharField(max_length=200)),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("cleaning", "House Cleaning"),
+                            ("plumbing", "Plumbing"),
+                            ("electrical", "Electrical Work"),
+                            ("carpentry", "Carpentry"),
+                            ("repair", "Repair & Maintenance"),
+                            ("painting", "Painting"),
+                            ("gardening", "Gardening"),
+                            ("cooking", "Cooking"),
+                            ("babysitting", "Babysitting"),
+                            ("elderly_care", "Elderly Care"),
+                            ("pet_care", "Pet Care"),
+                            ("laundry", "Laundry"),
+                            ("tutoring", "Tutoring"),
+                            ("delivery", "Delivery"),
+                            ("moving", "Moving/Packing"),
+                            ("other", "Other"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("description", models.TextField()),
+                ("location", models.CharField(max_length=300)),
+                (
+                    "latitude",
+                    models.DecimalField(
+                        blank=True, decimal_places=6, max_digits=9, null=True
+                    ),
+                ),
+                (
+                    "longitude",
+                    models.DecimalField(
+                        blank=True, decimal_places=6, max_digits=9, null=True
+                    ),
+                ),
+                (
+                    "budget_min",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                (
+                    "budget_max",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                (
+                    "fixed_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                (
+                    "urgency",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("urgent", "Urgent"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Open"),
+                            ("accepted", "Accepted"),
+                            ("in_progress", "In Progress"),
+                            ("completed", "Completed"),
+                            ("cancelled", "Cancelled"),
+                            ("expired", "Expired"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                (
+                    "estimated_duration",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("requirements", models.TextField(blank=True)),
+                ("responses_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedJobResponse",
+            fields=[
+                (
+                    "id",
+                    models.PositiveIntegerField(
+                        help_text="Id the response had while live",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "response_type",
+                    models.CharField(
+                        choices=[("accept", "Accept"), ("quote", "Quote")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "quote_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                ("message", models.TextField(blank=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("accepted", "Accepted"),
+                            ("rejected", "Rejected"),
+                            ("withdrawn", "Withdrawn"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                (
+                    "estimated_completion_time",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("open", "Open"),
+                    ("accepted", "Accepted"),
+                    ("in_progress", "In Progress"),
+                    ("completed", "Completed"),
+                    ("cancelled", "Cancelled"),
+                    ("expired", "Expired"),
+                ],
+                default="open",
+                max_length=15,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "created_at"], name="jobs_job_status_277b31_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "updated_at"], name="jobs_job_status_9ab298_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedjob",
+            name="customer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_jobs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedjobresponse",
+            name="job",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="responses",
+                to="jobs.archivedjob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedjobresponse",
+            name="worker",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_job_responses",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedjob",
+            index=models.Index(
+                fields=["customer", "-created_at"],
+                name="jobs_archiv_custome_f950bb_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedjobresponse",
+            index=models.Index(
+                fields=["worker", "-created_at"], name="jobs_archiv_worker__8b9fca_idx"
+            ),
+        ),
+    ]
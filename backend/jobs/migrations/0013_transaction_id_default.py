@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:03
+
+import jobs.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0012_outbox_task"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="transaction_id",
+            field=models.CharField(
+                default=jobs.ids.new_transaction_id,
+                help_text="Unique transaction identifier, ordered by creation time (see jobs/ids.py)",
+                max_length=100,
+                unique=True,
+            ),
+        ),
+    ]
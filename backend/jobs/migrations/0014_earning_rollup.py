@@ -0,0 +1,106 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+SUM_FIELDS = ("gross_amount", "platform_fee", "net_amount", "final_amount")
+
+
+def populate_earning_rollups(apps, schema_editor):
+    Earning = apps.get_model("jobs", "Earning")
+    EarningRollup = apps.get_model("jobs", "EarningRollup")
+
+    totals = {}
+    for earning in Earning.objects.order_by().iterator(chunk_size=2000):
+        month = timezone.localtime(earning.earned_at).date().replace(day=1)
+        bucket = totals.setdefault(
+            (earning.worker_id, month),
+            dict.fromkeys(
+                SUM_FIELDS + ("earnings_count", "rating_total", "rating_count"), 0
+            ),
+        )
+        for field in SUM_FIELDS:
+            bucket[field] += getattr(earning, field) or 0
+        bucket["earnings_count"] += 1
+        if earning.customer_rating is not None:
+            bucket["rating_total"] += earning.customer_rating
+            bucket["rating_count"] += 1
+
+    EarningRollup.objects.bulk_create(
+        [
+            EarningRollup(worker_id=worker_id, month=month, **bucket)
+            for (worker_id, month), bucket in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0013_transaction_id_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EarningRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(help_text="First day of the month (local time)"),
+                ),
+                (
+                    "gross_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "platform_fee",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "net_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "final_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("earnings_count", models.IntegerField(default=0)),
+                (
+                    "rating_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Sum of customer ratings",
+                        max_digits=10,
+                    ),
+                ),
+                ("rating_count", models.IntegerField(default=0)),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="earning_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-month"],
+                "unique_together": {("worker", "month")},
+            },
+        ),
+        migrations.RunPython(populate_earning_rollups, migrations.RunPython.noop),
+    ]
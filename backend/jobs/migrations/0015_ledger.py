@@ -0,0 +1,179 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from jobs.ids import new_id
+from jobs.ledger import transaction_lines
+
+
+def post_existing_transactions(apps, schema_editor):
+    Transaction = apps.get_model("jobs", "Transaction")
+    LedgerEntry = apps.get_model("jobs", "LedgerEntry")
+
+    entries = []
+    for txn in Transaction.objects.order_by("created_at").iterator(chunk_size=2000):
+        lines = transaction_lines(
+            txn.transaction_type,
+            txn.status,
+            txn.amount,
+            txn.platform_fee,
+            txn.net_amount,
+            txn.worker_id,
+            txn.customer_id,
+        )
+        posting_id = new_id()
+        entries += [
+            LedgerEntry(
+                posting_id=posting_id,
+                account=account,
+                user_id=user_id,
+                amount=amount,
+                transaction_id=txn.pk,
+                memo="opening balance",
+                created_at=txn.created_at,
+            )
+            for (account, user_id), amount in lines.items()
+        ]
+    LedgerEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0014_earning_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "posting_id",
+                    models.CharField(
+                        help_text="Entries of one posting sum to zero", max_length=20
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("customer", "Customer"),
+                            ("worker_pending", "Worker (pending payout)"),
+                            ("worker_paid", "Worker (paid out)"),
+                            ("platform_fee", "Platform Fees"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("memo", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="jobs.transaction",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        help_text="Account holder (empty for the platform account)",
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["account", "user", "created_at"],
+                        name="jobs_ledger_account_8895c0_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="jobs_ledger_created_4e44f1_idx"
+                    ),
+                    models.Index(
+                        fields=["posting_id"], name="jobs_ledger_posting_af3a1a_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LedgerSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("customer", "Customer"),
+                            ("worker_pending", "Worker (pending payout)"),
+                            ("worker_paid", "Worker (paid out)"),
+                            ("platform_fee", "Platform Fees"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "as_of",
+                    models.DateTimeField(
+                        help_text="Covers every entry created at or before this time"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-as_of"],
+                "indexes": [
+                    models.Index(
+                        fields=["account", "user", "as_of"],
+                        name="jobs_ledger_account_5b29af_idx",
+                    ),
+                    models.Index(fields=["as_of"], name="jobs_ledger_as_of_238bb7_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(post_existing_transactions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0015_ledger"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Payout",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("transaction_count", models.PositiveIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("processing", "Processing"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="processing",
+                        max_length=15,
+                    ),
+                ),
+                ("gateway", models.CharField(blank=True, max_length=50)),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        help_text="Gateway reference for the transfer",
+                        max_length=100,
+                    ),
+                ),
+                ("failure_reason", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payouts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="payout",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Payout that settles this transaction (see jobs/settlement.py)",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="transactions",
+                to="jobs.payout",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(
+                fields=["worker", "-created_at"], name="jobs_payout_worker__759d6b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payout",
+            index=models.Index(fields=["status"], name="jobs_payout_status_fafa24_idx"),
+        ),
+    ]
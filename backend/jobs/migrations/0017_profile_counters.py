@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:30
+
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def populate_profile_counters(apps, schema_editor):
+    CustomerProfile = apps.get_model("accounts", "CustomerProfile")
+    WorkerProfile = apps.get_model("accounts", "WorkerProfile")
+    Job = apps.get_model("jobs", "Job")
+    ArchivedJob = apps.get_model("jobs", "ArchivedJob")
+    Assignment = apps.get_model("jobs", "Assignment")
+    Earning = apps.get_model("jobs", "Earning")
+
+    posted = Counter()
+    for model in (Job, ArchivedJob):
+        posted.update(
+            dict(
+                model.objects.order_by()
+                .values_list("customer_id")
+                .annotate(count=Count("pk"))
+            )
+        )
+    completed = dict(
+        Assignment.objects.filter(status="completed")
+        .order_by()
+        .values_list("worker_id")
+        .annotate(count=Count("pk"))
+    )
+    earned = dict(
+        Earning.objects.order_by()
+        .values_list("worker_id")
+        .annotate(total=Sum("final_amount"))
+    )
+
+    for customer_id, count in posted.items():
+        CustomerProfile.objects.filter(user_id=customer_id).update(
+            total_jobs_posted=count
+        )
+    for worker_id in set(completed) | set(earned):
+        WorkerProfile.objects.filter(user_id=worker_id).update(
+            total_jobs_completed=completed.get(worker_id, 0),
+            total_earnings=earned.get(worker_id) or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_alter_user_user_type"),
+        ("jobs", "0016_payouts"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_profile_counters, migrations.RunPython.noop),
+    ]
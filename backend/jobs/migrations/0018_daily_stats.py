@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+from jobs.analytics import aggregate
+
+
+def populate_daily_stats(apps, schema_editor):
+    DailyStats = apps.get_model("jobs", "DailyStats")
+    totals = aggregate(
+        [apps.get_model("jobs", "Job"), apps.get_model("jobs", "ArchivedJob")],
+        apps.get_model("jobs", "Transaction"),
+    )
+    DailyStats.objects.bulk_create(
+        [
+            DailyStats(day=day, category=category, city=city, status=status, **measures)
+            for (day, category, city, status), measures in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0017_profile_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(help_text="Local date")),
+                ("category", models.CharField(blank=True, max_length=20)),
+                ("city", models.CharField(blank=True, max_length=100)),
+                ("status", models.CharField(max_length=15)),
+                ("jobs_count", models.IntegerField(default=0)),
+                ("payments_count", models.IntegerField(default=0)),
+                (
+                    "gmv",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "platform_fees",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+            options={
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(
+                        fields=["category", "day"],
+                        name="jobs_dailys_categor_62cd13_idx",
+                    ),
+                    models.Index(
+                        fields=["city", "day"], name="jobs_dailys_city_118989_idx"
+                    ),
+                ],
+                "unique_together": {("day", "category", "city", "status")},
+            },
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
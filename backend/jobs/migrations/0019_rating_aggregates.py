@@ -0,0 +1,92 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from jobs.ratings import aggregate_totals
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    RatingAggregate = apps.get_model("jobs", "RatingAggregate")
+    RatingAggregate.objects.bulk_create(
+        [
+            RatingAggregate(user_id=user_id, rating_type=rating_type, **fields)
+            for (user_id, rating_type), fields in aggregate_totals(
+                apps.get_model("jobs", "Rating")
+            ).items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0018_daily_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatingAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "rating_type",
+                    models.CharField(
+                        choices=[
+                            ("customer_to_worker", "Customer to Worker"),
+                            ("worker_to_customer", "Worker to Customer"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "rating_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("rating_count", models.IntegerField(default=0)),
+                (
+                    "quality_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("quality_count", models.IntegerField(default=0)),
+                (
+                    "communication_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("communication_count", models.IntegerField(default=0)),
+                (
+                    "punctuality_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("punctuality_count", models.IntegerField(default=0)),
+                (
+                    "professionalism_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("professionalism_count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rating_aggregates",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "rating_type")},
+            },
+        ),
+        migrations.RunPython(populate_rating_aggregates, migrations.RunPython.noop),
+    ]
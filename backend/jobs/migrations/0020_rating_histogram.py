@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:27
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_rating_histogram(apps, schema_editor):
+    Rating = apps.get_model("jobs", "Rating")
+    RatingAggregate = apps.get_model("jobs", "RatingAggregate")
+    # Whole-star buckets, as RatingAggregate.star_bucket() assigns them
+    buckets = {
+        "stars_1": Q(rating__lt=2),
+        "stars_2": Q(rating__gte=2, rating__lt=3),
+        "stars_3": Q(rating__gte=3, rating__lt=4),
+        "stars_4": Q(rating__gte=4, rating__lt=5),
+        "stars_5": Q(rating__gte=5),
+    }
+    totals = {
+        (row.pop("ratee_id"), row.pop("rating_type")): row
+        for row in Rating.objects.order_by()
+        .values("ratee_id", "rating_type")
+        .annotate(
+            **{field: Count("pk", filter=bucket) for field, bucket in buckets.items()}
+        )
+    }
+    aggregates = list(RatingAggregate.objects.all())
+    for aggregate in aggregates:
+        fields = totals.get((aggregate.user_id, aggregate.rating_type), {})
+        for field in buckets:
+            setattr(aggregate, field, fields.get(field, 0))
+    RatingAggregate.objects.bulk_update(aggregates, list(buckets), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0019_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="stars_1",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="stars_2",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="stars_3",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="stars_4",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="stars_5",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rating_histogram, migrations.RunPython.noop),
+    ]
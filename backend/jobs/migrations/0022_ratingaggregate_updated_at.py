@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0021_job_geohash_pattern_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ratingaggregate",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:08
+
+import math
+
+from django.db import migrations, models
+
+
+def populate_recommendation_features(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    fields = ["lat_rad", "lng_rad", "hourly_pay"]
+    batch = []
+    for job in Job.objects.only(
+        "latitude",
+        "longitude",
+        "fixed_amount",
+        "budget_min",
+        "budget_max",
+        "estimated_duration",
+    ).iterator(chunk_size=1000):
+        amount = job.fixed_amount or job.budget_max or job.budget_min
+        job.lat_rad = (
+            math.radians(float(job.latitude)) if job.latitude is not None else None
+        )
+        job.lng_rad = (
+            math.radians(float(job.longitude)) if job.longitude is not None else None
+        )
+        job.hourly_pay = (
+            float(amount) / job.estimated_duration
+            if amount and job.estimated_duration
+            else None
+        )
+        batch.append(job)
+        if len(batch) == 1000:
+            Job.objects.bulk_update(batch, fields)
+            batch = []
+    Job.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0022_ratingaggregate_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="hourly_pay",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="Budget per estimated hour, when both are known",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="lat_rad",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="lng_rad",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            populate_recommendation_features, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0023_job_recommendation_features"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="rating",
+            name="assignment",
+            field=models.ForeignKey(
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="ratings",
+                to="jobs.assignment",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="assignment",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                help_text="Related assignment (if applicable)",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to="jobs.assignment",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ArchivedAssignment",
+            fields=[
+                (
+                    "id",
+                    models.PositiveIntegerField(
+                        help_text="Id the assignment had while live",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("agreed_amount", models.DecimalField(decimal_places=2, max_digits=8)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("assigned", "Assigned"),
+                            ("started", "Started"),
+                            ("completed", "Completed"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                ("assigned_at", models.DateTimeField()),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                ("cancelled_at", models.DateTimeField(blank=True, null=True)),
+                ("cancellation_reason", models.TextField(blank=True)),
+                ("notes", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "job",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignment",
+                        to="jobs.archivedjob",
+                    ),
+                ),
+                (
+                    "job_response",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignment",
+                        to="jobs.archivedjobresponse",
+                    ),
+                ),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_assignments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-assigned_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["worker", "status"],
+                        name="jobs_archiv_worker__521365_idx",
+                    )
+                ],
+            },
+        ),
+    ]
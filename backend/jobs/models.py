@@ -1,8 +1,17 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Now, Round
 from django.conf import settings
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from collections import Counter
 from decimal import Decimal
-import uuid
+import math
+
+from . import analytics, counters, feed_cache
+from .geo import encode_geohash
+from .ids import new_transaction_id
+from .search import INDEXED_FIELDS, get_search_backend
 
 
 class Job(models.Model):
@@ -14,8 +23,12 @@ class Job(models.Model):
         ('in_progress', 'In Progress'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
+        ('expired', 'Expired'),
     ]
     
+    # Statuses a job never leaves
+    TERMINAL_STATUSES = ('completed', 'cancelled', 'expired')
+    
     URGENCY_CHOICES = [
         ('low', 'Low'),
         ('medium', 'Medium'),
@@ -53,6 +66,21 @@ class Job(models.Model):
     location = models.CharField(max_length=300)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        editable=False,
+        help_text="Geohash of latitude/longitude, maintained on save for radius search"
+    )
+    # Recommendation features, derived on save (see jobs/recommendations.py)
+    lat_rad = models.FloatField(null=True, blank=True, editable=False)
+    lng_rad = models.FloatField(null=True, blank=True, editable=False)
+    hourly_pay = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Budget per estimated hour, when both are known"
+    )
     budget_min = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     budget_max = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     fixed_amount = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
@@ -64,20 +92,198 @@ class Job(models.Model):
         blank=True
     )
     requirements = models.TextField(blank=True, help_text="Special requirements or tools needed")
+    responses_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of responses, maintained by JobResponse"
+    )
+    pending_responses_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of pending responses, maintained by JobResponse"
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Bumped whenever the job, its responses or its assignment change"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Maintained with F() updates; never written back from a stale instance
+    COUNTER_FIELDS = ('responses_count', 'pending_responses_count')
+    
+    # Derived field -> the fields it is computed from
+    DERIVED_FIELDS = {
+        'geohash': ('latitude', 'longitude'),
+        'lat_rad': ('latitude',),
+        'lng_rad': ('longitude',),
+        'hourly_pay': ('fixed_amount', 'budget_min', 'budget_max', 'estimated_duration'),
+    }
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'category']),
             models.Index(fields=['latitude', 'longitude']),
+            # Radius search: geohash prefixes match with LIKE, which PostgreSQL
+            # only serves from an index with pattern_ops outside the C locale
+            models.Index(
+                fields=['status', 'geohash'],
+                name='jobs_job_status_geohash_idx',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops'],
+            ),
+            # Expiry (open, oldest first) and archival (terminal, least recently updated) passes
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'updated_at']),
             models.Index(fields=['-created_at']),
+            # Delta sync: a customer's changed jobs, and changed jobs overall
+            models.Index(fields=['customer', 'updated_at']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which cached feed and analytics row the stored row belongs to
+        instance._loaded_feed_entry = instance._feed_entry()
+        instance._loaded_stats_entry = instance._stats_entry()
+        return instance
+    
+    def _feed_entry(self):
+        """(geohash, category, status) of this job for the feed cache"""
+        fields = self.__dict__
+        return fields.get('geohash'), fields.get('category'), fields.get('status')
+    
+    def _stats_entry(self, status=None):
+        """What this job (with ``status``, default its own) adds to DailyStats"""
+        fields = self.__dict__
+        if any(name not in fields for name in ('created_at', 'category', 'location', 'status')):
+            return None
+        return analytics.job_entry(self.created_at, self.category, self.location, status or self.status)
+    
+    @classmethod
+    def create_many(cls, jobs, using=None):
+        """
+        Insert unsaved jobs with one bulk_create, doing the bookkeeping
+        save() does for a single job (derived fields, search index, feed cache).
+        """
+        for job in jobs:
+            job._derive_fields()
+        
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            jobs = cls.objects.using(using).bulk_create(jobs)
+            get_search_backend(using).index_jobs(jobs)
+            counters.add_jobs_posted(Counter(job.customer_id for job in jobs), using=using)
+            DailyStats.apply([], [job._stats_entry() for job in jobs], using=using)
+        
+        for job in jobs:
+            job._loaded_feed_entry = job._feed_entry()
+            job._loaded_stats_entry = job._stats_entry()
+        feed_cache.invalidate_job(*[
+            (geohash, category) for geohash, category, status in
+            (job._loaded_feed_entry for job in jobs) if status == 'open'
+        ])
+        return jobs
+    
+    @classmethod
+    def bump_version(cls, job_id, using=None, **updates):
+        """Mark a job as changed (optionally applying other F() updates)"""
+        cls.objects.using(using).filter(pk=job_id).update(
+            version=F('version') + 1, updated_at=Now(), **updates
+        )
+    
+    def _invalidate_feeds(self, *entries):
+        feed_cache.invalidate_job(*[
+            (geohash, category) for geohash, category, status in entries if status == 'open'
+        ])
+    
+    def _derive_fields(self):
+        """Compute the geohash and recommendation features from the stored fields"""
+        from .recommendations import hourly_pay
+        
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        self.lat_rad = math.radians(float(self.latitude)) if self.latitude is not None else None
+        self.lng_rad = math.radians(float(self.longitude)) if self.longitude is not None else None
+        self.hourly_pay = hourly_pay(self.fixed_amount, self.budget_min, self.budget_max, self.estimated_duration)
+    
+    def save(self, *args, **kwargs):
+        """Keep the geohash and recommendation features in sync with their fields"""
+        self._derive_fields()
+        
+        update_fields = kwargs.get('update_fields')
+        updating = not self._state.adding and not kwargs.get('force_insert')
+        if updating:
+            self.version = F('version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'version'}
+        if update_fields is None and updating:
+            # Full saves of an existing row skip the counters so concurrent
+            # F() increments are not overwritten with in-memory values
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        elif update_fields is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {
+                derived for derived, sources in self.DERIVED_FIELDS.items()
+                if set(sources) & set(update_fields)
+            }
+        loaded_stats = getattr(self, '_loaded_stats_entry', None)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if not updating:
+                counters.add_jobs_posted({self.customer_id: 1}, using=self._state.db)
+            current_stats = self._stats_entry()
+            # Rows loaded with deferred fields cannot tell what they contributed
+            if (loaded_stats is not None or not updating) and current_stats is not None:
+                DailyStats.apply([loaded_stats], [current_stats], using=self._state.db)
+                self._loaded_stats_entry = current_stats
+        
+        # Refresh the full-text index unless only non-text fields changed
+        if update_fields is None or set(INDEXED_FIELDS) & set(update_fields):
+            get_search_backend(self._state.db).index_job(self)
+        
+        # Drop cached open-job feeds the job entered or left
+        current = self._feed_entry()
+        self._invalidate_feeds(getattr(self, '_loaded_feed_entry', None) or current, current)
+        self._loaded_feed_entry = current
+    
+    def delete(self, *args, **kwargs):
+        """Drop the job from the full-text index along with the row"""
+        job_id = self.pk
+        using = self._state.db
+        self._invalidate_feeds(getattr(self, '_loaded_feed_entry', None) or self._feed_entry())
+        
+        # Cascaded responses / assignment / transactions never reach their own delete()
+        responses = list(self.responses.using(using).values_list('id', 'worker_id'))
+        assignment = Assignment.objects.using(using).filter(job_id=job_id).values_list('id', 'worker_id', 'status').first()
+        tombstones = [('job', job_id, [self.customer_id] + [worker_id for _, worker_id in responses])]
+        tombstones += [('response', response_id, [self.customer_id, worker_id]) for response_id, worker_id in responses]
+        if assignment:
+            tombstones.append(('assignment', assignment[0], [self.customer_id, assignment[1]]))
+            tombstones += Transaction.tombstones_for(assignment[0], using=using)
+        
+        with transaction.atomic(using=using):
+            result = super().delete(*args, **kwargs)
+            SyncTombstone.record(tombstones, using=using)
+            counters.add_jobs_posted({self.customer_id: -1}, using=using)
+            DailyStats.apply([getattr(self, '_loaded_stats_entry', None)], [], using=using)
+            if assignment and assignment[2] == 'completed':
+                counters.add_jobs_completed({assignment[1]: -1}, using=using)
+        get_search_backend(using).remove_job(job_id)
+        return result
+    
     @property
     def is_budget_range(self):
         """Check if job has budget range vs fixed amount"""
@@ -137,12 +343,59 @@ class JobResponse(models.Model):
         unique_together = ['job', 'worker']  # One response per worker per job
         indexes = [
             models.Index(fields=['job', 'status']),
+            # Covers the worker feed's NOT EXISTS (worker, job) probe
+            models.Index(fields=['worker', 'job']),
+            models.Index(fields=['worker', 'updated_at']),
             models.Index(fields=['-created_at']),
         ]
     
     def __str__(self):
         return f"{self.worker.email} - {self.job.title} ({self.get_response_type_display()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can adjust the job's pending count
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Keep Job.responses_count / pending_responses_count and version in step"""
+        adding = self._state.adding
+        previous_status = getattr(self, '_loaded_status', None)
+        
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            
+            counters = {}
+            if adding:
+                counters['responses_count'] = F('responses_count') + 1
+                if self.status == 'pending':
+                    counters['pending_responses_count'] = F('pending_responses_count') + 1
+            elif previous_status is not None and previous_status != self.status:
+                if previous_status == 'pending':
+                    counters['pending_responses_count'] = F('pending_responses_count') - 1
+                elif self.status == 'pending':
+                    counters['pending_responses_count'] = F('pending_responses_count') + 1
+            Job.bump_version(self.job_id, using=self._state.db, **counters)
+        
+        self._loaded_status = self.status
+    
+    def delete(self, *args, **kwargs):
+        """Decrement the job's counters along with the row"""
+        counters = {'responses_count': F('responses_count') - 1}
+        if self.status == 'pending':
+            counters['pending_responses_count'] = F('pending_responses_count') - 1
+        
+        using = kwargs.get('using') or self._state.db
+        customer_id = Job.objects.using(using).filter(pk=self.job_id).values_list('customer_id', flat=True).first()
+        with transaction.atomic(using=using):
+            response_id = self.pk
+            result = super().delete(*args, **kwargs)
+            Job.bump_version(self.job_id, using=using, **counters)
+            SyncTombstone.record([('response', response_id, [customer_id, self.worker_id])], using=using)
+        return result
+    
     @property
     def amount_display(self):
         """Get formatted amount display"""
@@ -182,18 +435,40 @@ class Assignment(models.Model):
     cancelled_at = models.DateTimeField(null=True, blank=True)
     cancellation_reason = models.TextField(blank=True)
     notes = models.TextField(blank=True, help_text="Additional notes about the assignment")
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-assigned_at']
         indexes = [
             models.Index(fields=['worker', 'status']),
             models.Index(fields=['job', 'status']),
+            models.Index(fields=['worker', 'updated_at']),
             models.Index(fields=['-assigned_at']),
         ]
     
     def __str__(self):
         return f"{self.job.title} assigned to {self.worker.email}"
     
+    def save(self, *args, **kwargs):
+        """Assignments are part of the job's representation"""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            Job.bump_version(self.job_id, using=self._state.db)
+    
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        customer_id = Job.objects.using(using).filter(pk=self.job_id).values_list('customer_id', flat=True).first()
+        # Cascaded transactions never reach their own delete()
+        tombstones = [('assignment', self.pk, [customer_id, self.worker_id])]
+        tombstones += Transaction.tombstones_for(self.pk, using=using)
+        with transaction.atomic(using=using):
+            result = super().delete(*args, **kwargs)
+            Job.bump_version(self.job_id, using=using)
+            SyncTombstone.record(tombstones, using=using)
+            if self.status == 'completed':
+                counters.add_jobs_completed({self.worker_id: -1}, using=using)
+        return result
+    
     @property
     def duration_hours(self):
         """Calculate duration if both started and completed"""
@@ -222,12 +497,18 @@ class Transaction(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    # Fields that decide what a transaction adds to DailyStats
+    STATS_FIELDS = ('assignment_id', 'created_at', 'transaction_type', 'status', 'amount', 'platform_fee')
+    
+    # No database constraint: archive_jobs moves the assignment to
+    # ArchivedAssignment (same id) and leaves its transactions in place
     assignment = models.ForeignKey(
         Assignment, 
         on_delete=models.CASCADE, 
         related_name='transactions',
         null=True,
         blank=True,
+        db_constraint=False,
         help_text="Related assignment (if applicable)"
     )
     worker = models.ForeignKey(
@@ -256,7 +537,20 @@ class Transaction(models.Model):
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
     description = models.TextField(blank=True, help_text="Transaction description")
     payment_method = models.CharField(max_length=50, blank=True, help_text="Payment method used")
-    transaction_id = models.CharField(max_length=100, unique=True, help_text="Unique transaction identifier")
+    payout = models.ForeignKey(
+        'Payout',
+        on_delete=models.SET_NULL,
+        related_name='transactions',
+        null=True,
+        blank=True,
+        help_text="Payout that settles this transaction (see jobs/settlement.py)"
+    )
+    transaction_id = models.CharField(
+        max_length=100,
+        unique=True,
+        default=new_transaction_id,
+        help_text="Unique transaction identifier, ordered by creation time (see jobs/ids.py)"
+    )
     processed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -267,6 +561,8 @@ class Transaction(models.Model):
             models.Index(fields=['worker', 'status']),
             models.Index(fields=['customer', 'status']),
             models.Index(fields=['transaction_type', 'status']),
+            models.Index(fields=['worker', 'updated_at']),
+            models.Index(fields=['customer', 'updated_at']),
             models.Index(fields=['-created_at']),
         ]
     
@@ -275,21 +571,127 @@ class Transaction(models.Model):
     
     def save(self, *args, **kwargs):
         """Calculate net amount before saving and ensure transaction_id"""
-        # Auto-generate a unique transaction_id if missing
-        if not getattr(self, 'transaction_id', None):
-            # Generate a short unique identifier with a stable prefix
-            candidate = f"TXN-{uuid.uuid4().hex[:12].upper()}"
-            # Ensure uniqueness conservatively
-            while Transaction.objects.filter(transaction_id=candidate).exists():
-                candidate = f"TXN-{uuid.uuid4().hex[:12].upper()}"
-            self.transaction_id = candidate
+        # Unique by construction, no existence check needed
+        if not self.transaction_id:
+            self.transaction_id = new_transaction_id()
 
         # Calculate net amount
         if self.transaction_type == 'payment':
             self.net_amount = self.amount - self.platform_fee
         else:
             self.net_amount = self.amount
-        super().save(*args, **kwargs)
+        
+        from . import ledger
+        
+        current = self._ledger_lines()
+        adding = self._state.adding
+        loaded_stats = getattr(self, '_loaded_stats_fields', None)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            # Post only what changed; earlier entries are never rewritten
+            ledger.post(
+                ledger.difference(getattr(self, '_loaded_ledger_lines', None), current),
+                transaction_id=self.pk, memo=f'{self.transaction_type} {self.status}',
+                using=self._state.db
+            )
+            current_stats = self._stats_fields()
+            if (loaded_stats is not None or adding) and current_stats not in (None, loaded_stats):
+                DailyStats.apply(
+                    [self._stats_entry(loaded_stats)], [self._stats_entry(current_stats)],
+                    using=self._state.db
+                )
+        self._loaded_ledger_lines = current
+        self._loaded_stats_fields = current_stats
+    
+    def delete(self, *args, **kwargs):
+        from . import ledger
+        
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using):
+            transaction_id = self.pk
+            result = super().delete(*args, **kwargs)
+            ledger.post(
+                ledger.difference(getattr(self, '_loaded_ledger_lines', None), {}),
+                transaction_id=transaction_id, memo='deleted', using=using
+            )
+            DailyStats.apply([self._stats_entry(getattr(self, '_loaded_stats_fields', None))], [], using=using)
+            SyncTombstone.record(
+                [('transaction', transaction_id, [self.customer_id, self.worker_id])], using=using
+            )
+        return result
+    
+    @classmethod
+    def tombstones_for(cls, assignment_id, using=None):
+        """SyncTombstone entries for an assignment's transactions, before a cascade deletes them"""
+        return [
+            ('transaction', transaction_id, [customer_id, worker_id])
+            for transaction_id, customer_id, worker_id in cls.objects.using(using).filter(
+                assignment_id=assignment_id
+            ).values_list('id', 'customer_id', 'worker_id')
+        ]
+    
+    @staticmethod
+    def job_field(name):
+        """
+        ``assignment__job__<name>`` as an expression that also finds the job
+        once archive_jobs has moved it (and the assignment) to the archive.
+        """
+        return Coalesce(
+            *[
+                Subquery(model.objects.filter(pk=OuterRef('assignment_id')).order_by().values(f'job__{name}'))
+                for model in (Assignment, ArchivedAssignment)
+            ],
+            output_field=Job._meta.get_field(name)
+        )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the stored row has posted to the ledger and the analytics cube
+        instance._loaded_ledger_lines = instance._ledger_lines()
+        instance._loaded_stats_fields = instance._stats_fields()
+        return instance
+    
+    def _stats_fields(self):
+        """The values that decide what this transaction adds to DailyStats"""
+        fields = self.__dict__
+        if any(name not in fields for name in self.STATS_FIELDS):
+            return None
+        return tuple(fields[name] for name in self.STATS_FIELDS)
+    
+    def _stats_entry(self, stats_fields):
+        if stats_fields is None:
+            return None
+        assignment_id, created_at, transaction_type, status, amount, platform_fee = stats_fields
+        if transaction_type != 'payment' or status in analytics.EXCLUDED_PAYMENT_STATUSES:
+            return None
+        assignment = self.assignment if Transaction.assignment.is_cached(self) else None
+        if assignment is not None and assignment.pk == assignment_id and Assignment.job.is_cached(assignment):
+            category, location = assignment.job.category, assignment.job.location
+        elif assignment_id is not None:
+            category, location = (
+                Job.objects.using(self._state.db).filter(assignment__id=assignment_id)
+                .values_list('category', 'location').first()
+                or ArchivedJob.objects.using(self._state.db).filter(assignment__id=assignment_id)
+                .values_list('category', 'location').first()
+                or ('', '')
+            )
+        else:
+            category, location = '', ''
+        return analytics.payment_entry(
+            created_at, category, location, transaction_type, status, amount, platform_fee
+        )
+    
+    def _ledger_lines(self):
+        from . import ledger
+        
+        fields = self.__dict__
+        if any(name not in fields for name in ('transaction_type', 'status', 'amount', 'platform_fee', 'net_amount')):
+            return None
+        return ledger.transaction_lines(
+            self.transaction_type, self.status, self.amount, self.platform_fee,
+            self.net_amount, self.worker_id, self.customer_id
+        )
 
 
 class Payment(models.Model):
@@ -341,6 +743,40 @@ class Payment(models.Model):
         return f"Payment {self.transaction.transaction_id} - {self.get_payment_method_display()}"
 
 
+class Payout(models.Model):
+    """One transfer to a worker settling a batch of their pending transactions"""
+    
+    STATUS_CHOICES = [
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='payouts'
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='processing')
+    gateway = models.CharField(max_length=50, blank=True)
+    reference = models.CharField(max_length=100, blank=True, help_text="Gateway reference for the transfer")
+    failure_reason = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['worker', '-created_at']),
+            models.Index(fields=['status']),
+        ]
+    
+    def __str__(self):
+        return f"Payout #{self.pk} to {self.worker_id}: ₹{self.amount} ({self.status})"
+
+
 class Earning(models.Model):
     """Model for tracking worker earnings summary"""
     
@@ -383,14 +819,157 @@ class Earning(models.Model):
     def __str__(self):
         return f"{self.worker.email} - ₹{self.final_amount} ({self.earned_at.date()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the stored row contributes to the monthly rollup
+        instance._loaded_rollup_entry = instance._rollup_entry()
+        return instance
+    
+    def _rollup_entry(self):
+        """(worker_id, month, amounts) this earning adds to EarningRollup"""
+        fields = self.__dict__
+        if fields.get('earned_at') is None or 'final_amount' not in fields:
+            return None
+        rating = fields.get('customer_rating')
+        return (self.worker_id, EarningRollup.month_of(self.earned_at), {
+            'gross_amount': Decimal(self.gross_amount or 0),
+            'platform_fee': Decimal(self.platform_fee or 0),
+            'net_amount': Decimal(self.net_amount or 0),
+            'final_amount': Decimal(self.final_amount or 0),
+            'earnings_count': 1,
+            'rating_total': Decimal(rating) if rating is not None else Decimal('0'),
+            'rating_count': int(rating is not None),
+        })
+    
     def save(self, *args, **kwargs):
-        """Calculate final amount before saving"""
+        """Calculate final amount before saving and keep the rollup in step"""
         # Ensure Decimal arithmetic by coercing potential float defaults
         net = Decimal(self.net_amount or 0)
         tax = Decimal(self.tax_deducted or 0)
         bonus = Decimal(self.bonus_amount or 0)
         self.final_amount = net - tax + bonus
-        super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            current = self._rollup_entry()
+            EarningRollup.apply(
+                getattr(self, '_loaded_rollup_entry', None), current, using=self._state.db
+            )
+            counters.add_earnings(
+                getattr(self, '_loaded_rollup_entry', None), current, using=self._state.db
+            )
+        self._loaded_rollup_entry = current
+    
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using):
+            result = super().delete(*args, **kwargs)
+            EarningRollup.apply(getattr(self, '_loaded_rollup_entry', None), None, using=using)
+            counters.add_earnings(getattr(self, '_loaded_rollup_entry', None), None, using=using)
+        return result
+
+
+class EarningRollup(models.Model):
+    """Per-worker monthly earning totals, maintained as Earning rows are written"""
+    
+    SUM_FIELDS = (
+        'gross_amount', 'platform_fee', 'net_amount', 'final_amount',
+        'earnings_count', 'rating_total', 'rating_count',
+    )
+    
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='earning_rollups'
+    )
+    month = models.DateField(help_text="First day of the month (local time)")
+    gross_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    net_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    final_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    earnings_count = models.IntegerField(default=0)
+    rating_total = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Sum of customer ratings"
+    )
+    rating_count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['worker', 'month']
+    
+    def __str__(self):
+        return f"{self.worker_id} {self.month:%Y-%m}: ₹{self.final_amount}"
+    
+    @staticmethod
+    def month_of(moment):
+        return timezone.localtime(moment).date().replace(day=1)
+    
+    @classmethod
+    def apply(cls, old_entry, new_entry, using=None):
+        """Move an earning's contribution from ``old_entry`` to ``new_entry``"""
+        deltas = {}
+        for entry, sign in ((old_entry, -1), (new_entry, 1)):
+            if entry is None:
+                continue
+            worker_id, month, amounts = entry
+            bucket = deltas.setdefault((worker_id, month), dict.fromkeys(cls.SUM_FIELDS, 0))
+            for field, value in amounts.items():
+                bucket[field] += sign * value
+        
+        for (worker_id, month), bucket in deltas.items():
+            if not any(bucket.values()):
+                continue
+            rollup, _ = cls.objects.using(using).get_or_create(worker_id=worker_id, month=month)
+            cls.objects.using(using).filter(pk=rollup.pk).update(
+                **{field: F(field) + value for field, value in bucket.items() if value}
+            )
+
+
+class DailyStats(models.Model):
+    """Analytics cube: job and payment totals per day, category, city and status (see jobs/analytics.py)"""
+    
+    day = models.DateField(help_text="Local date")
+    category = models.CharField(max_length=20, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=15)
+    jobs_count = models.IntegerField(default=0)
+    payments_count = models.IntegerField(default=0)
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    platform_fees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['day', 'category', 'city', 'status']
+        indexes = [
+            models.Index(fields=['category', 'day']),
+            models.Index(fields=['city', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.category} {self.city} {self.status}: {self.jobs_count} jobs, ₹{self.gmv}"
+    
+    @classmethod
+    def apply(cls, old_entries, new_entries, using=None):
+        """Replace the contribution of ``old_entries`` with ``new_entries`` ((key, measures) or None)"""
+        from .analytics import MEASURES
+        
+        deltas = {}
+        for entries, sign in ((old_entries, -1), (new_entries, 1)):
+            for entry in entries:
+                if entry is None:
+                    continue
+                key, measures = entry
+                bucket = deltas.setdefault(key, dict.fromkeys(MEASURES, 0))
+                for field, value in measures.items():
+                    bucket[field] += sign * value
+        
+        for (day, category, city, status), bucket in deltas.items():
+            if not any(bucket.values()):
+                continue
+            row, _ = cls.objects.using(using).get_or_create(day=day, category=category, city=city, status=status)
+            cls.objects.using(using).filter(pk=row.pk).update(
+                **{field: F(field) + value for field, value in bucket.items() if value}
+            )
 
 
 class Rating(models.Model):
@@ -401,10 +980,14 @@ class Rating(models.Model):
         ('worker_to_customer', 'Worker to Customer'),
     ]
     
+    # Like Transaction.assignment, kept when the assignment is archived;
+    # nullable so joins through it keep ratings of archived jobs
     assignment = models.ForeignKey(
         Assignment, 
         on_delete=models.CASCADE, 
-        related_name='ratings'
+        related_name='ratings',
+        null=True,
+        db_constraint=False
     )
     rater = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
@@ -475,6 +1058,8 @@ class Rating(models.Model):
             models.Index(fields=['ratee', 'rating_type']),
             models.Index(fields=['rater', 'rating_type']),
             models.Index(fields=['assignment']),
+            models.Index(fields=['rater', 'updated_at']),
+            models.Index(fields=['ratee', 'updated_at']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['rating']),
         ]
@@ -482,48 +1067,178 @@ class Rating(models.Model):
     def __str__(self):
         return f"{self.rater.email} → {self.ratee.email}: {self.rating}★ ({self.get_rating_type_display()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the stored row adds to the ratee's RatingAggregate
+        instance._loaded_aggregate_entry = instance._aggregate_entry()
+        return instance
+    
+    def _aggregate_entry(self):
+        """(ratee_id, rating_type, amounts) this rating adds to RatingAggregate"""
+        fields = self.__dict__
+        names = ['rating'] + [f'{criterion}_rating' for criterion in RatingAggregate.CRITERIA]
+        if any(name not in fields for name in names + ['ratee_id', 'rating_type']):
+            return None
+        amounts = {
+            'rating_sum': Decimal(self.rating), 'rating_count': 1,
+            f'stars_{RatingAggregate.star_bucket(self.rating)}': 1,
+        }
+        for criterion in RatingAggregate.CRITERIA:
+            value = fields[f'{criterion}_rating']
+            if value is not None:
+                amounts[f'{criterion}_sum'] = Decimal(value)
+                amounts[f'{criterion}_count'] = 1
+        return self.ratee_id, self.rating_type, amounts
+    
     def save(self, *args, **kwargs):
-        """Update user average ratings when a new rating is saved"""
-        super().save(*args, **kwargs)
-        self.update_user_average_ratings()
+        """Adjust the ratee's running rating totals and average with the rating"""
+        adding = self._state.adding
+        loaded = getattr(self, '_loaded_aggregate_entry', None)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            current = self._aggregate_entry()
+            # Rows loaded with deferred fields cannot tell what they contributed
+            touched = []
+            if (adding or loaded is not None) and current is not None:
+                touched = self.update_user_average_ratings(loaded, current)
+                self._loaded_aggregate_entry = current
+            # Reviews and helpful counts are part of the summary too
+            ratee_ids = {self.ratee_id}
+            if loaded is not None:
+                ratee_ids.add(loaded[0])
+            RatingAggregate.touch(ratee_ids - {user_id for user_id, _ in touched}, using=self._state.db)
+    
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using):
+            rating_id = self.pk
+            result = super().delete(*args, **kwargs)
+            SyncTombstone.record([('rating', rating_id, [self.rater_id, self.ratee_id])], using=using)
+            touched = self.update_user_average_ratings(
+                getattr(self, '_loaded_aggregate_entry', None), None, using=using
+            )
+            if not touched:
+                RatingAggregate.touch({self.ratee_id}, using=using)
+        return result
+    
+    def update_user_average_ratings(self, old_entry, new_entry, using=None):
+        """Move the rating's contribution between aggregates and refresh the averages; returns the keys touched"""
+        using = using or self._state.db
+        touched = RatingAggregate.apply(old_entry, new_entry, using=using)
+        for ratee_id, rating_type in touched:
+            self.refresh_average_rating(ratee_id, rating_type, using=using)
+        return touched
     
-    def update_user_average_ratings(self):
-        """Update the average rating for the ratee"""
-        from django.db.models import Avg
+    @classmethod
+    def refresh_average_rating(cls, ratee_id, rating_type, using=None):
+        """Copy a user's average rating as a worker or as a customer from their RatingAggregate"""
         from accounts.models import CustomerProfile, WorkerProfile
         
-        # Calculate new average rating for the ratee
-        if self.rating_type == 'customer_to_worker':
+        if rating_type == 'customer_to_worker':
             # Update worker's average rating
-            worker_ratings = Rating.objects.filter(
-                ratee=self.ratee, 
-                rating_type='customer_to_worker'
-            ).aggregate(avg_rating=Avg('rating'))
-            
-            avg_rating = worker_ratings['avg_rating'] or 0.00
-            
-            try:
-                worker_profile = WorkerProfile.objects.get(user=self.ratee)
-                worker_profile.average_rating = round(avg_rating, 2)
-                worker_profile.save()
-            except WorkerProfile.DoesNotExist:
-                pass
-                
-        elif self.rating_type == 'worker_to_customer':
+            profiles = WorkerProfile.objects.using(using).filter(user_id=ratee_id)
+        elif rating_type == 'worker_to_customer':
             # Update customer's average rating
-            customer_ratings = Rating.objects.filter(
-                ratee=self.ratee, 
-                rating_type='worker_to_customer'
-            ).aggregate(avg_rating=Avg('rating'))
-            
-            avg_rating = customer_ratings['avg_rating'] or 0.00
-            
-            try:
-                customer_profile = CustomerProfile.objects.get(user=self.ratee)
-                customer_profile.average_rating = round(avg_rating, 2)
-                customer_profile.save()
-            except CustomerProfile.DoesNotExist:
-                pass
+            profiles = CustomerProfile.objects.using(using).filter(user_id=ratee_id)
+        else:
+            return
+        average = RatingAggregate.objects.using(using).filter(
+            user_id=ratee_id, rating_type=rating_type, rating_count__gt=0
+        ).values(average=RatingAggregate.average_expression('rating'))[:1]
+        profiles.update(
+            average_rating=Coalesce(Subquery(average), Value(Decimal('0.00'))),
+            updated_at=timezone.now()
+        )
+
+
+class RatingAggregate(models.Model):
+    """Running rating totals per ratee and rating type, maintained by Rating.save()/delete()"""
+    
+    CRITERIA = ('quality', 'communication', 'punctuality', 'professionalism')
+    STARS = (1, 2, 3, 4, 5)
+    STAR_FIELDS = tuple(f'stars_{star}' for star in STARS)
+    SUM_FIELDS = ('rating_sum', 'rating_count') + tuple(
+        f'{criterion}_{part}' for criterion in CRITERIA for part in ('sum', 'count')
+    ) + STAR_FIELDS
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='rating_aggregates'
+    )
+    rating_type = models.CharField(max_length=20, choices=Rating.RATING_TYPE_CHOICES)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rating_count = models.IntegerField(default=0)
+    quality_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    quality_count = models.IntegerField(default=0)
+    communication_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    communication_count = models.IntegerField(default=0)
+    punctuality_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    punctuality_count = models.IntegerField(default=0)
+    professionalism_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    professionalism_count = models.IntegerField(default=0)
+    # Histogram: stars_N counts ratings from N up to (not including) N + 1
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    # Moved by every write to the user's ratings; versions the rating summary
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'rating_type']
+    
+    def __str__(self):
+        return f"{self.user_id} ({self.rating_type}): {self.rating_count} ratings"
+    
+    @classmethod
+    def star_bucket(cls, rating):
+        """Histogram bucket of a rating: 4.5 counts as 4 stars"""
+        return min(max(int(Decimal(rating)), cls.STARS[0]), cls.STARS[-1])
+    
+    @staticmethod
+    def average_expression(name):
+        """Rounded average of ``rating`` or a criterion, for rows with a non-zero count"""
+        # Cast first: SQLite stores whole sums as integers and would divide them as such
+        return Round(
+            ExpressionWrapper(
+                Cast(f'{name}_sum', models.FloatField()) / F(f'{name}_count'),
+                output_field=models.DecimalField(max_digits=3, decimal_places=2)
+            ),
+            2
+        )
+    
+    @classmethod
+    def apply(cls, old_entry, new_entry, using=None):
+        """Move a rating's contribution from ``old_entry`` to ``new_entry``; returns the keys touched"""
+        deltas = {}
+        for entry, sign in ((old_entry, -1), (new_entry, 1)):
+            if entry is None:
+                continue
+            user_id, rating_type, amounts = entry
+            bucket = deltas.setdefault((user_id, rating_type), dict.fromkeys(cls.SUM_FIELDS, 0))
+            for field, value in amounts.items():
+                bucket[field] += sign * value
+        
+        touched = []
+        for (user_id, rating_type), bucket in deltas.items():
+            if not any(bucket.values()):
+                continue
+            aggregate, _ = cls.objects.using(using).get_or_create(user_id=user_id, rating_type=rating_type)
+            cls.objects.using(using).filter(pk=aggregate.pk).update(
+                updated_at=timezone.now(),
+                **{field: F(field) + value for field, value in bucket.items() if value}
+            )
+            touched.append((user_id, rating_type))
+        return touched
+    
+    @classmethod
+    def touch(cls, user_ids, using=None):
+        """Move ``updated_at`` of the users' rows after a rating write that left the totals alone"""
+        if user_ids:
+            cls.objects.using(using).filter(user_id__in=user_ids).update(updated_at=timezone.now())
 
 
 class RatingHelpful(models.Model):
@@ -542,3 +1257,307 @@ class RatingHelpful(models.Model):
     
     def __str__(self):
         return f"{self.user.email} found rating helpful: {self.rating.id}"
+
+
+class JobEvent(models.Model):
+    """Model for events pushed to clients over the event stream"""
+    
+    EVENT_TYPE_CHOICES = [
+        ('job_posted', 'Job Posted'),
+        ('job_status_changed', 'Job Status Changed'),
+        ('response_created', 'Response Created'),
+        ('response_accepted', 'Response Accepted'),
+        ('response_rejected', 'Response Rejected'),
+    ]
+    
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='job_events',
+        null=True,
+        blank=True,
+        help_text="User the event is for (empty for topic broadcasts)"
+    )
+    topic = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Broadcast topic, e.g. 'category:plumbing'"
+    )
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['recipient', 'id']),
+            models.Index(fields=['topic', 'id']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        target = self.recipient_id or self.topic
+        return f"{self.get_event_type_display()} → {target}"
+
+
+class SyncTombstone(models.Model):
+    """Model recording deleted objects so delta sync can report them"""
+    
+    KIND_CHOICES = [
+        ('job', 'Job'),
+        ('response', 'Job Response'),
+        ('assignment', 'Assignment'),
+        ('transaction', 'Transaction'),
+        ('rating', 'Rating'),
+    ]
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sync_tombstones',
+        help_text="User who could see the deleted object"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+            models.Index(fields=['deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} deleted"
+    
+    @classmethod
+    def record(cls, entries, using=None):
+        """Store tombstones for (kind, object_id, user_ids) entries"""
+        rows = [
+            cls(user_id=user_id, kind=kind, object_id=object_id)
+            for kind, object_id, user_ids in entries
+            for user_id in set(user_ids) if user_id is not None
+        ]
+        if rows:
+            cls.objects.using(using).bulk_create(rows)
+
+
+class ArchivedJob(models.Model):
+    """Terminal job moved out of the live table by the archive_jobs command"""
+    
+    id = models.PositiveIntegerField(primary_key=True, help_text="Id the job had while live")
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_jobs'
+    )
+    title = models.CharField(max_length=200)
+    category = models.CharField(max_length=20, choices=Job.CATEGORY_CHOICES)
+    description = models.TextField()
+    location = models.CharField(max_length=300)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    budget_min = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    budget_max = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    fixed_amount = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    urgency = models.CharField(max_length=10, choices=Job.URGENCY_CHOICES)
+    status = models.CharField(max_length=15, choices=Job.STATUS_CHOICES)
+    estimated_duration = models.PositiveIntegerField(null=True, blank=True)
+    requirements = models.TextField(blank=True)
+    responses_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.get_status_display()} (archived)"
+
+
+class ArchivedJobResponse(models.Model):
+    """Response to an archived job, moved along with it"""
+    
+    id = models.PositiveIntegerField(primary_key=True, help_text="Id the response had while live")
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='responses')
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_job_responses'
+    )
+    response_type = models.CharField(max_length=10, choices=JobResponse.RESPONSE_TYPE_CHOICES)
+    quote_amount = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    message = models.TextField(blank=True)
+    status = models.CharField(max_length=15, choices=JobResponse.STATUS_CHOICES)
+    estimated_completion_time = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['worker', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.worker_id} - {self.job_id} (archived)"
+
+
+class ArchivedAssignment(models.Model):
+    """
+    Assignment of an archived job, moved along with it. Transactions and
+    ratings keep referring to it by the id it had while live.
+    """
+    
+    id = models.PositiveIntegerField(primary_key=True, help_text="Id the assignment had while live")
+    job = models.OneToOneField(ArchivedJob, on_delete=models.CASCADE, related_name='assignment')
+    worker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_assignments'
+    )
+    job_response = models.OneToOneField(
+        ArchivedJobResponse,
+        on_delete=models.CASCADE,
+        related_name='assignment'
+    )
+    agreed_amount = models.DecimalField(max_digits=8, decimal_places=2)
+    status = models.CharField(max_length=15, choices=Assignment.STATUS_CHOICES)
+    assigned_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    cancellation_reason = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-assigned_at']
+        indexes = [
+            models.Index(fields=['worker', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} assigned to {self.worker_id} (archived)"
+
+
+class OutboxTask(models.Model):
+    """Side effect recorded with a write and run later by the run_outbox worker"""
+    
+    TASK_CHOICES = [
+        ('record_payment', 'Record Payment'),
+        ('refresh_average_rating', 'Refresh Average Rating'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=50, choices=TASK_CHOICES)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Not picked up before this time (retry back-off, or a running task's lease)"
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_task_display()} #{self.pk} ({self.status})"
+
+
+class LedgerEntry(models.Model):
+    """One line of a ledger posting; rows are only ever inserted (see jobs/ledger.py)"""
+    
+    ACCOUNT_CHOICES = [
+        ('customer', 'Customer'),
+        ('worker_pending', 'Worker (pending payout)'),
+        ('worker_paid', 'Worker (paid out)'),
+        ('platform_fee', 'Platform Fees'),
+    ]
+    
+    posting_id = models.CharField(max_length=20, help_text="Entries of one posting sum to zero")
+    account = models.CharField(max_length=20, choices=ACCOUNT_CHOICES)
+    # Plain references so history survives deletes of the user or transaction
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        null=True,
+        blank=True,
+        help_text="Account holder (empty for the platform account)"
+    )
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        null=True,
+        blank=True
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    memo = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['account', 'user', 'created_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['posting_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account}:{self.user_id or '-'} {self.amount:+}"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries cannot be changed; post a correcting entry instead.")
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries cannot be deleted; post a correcting entry instead.")
+
+
+class LedgerSnapshot(models.Model):
+    """Balance of one ledger account as of a checkpoint, written by snapshot_ledger"""
+    
+    account = models.CharField(max_length=20, choices=LedgerEntry.ACCOUNT_CHOICES)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        null=True,
+        blank=True
+    )
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+    as_of = models.DateTimeField(help_text="Covers every entry created at or before this time")
+    
+    class Meta:
+        ordering = ['-as_of']
+        indexes = [
+            models.Index(fields=['account', 'user', 'as_of']),
+            models.Index(fields=['as_of']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account}:{self.user_id or '-'} {self.balance} @ {self.as_of:%Y-%m-%d %H:%M}"
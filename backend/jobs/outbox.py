@@ -0,0 +1,156 @@
+"""
+Transactional outbox for side effects of a write.
+
+``enqueue()`` stores an OutboxTask row in the caller's transaction, so
+the task exists exactly when the write it belongs to commits. The
+``run_outbox`` management command drains the table in batches: each task
+is claimed with a compare-and-set UPDATE that also sets a lease (so
+several workers can run side by side, and a crashed worker's tasks are
+picked up again once the lease runs out), then run in its own
+transaction. Finished tasks are deleted; failures are retried with
+exponential back-off and kept as 'failed' after JOB_OUTBOX_MAX_ATTEMPTS.
+
+Handlers must be idempotent: a task can run more than once.
+With JOB_OUTBOX_EAGER the task also runs in-process as soon as the write
+commits, which is convenient when no worker is running (development).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def handler(task):
+    """Register the function that runs ``task``; it receives the payload"""
+    def register(func):
+        HANDLERS[task] = func
+        return func
+    return register
+
+
+def enqueue(task, payload):
+    """Record ``task`` in the current transaction and return it"""
+    from .models import OutboxTask
+
+    if task not in HANDLERS:
+        raise ValueError(f"Unknown outbox task: {task}")
+    outbox_task = OutboxTask.objects.create(task=task, payload=payload)
+    if _setting('JOB_OUTBOX_EAGER', False):
+        transaction.on_commit(lambda: run_tasks([outbox_task.pk]))
+    return outbox_task
+
+
+def claimable(now=None):
+    """Tasks that are due: pending ones, and running ones whose lease expired"""
+    from .models import OutboxTask
+
+    return OutboxTask.objects.filter(
+        status__in=['pending', 'running'], available_at__lte=now or timezone.now()
+    )
+
+
+def backoff_seconds(attempts):
+    base = _setting('JOB_OUTBOX_BACKOFF_SECONDS', 5)
+    return min(base * 2 ** (attempts - 1), _setting('JOB_OUTBOX_MAX_BACKOFF_SECONDS', 3600))
+
+
+def _claim(task, now):
+    """Take the lease on a task; False when another worker got it first"""
+    from .models import OutboxTask
+
+    lease = timedelta(seconds=_setting('JOB_OUTBOX_LEASE_SECONDS', 300))
+    return OutboxTask.objects.filter(
+        pk=task.pk, attempts=task.attempts, status__in=['pending', 'running']
+    ).update(status='running', attempts=F('attempts') + 1, available_at=now + lease) == 1
+
+
+def run_task(task):
+    """Claim and run one task; returns True when it ran successfully"""
+    from .models import OutboxTask
+
+    now = timezone.now()
+    if not _claim(task, now):
+        return False
+    task.attempts += 1
+
+    try:
+        with transaction.atomic():
+            HANDLERS[task.task](task.payload)
+            OutboxTask.objects.filter(pk=task.pk).delete()
+    except Exception as exc:
+        logger.exception("Outbox task %s #%s failed", task.task, task.pk)
+        if task.attempts >= _setting('JOB_OUTBOX_MAX_ATTEMPTS', 8):
+            changes = {'status': 'failed'}
+        else:
+            changes = {
+                'status': 'pending',
+                'available_at': timezone.now() + timedelta(seconds=backoff_seconds(task.attempts)),
+            }
+        OutboxTask.objects.filter(pk=task.pk).update(last_error=repr(exc)[:2000], **changes)
+        return False
+    return True
+
+
+def run_tasks(task_ids):
+    """Run the given tasks if they are still due"""
+    tasks = list(claimable().filter(pk__in=task_ids))
+    return sum(run_task(task) for task in tasks)
+
+
+def run_batch(batch_size=None):
+    """Run up to ``batch_size`` due tasks, oldest first; returns (ran, succeeded)"""
+    batch_size = batch_size or _setting('JOB_OUTBOX_BATCH_SIZE', 100)
+    tasks = list(claimable().order_by('available_at', 'id')[:batch_size])
+    succeeded = sum(run_task(task) for task in tasks)
+    return len(tasks), succeeded
+
+
+def run_worker(batch_size=None, poll_seconds=None, stop_after=None, stdout=None):
+    """
+    Drain the outbox until stopped. Sleeps ``poll_seconds`` whenever a
+    batch comes back empty; ``stop_after`` limits the run (seconds).
+    """
+    poll_seconds = poll_seconds if poll_seconds is not None else _setting('JOB_OUTBOX_POLL_SECONDS', 1)
+    deadline = time.monotonic() + stop_after if stop_after else None
+    while deadline is None or time.monotonic() < deadline:
+        ran, succeeded = run_batch(batch_size)
+        if ran and stdout is not None:
+            stdout.write(f"Ran {ran} tasks, {ran - succeeded} failed or skipped")
+        if not ran:
+            time.sleep(poll_seconds)
+
+
+# Task handlers
+
+@handler('record_payment')
+def record_payment_task(payload):
+    """Payment records for a completed assignment, unless it already has them"""
+    from .models import Assignment, Transaction
+    from .payments import record_payment
+
+    assignment = Assignment.objects.select_related('job', 'worker').filter(
+        pk=payload['assignment_id']
+    ).first()
+    if assignment is None or Transaction.objects.filter(assignment=assignment).exists():
+        return
+    record_payment(assignment)
+
+
+@handler('refresh_average_rating')
+def refresh_average_rating_task(payload):
+    # Ratings now refresh averages as they are saved; this drains tasks queued before
+    from .models import Rating
+
+    Rating.refresh_average_rating(payload['ratee_id'], payload['rating_type'])
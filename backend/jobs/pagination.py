@@ -0,0 +1,119 @@
+"""
+Pagination for list endpoints.
+
+Page-number pagination stays the default so existing clients keep working.
+Passing ``?cursor=`` (empty for the first page) switches a list endpoint to
+keyset mode: rows are ordered by the view's leading ordering field plus the
+primary key, and each page seeks past the last row of the previous one
+instead of counting and offsetting, so page N costs the same as page 1.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in (field, id) keyset cursor mode"""
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        keyset = self.get_keyset(queryset)
+        if keyset is None:
+            # Ordered by something we cannot seek on (e.g. distance)
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.keyset = keyset
+        field, descending = keyset
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            value, pk = self.decode_cursor(encoded, queryset.model, field)
+            lookup = 'lt' if descending else 'gt'
+            bound = 'lte' if descending else 'gte'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': value})
+                | Q(**{field: value, f'pk__{lookup}': pk}),
+                # Redundant range on the leading column so the planner
+                # seeks straight to the cursor position on its index
+                **{f'{field}__{bound}': value}
+            )
+
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}pk')
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_keyset(self, queryset):
+        """Return (field, descending) for the queryset's leading ordering, if seekable"""
+        if not hasattr(queryset, 'query'):
+            # Plain lists (e.g. cached feeds) are already ordered in memory
+            return None
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if not ordering or not isinstance(ordering[0], str):
+            return None
+
+        descending = ordering[0].startswith('-')
+        field = ordering[0].lstrip('-')
+        try:
+            model_field = queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            return None
+        if model_field.null or not model_field.concrete:
+            return None
+        return model_field.attname, descending
+
+    def encode_cursor(self, obj):
+        field, _ = self.keyset
+        value = getattr(obj, field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif not isinstance(value, (int, float, str)):
+            value = str(value)
+        payload = json.dumps([value, obj.pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, encoded, model, field):
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            value = model._meta.get_field(field).to_python(value)
+            pk = model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def get_next_link(self):
+        if self.keyset is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,47 @@
+"""
+Payment records for completed assignments.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import Earning, Transaction
+
+
+def platform_fee_rate():
+    return Decimal(getattr(settings, 'PLATFORM_FEE_RATE', '0.10'))
+
+
+def record_payment(assignment):
+    """
+    Create the pending payment Transaction and the worker's Earning for an
+    assignment. ``assignment.job`` and ``assignment.worker`` should already
+    be loaded.
+    """
+    job = assignment.job
+    gross_amount = assignment.agreed_amount
+    platform_fee = gross_amount * platform_fee_rate()
+    net_amount = gross_amount - platform_fee
+    
+    payment = Transaction.objects.create(
+        assignment=assignment,
+        worker=assignment.worker,
+        customer_id=job.customer_id,
+        transaction_type='payment',
+        amount=gross_amount,
+        platform_fee=platform_fee,
+        payment_method='online',
+        status='pending',
+        description=f'Payment for job: {job.title}'
+    )
+    Earning.objects.create(
+        worker=assignment.worker,
+        transaction=payment,
+        gross_amount=gross_amount,
+        platform_fee=platform_fee,
+        net_amount=net_amount,
+        final_amount=net_amount,
+        job_category=job.category,
+        job_duration_hours=assignment.duration_hours or 0
+    )
+    return payment
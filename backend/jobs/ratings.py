@@ -0,0 +1,134 @@
+"""
+Rating aggregates and the cached rating summary.
+
+RatingAggregate keeps running sums and counts of a user's ratings, per
+rating type, overall and for each criterion, plus a histogram of whole
+stars. Rating.save()/delete() adjust them by the rating's own
+contribution and copy the new average onto the profile, so writing a
+rating costs the same however many ratings the user already has. Ratings
+removed by a cascade (a deleted assignment or job) skip Rating.delete();
+``rebuild_aggregates()`` (the rebuild_rating_aggregates command)
+recomputes the rows from Rating.
+
+``rating_summary()`` serves the user rating summary endpoint from the
+cache. The version of a summary is read from the database: every rating
+write moves ``updated_at`` on the ratee's RatingAggregate rows, including
+writes that leave the totals alone (reviews, helpful counts). Entries
+are cached under that version, which doubles as the endpoint's ETag, so
+a write is seen by every process at once. A request costs one query
+for the version, plus two on a cache miss: the aggregate rows and the
+recent ratings.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+
+from .models import Rating, RatingAggregate
+
+RECENT_RATINGS = 10
+
+
+def aggregate_totals(rating_model, user_ids=None, histogram=False):
+    """
+    {(user_id, rating_type): {field: total}} computed from the ratings,
+    with the stars_N counts when ``histogram`` is set. The model is a
+    parameter so migrations can pass a historical one.
+    """
+    ratings = rating_model.objects.all()
+    if user_ids is not None:
+        ratings = ratings.filter(ratee_id__in=user_ids)
+    measures = {'rating_sum': Sum('rating'), 'rating_count': Count('pk')}
+    for criterion in RatingAggregate.CRITERIA:
+        measures[f'{criterion}_sum'] = Sum(f'{criterion}_rating')
+        measures[f'{criterion}_count'] = Count(f'{criterion}_rating')
+    for star in RatingAggregate.STARS if histogram else ():
+        # Same buckets as RatingAggregate.star_bucket()
+        bucket = Q() if star == RatingAggregate.STARS[0] else Q(rating__gte=star)
+        if star != RatingAggregate.STARS[-1]:
+            bucket &= Q(rating__lt=star + 1)
+        measures[f'stars_{star}'] = Count('pk', filter=bucket)
+    return {
+        (row.pop('ratee_id'), row.pop('rating_type')): {field: value or 0 for field, value in row.items()}
+        for row in ratings.order_by().values('ratee_id', 'rating_type').annotate(**measures)
+    }
+
+
+def rebuild_aggregates(user_ids=None):
+    """Recompute RatingAggregate rows and profile averages; returns the rows written"""
+    totals = aggregate_totals(Rating, user_ids, histogram=True)
+    aggregates = RatingAggregate.objects.all()
+    if user_ids is not None:
+        aggregates = aggregates.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        stale = set(aggregates.values_list('user_id', 'rating_type'))
+        aggregates.delete()
+        RatingAggregate.objects.bulk_create(
+            [
+                RatingAggregate(user_id=user_id, rating_type=rating_type, **fields)
+                for (user_id, rating_type), fields in totals.items()
+            ],
+            batch_size=1000,
+        )
+        for user_id, rating_type in stale | set(totals):
+            Rating.refresh_average_rating(user_id, rating_type)
+    return len(totals)
+
+
+def _data_key(user_id, version):
+    return f'ratings:summary:{user_id}:{version}'
+
+
+def summary_version(user_id):
+    """(version, last_modified) of a user's summary, from their RatingAggregate rows"""
+    stats = RatingAggregate.objects.filter(user_id=user_id).aggregate(
+        rows=Count('pk'), last_modified=Max('updated_at')
+    )
+    last_modified = stats['last_modified']
+    stamp = last_modified.timestamp() if last_modified else 0
+    return f"{stats['rows']}-{stamp}", last_modified
+
+
+def build_summary(user_id):
+    """The rating summary read from the database; None for an unknown user"""
+    from .serializers import RatingListSerializer
+
+    totals = RatingAggregate.objects.filter(user_id=user_id).aggregate(
+        **{field: Sum(field) for field in ('rating_sum', 'rating_count') + RatingAggregate.STAR_FIELDS}
+    )
+    count = totals['rating_count'] or 0
+    if not count:
+        if not get_user_model().objects.filter(pk=user_id).exists():
+            return None
+        return {
+            'average_rating': 0,
+            'total_ratings': 0,
+            'rating_distribution': {str(star): 0 for star in RatingAggregate.STARS},
+            'recent_ratings': [],
+        }
+
+    recent_ratings = Rating.objects.filter(ratee_id=user_id).select_related(
+        'rater', 'assignment__job'
+    ).order_by('-created_at')[:RECENT_RATINGS]
+    return {
+        'average_rating': round(totals['rating_sum'] / count, 2),
+        'total_ratings': count,
+        'rating_distribution': {
+            str(star): totals[f'stars_{star}'] or 0 for star in RatingAggregate.STARS
+        },
+        'recent_ratings': [dict(item) for item in RatingListSerializer(recent_ratings, many=True).data],
+    }
+
+
+def rating_summary(user_id):
+    """(version, summary) of a user, from the cache when possible"""
+    version, _ = summary_version(user_id)
+    key = _data_key(user_id, version)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(user_id)
+        if summary is not None:
+            cache.set(key, summary, getattr(settings, 'RATING_SUMMARY_CACHE_TIMEOUT', 300))
+    return version, summary
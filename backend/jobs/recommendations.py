@@ -0,0 +1,180 @@
+"""
+Ranked job recommendations for workers.
+
+The per-job features that do not depend on the worker are computed when
+the job is written and stored on it (Job.lat_rad, Job.lng_rad and
+Job.hourly_pay, next to the geohash). Candidates are pulled as a narrow
+``values_list`` projection of those columns (no model instances) into
+column-wise feature vectors; each scoring term is then computed column
+by column in plain Python and combined with the weights in
+JOB_RECOMMENDATION_WEIGHTS. Only the top results are loaded as models
+and serialized.
+"""
+import heapq
+import math
+import time
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+
+from .geo import EARTH_RADIUS_KM, boxes_at_precision, bounding_boxes, geohash_prefix_q
+from .models import Job, JobResponse
+
+DEFAULT_WEIGHTS = {
+    'skill': 3.0,
+    'distance': 2.0,
+    'urgency': 1.0,
+    'budget': 1.5,
+    'recency': 1.0,
+}
+
+URGENCY_SCORES = {'low': 0.25, 'medium': 0.5, 'high': 0.75, 'urgent': 1.0}
+
+# Score used when a feature cannot be computed (no coordinates, no rate...)
+NEUTRAL = 0.5
+
+FEATURE_FIELDS = ('id', 'category', 'lat_rad', 'lng_rad', 'urgency', 'hourly_pay', 'created_at')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class JobFeatures:
+    """Column-oriented feature vectors for a batch of candidate jobs"""
+
+    def __init__(self, rows):
+        columns = list(zip(*rows)) if rows else [()] * len(FEATURE_FIELDS)
+        ids, categories, lat_rad, lng_rad, urgencies, hourly_pay, created = columns
+
+        self.ids = list(ids)
+        self.categories = list(categories)
+        self.lat_rad = list(lat_rad)
+        self.lng_rad = list(lng_rad)
+        self.urgency = [URGENCY_SCORES.get(value, NEUTRAL) for value in urgencies]
+        self.hourly_pay = list(hourly_pay)
+        self.created_ts = [value.timestamp() for value in created]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(list(queryset.values_list(*FEATURE_FIELDS)))
+
+
+def hourly_pay(fixed_amount, budget_min, budget_max, duration):
+    """Implied pay per hour of a job, stored as Job.hourly_pay"""
+    amount = fixed_amount or budget_max or budget_min
+    if not amount or not duration:
+        return None
+    return float(amount) / duration
+
+
+def _distance_km(origin, lat_rad, lng_rad):
+    """Haversine over one column of coordinates (radians)"""
+    if origin is None:
+        return [None] * len(lat_rad)
+    origin_lat, origin_lng = map(math.radians, origin)
+    cos_origin = math.cos(origin_lat)
+    distances = []
+    for lat, lng in zip(lat_rad, lng_rad):
+        if lat is None or lng is None:
+            distances.append(None)
+            continue
+        a = (
+            math.sin((lat - origin_lat) / 2) ** 2
+            + cos_origin * math.cos(lat) * math.sin((lng - origin_lng) / 2) ** 2
+        )
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+    return distances
+
+
+def score_jobs(features, profile, origin=None, now=None):
+    """
+    Score every job in ``features`` for a worker profile.
+    Returns (scores, distances) as lists aligned with ``features.ids``.
+    """
+    weights = {**DEFAULT_WEIGHTS, **_setting('JOB_RECOMMENDATION_WEIGHTS', {})}
+    now = now or time.time()
+    distance_scale = _setting('JOB_RECOMMENDATION_DISTANCE_SCALE_KM', 10.0)
+    recency_half_life = _setting('JOB_RECOMMENDATION_RECENCY_HALF_LIFE_HOURS', 48.0) * 3600
+
+    skills = set(profile.skills or []) if profile else set()
+    hourly_rate = float(profile.hourly_rate or 0) if profile else 0.0
+    # Experienced workers are better matches for urgent work
+    experience = min(1.0, (profile.experience_years if profile else 0) / 5.0)
+
+    skill_scores = [1.0 if category in skills else 0.0 for category in features.categories]
+
+    distances = _distance_km(origin, features.lat_rad, features.lng_rad)
+    distance_scores = [
+        NEUTRAL if d is None else math.exp(-d / distance_scale) for d in distances
+    ]
+
+    urgency_scores = [value * (0.5 + 0.5 * experience) for value in features.urgency]
+
+    if hourly_rate > 0:
+        budget_scores = [
+            NEUTRAL if pay is None else min(1.0, pay / hourly_rate) for pay in features.hourly_pay
+        ]
+    else:
+        budget_scores = [NEUTRAL] * len(features)
+
+    decay = math.log(2) / recency_half_life
+    recency_scores = [math.exp(-max(0.0, now - ts) * decay) for ts in features.created_ts]
+
+    scores = [
+        weights['skill'] * s
+        + weights['distance'] * d
+        + weights['urgency'] * u
+        + weights['budget'] * b
+        + weights['recency'] * r
+        for s, d, u, b, r in zip(
+            skill_scores, distance_scores, urgency_scores, budget_scores, recency_scores
+        )
+    ]
+    return scores, distances
+
+
+def candidate_jobs(worker, origin=None):
+    """Open jobs the worker has not responded to, near ``origin`` when given"""
+    queryset = Job.objects.filter(status='open').filter(
+        ~Exists(JobResponse.objects.filter(worker=worker, job=OuterRef('pk')))
+    )
+    if origin is not None:
+        radius_km = _setting('JOB_RECOMMENDATION_RADIUS_KM', 25.0)
+        cells = boxes_at_precision(bounding_boxes(*origin, radius_km), precision=4, max_cells=16)
+        if cells:
+            # Jobs without coordinates can still be a good skill match
+            queryset = queryset.filter(geohash_prefix_q(cells) | Q(geohash=''))
+    limit = _setting('JOB_RECOMMENDATION_MAX_CANDIDATES', 3000)
+    return queryset.order_by('-created_at')[:limit]
+
+
+def recommend_jobs(worker, profile, origin=None, limit=20):
+    """
+    Return up to ``limit`` jobs, best first, annotated with
+    ``recommendation_score`` and ``distance_km``. ``origin`` is a
+    (lat, lng) pair; the profile location is used when omitted.
+    """
+    if origin is None and profile and profile.latitude is not None and profile.longitude is not None:
+        origin = (float(profile.latitude), float(profile.longitude))
+
+    features = JobFeatures.from_queryset(candidate_jobs(worker, origin))
+    if not len(features):
+        return []
+
+    scores, distances = score_jobs(features, profile, origin)
+    top = heapq.nlargest(limit, range(len(features)), key=scores.__getitem__)
+
+    jobs = Job.objects.select_related('customer').in_bulk([features.ids[i] for i in top])
+    results = []
+    for i in top:
+        job = jobs.get(features.ids[i])
+        if job is None:
+            continue
+        job.distance_km = distances[i]
+        job.recommendation_score = round(scores[i], 4)
+        results.append(job)
+    return results
@@ -0,0 +1,50 @@
+"""
+Per-worker cache of the jobs a worker has responded to.
+
+The set is stored as a frozenset of job ids, so membership checks are
+O(1) and one cache entry, sized by the worker's own history, covers all
+of it. Writes invalidate the entry; the next read rebuilds it with a
+single index-only scan over (worker, job).
+
+Invalidation only reaches other processes through a shared cache, so
+JOB_FEED_RESPONDED_CACHE is off by default unless REDIS_URL is set; the
+ids are then read once per request instead.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import JobResponse
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(worker_id):
+    return f'jobs:responded:{worker_id}'
+
+
+def is_enabled():
+    return getattr(settings, 'JOB_FEED_RESPONDED_CACHE', False)
+
+
+def _load(worker_id):
+    return frozenset(
+        JobResponse.objects.filter(worker_id=worker_id)
+        .values_list('job_id', flat=True).iterator(chunk_size=5000)
+    )
+
+
+def get_responded_ids(worker_id):
+    """Return the ids of the jobs the worker responded to, from the cache when enabled"""
+    if not is_enabled():
+        return _load(worker_id)
+    key = _cache_key(worker_id)
+    job_ids = cache.get(key)
+    if job_ids is None:
+        job_ids = _load(worker_id)
+        cache.set(key, job_ids, CACHE_TIMEOUT)
+    return job_ids
+
+
+def invalidate(worker_id):
+    """Drop the cached ids after the worker's responses change"""
+    cache.delete(_cache_key(worker_id))
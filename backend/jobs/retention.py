@@ -0,0 +1,147 @@
+"""
+Expiry and archival of old jobs.
+
+``expire_stale_jobs`` closes open jobs older than JOB_OPEN_TTL_DAYS:
+the jobs move to 'expired' and their pending responses are rejected,
+with one UPDATE per statement per chunk rather than a save() per row.
+
+``archive_jobs`` moves terminal jobs untouched for JOB_ARCHIVE_AFTER_DAYS
+into ArchivedJob / ArchivedJobResponse / ArchivedAssignment, chunk by
+chunk, so the live tables only hold jobs that can still change.
+Transactions (with their payments and earnings) and ratings stay live
+and keep the assignment id, which ArchivedAssignment keeps as well.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import analytics, events, feed_cache
+from .models import (
+    ArchivedAssignment, ArchivedJob, ArchivedJobResponse, Assignment, Job, JobResponse, SyncTombstone,
+)
+from .search import get_search_backend
+
+ARCHIVED_JOB_FIELDS = [
+    field.attname for field in ArchivedJob._meta.concrete_fields if field.name != 'archived_at'
+]
+ARCHIVED_RESPONSE_FIELDS = [
+    field.attname for field in ArchivedJobResponse._meta.concrete_fields if field.name != 'archived_at'
+]
+ARCHIVED_ASSIGNMENT_FIELDS = [
+    field.attname for field in ArchivedAssignment._meta.concrete_fields if field.name != 'archived_at'
+]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _chunks(queryset, batch_size):
+    """Yield lists of ids from ``queryset`` until it no longer matches anything"""
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield ids
+
+
+def stale_open_jobs(ttl_days=None):
+    ttl_days = _setting('JOB_OPEN_TTL_DAYS', 30) if ttl_days is None else ttl_days
+    return Job.objects.filter(status='open', created_at__lt=timezone.now() - timedelta(days=ttl_days))
+
+
+def expire_stale_jobs(ttl_days=None, batch_size=500):
+    """Expire open jobs past their TTL; returns (jobs expired, responses rejected)"""
+    expired = rejected = 0
+    for ids in _chunks(stale_open_jobs(ttl_days), batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = Job.objects.select_for_update().filter(id__in=ids, status='open')
+            rows = list(jobs.values_list('id', 'customer_id', 'geohash', 'category', 'created_at', 'location'))
+            if not rows:
+                continue
+            job_ids = [row[0] for row in rows]
+            pending = JobResponse.objects.filter(job_id__in=job_ids, status='pending')
+            rejected_rows = list(pending.values_list('job_id', 'worker_id'))
+            
+            Job.objects.filter(id__in=job_ids).update(
+                status='expired', pending_responses_count=0,
+                version=F('version') + 1, updated_at=now
+            )
+            pending.update(status='rejected', updated_at=now)
+            
+            feed_cache.invalidate_job(*[(geohash, category) for _, _, geohash, category, _, _ in rows])
+            analytics.move_jobs(
+                [(created_at, category, location, 'open') for _, _, _, category, created_at, location in rows],
+                'expired'
+            )
+            events.publish_many(
+                [('job_status_changed', {'job_id': job_id, 'status': 'expired'}, [customer_id], '')
+                 for job_id, customer_id, _, _, _, _ in rows]
+                + [('response_rejected', {'job_id': job_id}, [worker_id], '')
+                   for job_id, worker_id in rejected_rows]
+            )
+        expired += len(rows)
+        rejected += len(rejected_rows)
+    return expired, rejected
+
+
+def archivable_jobs(after_days=None):
+    after_days = _setting('JOB_ARCHIVE_AFTER_DAYS', 90) if after_days is None else after_days
+    return Job.objects.filter(
+        status__in=Job.TERMINAL_STATUSES,
+        updated_at__lt=timezone.now() - timedelta(days=after_days),
+    )
+
+
+def archive_jobs(after_days=None, batch_size=500):
+    """Move archivable jobs, their responses and assignments to the archive; returns jobs moved"""
+    moved = 0
+    for ids in _chunks(archivable_jobs(after_days), batch_size):
+        with transaction.atomic():
+            jobs = list(
+                archivable_jobs(after_days).select_for_update()
+                .filter(id__in=ids).values(*ARCHIVED_JOB_FIELDS)
+            )
+            if not jobs:
+                continue
+            job_ids = [job['id'] for job in jobs]
+            responses = list(
+                JobResponse.objects.filter(job_id__in=job_ids).values(*ARCHIVED_RESPONSE_FIELDS)
+            )
+            assignments = list(
+                Assignment.objects.filter(job_id__in=job_ids).values(*ARCHIVED_ASSIGNMENT_FIELDS)
+            )
+            
+            ArchivedJob.objects.bulk_create([ArchivedJob(**job) for job in jobs])
+            ArchivedJobResponse.objects.bulk_create(
+                [ArchivedJobResponse(**response) for response in responses]
+            )
+            ArchivedAssignment.objects.bulk_create(
+                [ArchivedAssignment(**assignment) for assignment in assignments]
+            )
+            
+            # Sync clients drop the rows; history is read from the archive
+            customers = {job['id']: job['customer_id'] for job in jobs}
+            workers = {}
+            for response in responses:
+                workers.setdefault(response['job_id'], []).append(response['worker_id'])
+            SyncTombstone.record(
+                [('job', job_id, [customers[job_id], *workers.get(job_id, [])]) for job_id in job_ids]
+                + [('response', response['id'], [customers[response['job_id']], response['worker_id']])
+                   for response in responses]
+                + [('assignment', assignment['id'], [customers[assignment['job_id']], assignment['worker_id']])
+                   for assignment in assignments]
+            )
+            
+            # A plain DELETE, not the collector: cascading would also delete
+            # the transactions and ratings, which stay with the assignment id
+            Assignment.objects.filter(job_id__in=job_ids)._raw_delete(Assignment.objects.db)
+            # Bulk delete: skips Job.delete(), whose per-row bookkeeping is done here
+            Job.objects.filter(id__in=job_ids).delete()
+            get_search_backend().remove_jobs(job_ids)
+        moved += len(job_ids)
+    return moved
@@ -0,0 +1,215 @@
+"""
+Full-text search over jobs.
+
+Each database gets its own inverted index, kept in a side table next to
+``jobs_job`` and updated whenever a Job's text fields are saved:
+
+- PostgreSQL: ``jobs_job_search`` holds a weighted tsvector per job with a
+  GIN index, queried with ``websearch_to_tsquery`` and ranked by
+  ``ts_rank_cd``.
+- SQLite: ``jobs_job_fts`` is an FTS5 table keyed by job id, queried with
+  MATCH and ranked by ``bm25``.
+
+Any other database (or a SQLite build without FTS5) falls back to
+``icontains`` filters, so callers never need to care which one is active.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Text fields that feed the index, most important first
+INDEXED_FIELDS = ('title', 'location', 'description', 'requirements')
+
+POSTGRES_TABLE = 'jobs_job_search'
+SQLITE_TABLE = 'jobs_job_fts'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class BaseSearchBackend:
+    """Substring matching; used when no full-text index is available"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index_job(self, job):
+        pass
+
+    def index_jobs(self, jobs):
+        for job in jobs:
+            self.index_job(job)
+
+    def remove_job(self, job_id):
+        pass
+
+    def remove_jobs(self, job_ids):
+        for job_id in job_ids:
+            self.remove_job(job_id)
+
+    def matching_ids(self, query):
+        """Return an expression usable as ``id__in`` for jobs matching ``query``"""
+        return None
+
+    def rank_expression(self, query, table):
+        return Value(0.0, output_field=FloatField())
+
+    def search(self, queryset, query):
+        """Filter ``queryset`` to jobs matching ``query``, annotated with ``search_rank``"""
+        condition = Q()
+        for term in _TOKEN_RE.findall(query):
+            term_match = Q()
+            for field in INDEXED_FIELDS:
+                term_match |= Q(**{f'{field}__icontains': term})
+            condition &= term_match
+        return queryset.filter(condition).annotate(
+            search_rank=self.rank_expression(query, queryset.model._meta.db_table)
+        )
+
+
+class IndexedSearchBackend(BaseSearchBackend):
+    """Shared plumbing for backends that maintain a side-table index"""
+
+    table = None
+
+    def is_installed(self):
+        if not hasattr(self, '_installed'):
+            self._installed = self.table in self.connection.introspection.table_names()
+        return self._installed
+
+    def search(self, queryset, query):
+        ids = self.matching_ids(query)
+        if ids is None:
+            return queryset.none().annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+        return queryset.filter(id__in=ids).annotate(
+            search_rank=self.rank_expression(query, queryset.model._meta.db_table)
+        )
+
+
+class PostgresSearchBackend(IndexedSearchBackend):
+    table = POSTGRES_TABLE
+    config = 'english'
+
+    document_sql = (
+        "setweight(to_tsvector(%(config)s, coalesce(%%s, '')), 'A') || "
+        "setweight(to_tsvector(%(config)s, coalesce(%%s, '')), 'B') || "
+        "setweight(to_tsvector(%(config)s, coalesce(%%s, '')), 'C') || "
+        "setweight(to_tsvector(%(config)s, coalesce(%%s, '')), 'D')"
+    )
+
+    def _document(self):
+        return self.document_sql % {'config': f"'{self.config}'"}
+
+    def index_job(self, job):
+        self.index_jobs([job])
+
+    def index_jobs(self, jobs):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (job_id, document) VALUES (%s, {self._document()}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                [[job.pk] + [getattr(job, field) for field in INDEXED_FIELDS] for job in jobs],
+            )
+
+    def remove_job(self, job_id):
+        self.remove_jobs([job_id])
+
+    def remove_jobs(self, job_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE job_id = %s", [[job_id] for job_id in job_ids])
+
+    def matching_ids(self, query):
+        return RawSQL(
+            f"SELECT job_id FROM {self.table} "
+            f"WHERE document @@ websearch_to_tsquery('{self.config}', %s)",
+            [query],
+        )
+
+    def rank_expression(self, query, table):
+        return RawSQL(
+            f"SELECT ts_rank_cd(document, websearch_to_tsquery('{self.config}', %s)) "
+            f"FROM {self.table} WHERE job_id = {table}.id",
+            [query],
+            output_field=FloatField(),
+        )
+
+
+class SQLiteSearchBackend(IndexedSearchBackend):
+    table = SQLITE_TABLE
+
+    # bm25 column weights, in INDEXED_FIELDS order
+    weights = (10.0, 5.0, 1.0, 1.0)
+
+    def index_job(self, job):
+        self.index_jobs([job])
+
+    def index_jobs(self, jobs):
+        columns = ', '.join(INDEXED_FIELDS)
+        placeholders = ', '.join(['%s'] * len(INDEXED_FIELDS))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [[job.pk] for job in jobs])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {columns}) VALUES (%s, {placeholders})",
+                [[job.pk] + [getattr(job, field) or '' for field in INDEXED_FIELDS] for job in jobs],
+            )
+
+    def remove_job(self, job_id):
+        self.remove_jobs([job_id])
+
+    def remove_jobs(self, job_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [[job_id] for job_id in job_ids])
+
+    @staticmethod
+    def to_match_expression(query):
+        """Turn free text into an FTS5 query: every term must match, as a prefix"""
+        terms = _TOKEN_RE.findall(query)
+        if not terms:
+            return None
+        return ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def matching_ids(self, query):
+        match = self.to_match_expression(query)
+        if match is None:
+            return None
+        return RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match])
+
+    def rank_expression(self, query, table):
+        match = self.to_match_expression(query)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        # bm25() is lower-is-better; negate so higher ranks sort first everywhere
+        return RawSQL(
+            f"SELECT -bm25({self.table}, {weights}) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND rowid = {table}.id",
+            [match],
+            output_field=FloatField(),
+        )
+
+
+_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using=None):
+    """Return the search backend for the database holding jobs"""
+    from .models import Job
+
+    connection = connections[using or router.db_for_write(Job)]
+    backend = getattr(connection, '_job_search_backend', None)
+    if backend is None:
+        backend_class = _BACKENDS.get(connection.vendor)
+        backend = backend_class(connection) if backend_class else None
+        if backend is None or not backend.is_installed():
+            backend = BaseSearchBackend(connection)
+        connection._job_search_backend = backend
+    return backend
+
+
+def search_jobs(queryset, query):
+    """Filter a Job queryset by a free-text query, annotating ``search_rank``"""
+    return get_search_backend(queryset.db).search(queryset, query)
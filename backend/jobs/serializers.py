@@ -1,18 +1,76 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Job, JobResponse, Assignment, Transaction, Payment, Earning, Rating, RatingHelpful
+from .models import (
+    Job, JobResponse, Assignment, Transaction, Payment, Earning, Rating, RatingHelpful,
+    ArchivedJob, ArchivedJobResponse,
+)
+from . import responded
 
 User = get_user_model()
 
 
-class JobSerializer(serializers.ModelSerializer):
+def _field_names(value):
+    """Parse a ``fields`` / ``expand`` value: comma-separated string or list"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return {name.strip() for name in value if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets for ModelSerializers. ``?fields=a,b`` limits the output
+    to those fields; fields listed in ``Meta.expandable_fields`` (nested,
+    expensive) are left out unless named in ``?fields=`` or ``?expand=``.
+    Only the top-level serializer of a GET reads the query string; both can
+    also be passed as ``fields=`` / ``expand=`` keyword arguments.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+        
+        request = self.context.get('request')
+        if request is not None and request.method == 'GET':
+            if fields is None:
+                fields = request.query_params.get('fields')
+            if expand is None:
+                expand = request.query_params.get('expand')
+        
+        selected = set(self.selected_fields(fields, expand))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+    
+    @classmethod
+    def selected_fields(cls, fields=None, expand=None):
+        """Names of the fields serialized for the given fields/expand values"""
+        fields = _field_names(fields)
+        expand = _field_names(expand) or set()
+        expandable = getattr(cls.Meta, 'expandable_fields', ())
+        return [
+            name for name in cls.Meta.fields
+            if name in expand or (name in fields if fields is not None else name not in expandable)
+        ]
+
+
+class JobBulkCreateSerializer(serializers.ListSerializer):
+    """Creates a validated batch of jobs with a single bulk insert"""
+    
+    def create(self, validated_data):
+        customer = self.context['request'].user
+        return Job.create_many([Job(customer=customer, **item) for item in validated_data])
+
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Job model"""
     
     customer_name = serializers.CharField(source='customer.username', read_only=True)
     customer_email = serializers.CharField(source='customer.email', read_only=True)
     budget_display = serializers.CharField(read_only=True)
     is_budget_range = serializers.BooleanField(read_only=True)
-    responses_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Job
@@ -21,13 +79,13 @@ class JobSerializer(serializers.ModelSerializer):
             'description', 'location', 'latitude', 'longitude', 'budget_min', 
             'budget_max', 'fixed_amount', 'budget_display', 'is_budget_range',
             'urgency', 'status', 'estimated_duration', 'requirements', 
-            'responses_count', 'created_at', 'updated_at'
+            'responses_count', 'pending_responses_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'customer', 'created_at', 'updated_at']
-    
-    def get_responses_count(self, obj):
-        """Get count of responses for this job"""
-        return obj.responses.count()
+        read_only_fields = [
+            'id', 'customer', 'responses_count', 'pending_responses_count',
+            'created_at', 'updated_at'
+        ]
+        list_serializer_class = JobBulkCreateSerializer
     
     def validate(self, data):
         """Custom validation for job data"""
@@ -60,20 +118,17 @@ class JobListSerializer(serializers.ModelSerializer):
     
     customer_name = serializers.CharField(source='customer.username', read_only=True)
     budget_display = serializers.CharField(read_only=True)
-    responses_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Job
         fields = [
             'id', 'customer_name', 'title', 'category', 'location', 
-            'budget_display', 'urgency', 'status', 'responses_count', 'created_at'
+            'budget_display', 'urgency', 'status', 'responses_count',
+            'pending_responses_count', 'created_at'
         ]
-    
-    def get_responses_count(self, obj):
-        return obj.responses.count()
 
 
-class JobResponseSerializer(serializers.ModelSerializer):
+class JobResponseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for JobResponse model"""
     
     worker_name = serializers.CharField(source='worker.username', read_only=True)
@@ -110,7 +165,7 @@ class JobResponseSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Assignment model"""
     
     job_title = serializers.CharField(source='job.title', read_only=True)
@@ -142,6 +197,46 @@ class JobDetailSerializer(JobSerializer):
         fields = JobSerializer.Meta.fields + ['responses', 'assignment']
 
 
+class CustomerJobListSerializer(JobDetailSerializer):
+    """Customer's job list: responses and assignment only on ?expand="""
+    
+    class Meta(JobDetailSerializer.Meta):
+        expandable_fields = ['responses', 'assignment']
+
+
+class ArchivedJobResponseSerializer(serializers.ModelSerializer):
+    """Serializer for responses to archived jobs"""
+    
+    worker_name = serializers.CharField(source='worker.username', read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+    
+    class Meta:
+        model = ArchivedJobResponse
+        fields = [
+            'id', 'job', 'job_title', 'worker', 'worker_name', 'response_type',
+            'quote_amount', 'message', 'status', 'estimated_completion_time',
+            'created_at', 'updated_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
+
+class ArchivedJobSerializer(serializers.ModelSerializer):
+    """Read-only serializer for archived jobs and their responses"""
+    
+    customer_name = serializers.CharField(source='customer.username', read_only=True)
+    responses = ArchivedJobResponseSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = ArchivedJob
+        fields = [
+            'id', 'customer', 'customer_name', 'title', 'category', 'description',
+            'location', 'latitude', 'longitude', 'budget_min', 'budget_max',
+            'fixed_amount', 'urgency', 'status', 'estimated_duration', 'requirements',
+            'responses_count', 'responses', 'created_at', 'updated_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
+
 class WorkerJobListSerializer(serializers.ModelSerializer):
     """Serializer for jobs list from worker perspective"""
     
@@ -159,24 +254,38 @@ class WorkerJobListSerializer(serializers.ModelSerializer):
         ]
     
     def get_distance(self, obj):
-        """Calculate distance from worker location (placeholder)"""
-        # TODO: Implement actual distance calculation in Phase 3
-        return "2.5 km"
+        """Distance from the worker's search origin (annotated by the view)"""
+        distance_km = getattr(obj, 'distance_km', None)
+        if distance_km is None:
+            return None
+        return f"{distance_km:.1f} km"
     
     def get_has_responded(self, obj):
         """Check if current user has responded to this job"""
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
-            return obj.responses.filter(worker=request.user).exists()
+            # Fetch the ids once per serialization, not once per row
+            if getattr(self, '_responded_ids', None) is None:
+                self._responded_ids = responded.get_responded_ids(request.user.id)
+            return obj.id in self._responded_ids
         return False
 
 
+class RecommendedJobSerializer(WorkerJobListSerializer):
+    """Worker job listing with the recommendation score"""
+    
+    score = serializers.FloatField(source='recommendation_score', read_only=True)
+    
+    class Meta(WorkerJobListSerializer.Meta):
+        fields = WorkerJobListSerializer.Meta.fields + ['score']
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for Transaction model"""
     
     worker_name = serializers.CharField(source='worker.username', read_only=True)
     customer_name = serializers.CharField(source='customer.username', read_only=True)
-    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True)
+    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True, allow_null=True)
     
     class Meta:
         model = Transaction
@@ -242,7 +351,7 @@ class RatingSerializer(serializers.ModelSerializer):
     
     rater_name = serializers.CharField(source='rater.username', read_only=True)
     ratee_name = serializers.CharField(source='ratee.username', read_only=True)
-    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True)
+    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True, allow_null=True)
     can_rate = serializers.SerializerMethodField()
     
     class Meta:
@@ -263,7 +372,12 @@ class RatingSerializer(serializers.ModelSerializer):
             return False
         
         # User can rate if they are either the customer or worker in the assignment
-        assignment = obj.assignment
+        try:
+            assignment = obj.assignment
+        except Assignment.DoesNotExist:
+            assignment = None
+        if assignment is None:  # archived with its job
+            return False
         return request.user in [assignment.job.customer, assignment.worker]
     
     def validate(self, data):
@@ -351,7 +465,7 @@ class RatingListSerializer(serializers.ModelSerializer):
     """Simplified serializer for rating lists"""
     
     rater_name = serializers.CharField(source='rater.username', read_only=True)
-    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True)
+    assignment_job_title = serializers.CharField(source='assignment.job.title', read_only=True, allow_null=True)
     
     class Meta:
         model = Rating
@@ -0,0 +1,168 @@
+"""
+Batch payout settlement.
+
+``settle_pending()`` pays workers for their pending transactions, a batch
+of workers at a time, with a constant number of statements per batch:
+
+1. create one 'processing' Payout per worker, move the workers' pending
+   transactions to 'processing' and attach them to their payout with a
+   single UPDATE, then total the payouts from what was actually claimed;
+2. hand the payouts to the gateway, outside any database transaction;
+3. record the outcome: completed payouts get a Payment row per
+   transaction (bulk_create), their transactions become 'completed' and
+   the amounts move from worker_pending to worker_paid in the ledger;
+   failed payouts release their transactions back to 'pending' for the
+   next run.
+
+The gateway is pluggable through PAYOUT_GATEWAY (a dotted path). The
+default LocalPayoutGateway pays everything and stands in for a real
+provider in development and tests.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import ledger
+from .ids import new_id
+from .models import Payment, Payout, Transaction
+
+PayoutResult = namedtuple('PayoutResult', ['ok', 'reference', 'error'])
+
+
+class LocalPayoutGateway:
+    """Stand-in gateway that accepts every payout"""
+
+    name = 'local'
+    payment_method = 'bank_transfer'
+
+    def send(self, payouts):
+        """Return {payout_id: PayoutResult} for a batch of payouts"""
+        return {
+            payout.pk: PayoutResult(ok=True, reference=f'LOCAL-{new_id()}', error='')
+            for payout in payouts
+        }
+
+
+def get_gateway():
+    path = getattr(settings, 'PAYOUT_GATEWAY', 'jobs.settlement.LocalPayoutGateway')
+    return import_string(path)()
+
+
+def _claim(worker_ids, gateway):
+    """Create payouts for ``worker_ids`` and attach their pending transactions"""
+    with transaction.atomic():
+        payouts = Payout.objects.bulk_create([
+            Payout(worker_id=worker_id, gateway=gateway.name) for worker_id in worker_ids
+        ])
+        payout_for_worker = Case(
+            *[When(worker_id=payout.worker_id, then=Value(payout.pk)) for payout in payouts],
+            output_field=IntegerField(),
+        )
+        Transaction.objects.filter(worker_id__in=worker_ids, status='pending').update(
+            status='processing', payout_id=payout_for_worker, updated_at=timezone.now()
+        )
+
+        totals = {
+            row['payout']: row
+            for row in Transaction.objects.filter(payout__in=payouts, status='processing')
+            .order_by().values('payout').annotate(total=Sum(ledger.worker_amount()), count=Count('pk'))
+        }
+        claimed, empty = [], []
+        for payout in payouts:
+            row = totals.get(payout.pk)
+            if row is None or row['total'] <= 0:
+                # Nothing left to pay: another run claimed it, or deductions outweigh earnings
+                empty.append(payout.pk)
+                continue
+            payout.amount, payout.transaction_count = row['total'], row['count']
+            claimed.append(payout)
+        Payout.objects.bulk_update(claimed, ['amount', 'transaction_count'])
+        Transaction.objects.filter(payout__in=empty).update(status='pending', payout=None)
+        Payout.objects.filter(pk__in=empty).delete()
+    return claimed
+
+
+def _record(payouts, results, gateway):
+    """Apply gateway results to payouts, their transactions and the ledger"""
+    now = timezone.now()
+    succeeded, failed = [], []
+    for payout in payouts:
+        result = results.get(payout.pk) or PayoutResult(False, '', 'No response from gateway')
+        payout.reference = result.reference or ''
+        if result.ok:
+            payout.status, payout.completed_at = 'completed', now
+            succeeded.append(payout)
+        else:
+            payout.status, payout.failure_reason = 'failed', result.error or 'Payout failed'
+            failed.append(payout)
+
+    with transaction.atomic():
+        Payout.objects.bulk_update(payouts, ['status', 'reference', 'completed_at', 'failure_reason'])
+
+        reference_for = {payout.pk: payout.reference for payout in succeeded}
+        settled = Transaction.objects.filter(payout__in=succeeded, status='processing')
+        Payment.objects.bulk_create(
+            [
+                Payment(
+                    transaction_id=transaction_id,
+                    payment_method=gateway.payment_method,
+                    payment_gateway=gateway.name,
+                    gateway_transaction_id=reference_for[payout_id],
+                    status='completed',
+                    completed_at=now,
+                )
+                for transaction_id, payout_id in settled.values_list('pk', 'payout_id').iterator()
+            ],
+            batch_size=1000,
+        )
+        settled.update(status='completed', processed_at=now, updated_at=now)
+        Transaction.objects.filter(payout__in=failed, status='processing').update(
+            status='pending', payout=None, updated_at=now
+        )
+
+        # The UPDATEs above bypass Transaction.save(), so post the ledger here
+        ledger.post_many([
+            (
+                {
+                    (ledger.WORKER_PENDING, payout.worker_id): -payout.amount,
+                    (ledger.WORKER_PAID, payout.worker_id): payout.amount,
+                },
+                None,
+                f'payout {payout.pk}',
+            )
+            for payout in succeeded
+        ])
+    return succeeded, failed
+
+
+def settle_pending(batch_size=None, gateway=None):
+    """
+    Settle every worker with pending transactions; returns
+    (payouts completed, payouts failed, transactions settled).
+    """
+    batch_size = batch_size or getattr(settings, 'PAYOUT_BATCH_WORKERS', 1000)
+    gateway = gateway or get_gateway()
+    completed = failed = settled = 0
+    last_worker_id = 0
+
+    while True:
+        worker_ids = list(
+            Transaction.objects.filter(status='pending', worker_id__gt=last_worker_id)
+            .order_by('worker_id').values_list('worker_id', flat=True).distinct()[:batch_size]
+        )
+        if not worker_ids:
+            break
+        last_worker_id = worker_ids[-1]
+
+        payouts = _claim(worker_ids, gateway)
+        if not payouts:
+            continue
+        succeeded, rejected = _record(payouts, gateway.send(payouts), gateway)
+        completed += len(succeeded)
+        failed += len(rejected)
+        settled += sum(payout.transaction_count for payout in succeeded)
+    return completed, failed, settled
@@ -0,0 +1,174 @@
+"""
+Delta sync for the customer and worker portals.
+
+``GET /api/sync/`` returns everything visible to the caller (jobs,
+responses, assignments, transactions and ratings) together with a token.
+Sending that token back as ``?since=`` returns only rows whose
+``updated_at`` moved past it, read through the (owner, updated_at)
+indexes, plus the ids of objects deleted since then (SyncTombstone rows).
+
+Tokens hold a cursor per collection (and one for tombstones). A
+collection that was read to the end gets the time the sync started; rows
+are re-read from JOB_SYNC_OVERLAP_SECONDS before that moment so writes
+still in flight when the token was issued are not missed, and clients
+apply rows as upserts, so an occasional repeat is harmless. When a
+collection has more than JOB_SYNC_MAX_ROWS changes the response sets
+``has_more`` and its cursor is the (updated_at, id) of the last row sent,
+so the next page continues exactly after it even when many rows share
+one timestamp.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Assignment, Job, JobResponse, Rating, SyncTombstone, Transaction
+from .serializers import (
+    AssignmentSerializer, JobResponseSerializer, JobSerializer, RatingSerializer,
+    TransactionSerializer,
+)
+
+# Collection name -> tombstone kind
+COLLECTIONS = {
+    'jobs': 'job',
+    'responses': 'response',
+    'assignments': 'assignment',
+    'transactions': 'transaction',
+    'ratings': 'rating',
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# Cursor name of the tombstone stream
+DELETED = 'deleted'
+
+
+def encode_token(cursors):
+    """Encode {name: (moment, last_id)} cursors; last_id is None for a caught-up collection"""
+    payload = json.dumps(
+        {name: [moment.isoformat(), last_id] for name, (moment, last_id) in cursors.items()},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Return {name: (moment, last_id)}; raises ValueError for a malformed token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if isinstance(payload, list):
+            # Tokens issued before per-collection cursors: [moment, exact]
+            payload = {name: [payload[0], None] for name in [*COLLECTIONS, DELETED]}
+        cursors = {}
+        for name, (moment, last_id) in payload.items():
+            if name not in COLLECTIONS and name != DELETED:
+                raise ValueError(name)
+            if last_id is not None and not isinstance(last_id, int):
+                raise ValueError(last_id)
+            cursors[name] = (datetime.fromisoformat(moment), last_id)
+        return cursors
+    except (AttributeError, TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid sync token')
+
+
+def visible_collections(user):
+    """(queryset, serializer class) per collection, limited to what ``user`` can see"""
+    if user.user_type == 'customer':
+        jobs = Job.objects.filter(customer=user)
+        responses = JobResponse.objects.filter(job__customer=user)
+        assignments = Assignment.objects.filter(job__customer=user)
+        transactions = Transaction.objects.filter(customer=user)
+    elif user.user_type == 'worker':
+        # The open-jobs feed has its own endpoints; sync covers jobs the worker is part of
+        jobs = Job.objects.filter(
+            Exists(JobResponse.objects.filter(worker=user, job=OuterRef('pk')))
+        )
+        responses = JobResponse.objects.filter(worker=user)
+        assignments = Assignment.objects.filter(worker=user)
+        transactions = Transaction.objects.filter(worker=user)
+    else:
+        return {}
+
+    return {
+        'jobs': (jobs.select_related('customer'), JobSerializer),
+        'responses': (responses.select_related('worker', 'job'), JobResponseSerializer),
+        'assignments': (
+            assignments.select_related('job', 'worker', 'job__customer'), AssignmentSerializer
+        ),
+        'transactions': (
+            transactions.select_related('worker', 'customer', 'assignment__job'),
+            TransactionSerializer,
+        ),
+        'ratings': (
+            Rating.objects.filter(Q(rater=user) | Q(ratee=user)).select_related(
+                'rater', 'ratee', 'assignment__job'
+            ),
+            RatingSerializer,
+        ),
+    }
+
+
+def _page(queryset, field, cursor, started, limit):
+    """
+    Rows of ``queryset`` past ``cursor`` in (field, id) order, at most
+    ``limit`` of them, and the cursor the next page starts from.
+    """
+    if cursor is not None:
+        moment, last_id = cursor
+        if last_id is None:
+            overlap = timedelta(seconds=_setting('JOB_SYNC_OVERLAP_SECONDS', 5))
+            queryset = queryset.filter(**{f'{field}__gte': moment - overlap})
+        else:
+            queryset = queryset.filter(
+                Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': last_id})
+            )
+    rows = list(queryset.order_by(field, 'id')[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (getattr(rows[-1], field), rows[-1].id)
+    return rows, (started, None)
+
+
+def collect_changes(user, token=None):
+    """Build the sync response for ``user`` from an optional ``since`` token"""
+    started = timezone.now()
+    limit = _setting('JOB_SYNC_MAX_ROWS', 500)
+    retention = timedelta(days=_setting('JOB_SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+    cursors = decode_token(token) if token is not None else {}
+    # Tombstones older than the retention window are gone; start over
+    reset = any(moment < started - retention for moment, _ in cursors.values())
+    if reset:
+        cursors = {}
+
+    next_cursors = {}
+    result = {}
+    for name, (queryset, serializer_class) in visible_collections(user).items():
+        rows, next_cursors[name] = _page(queryset, 'updated_at', cursors.get(name), started, limit)
+        result[name] = serializer_class(rows, many=True).data
+
+    deleted = {name: [] for name in COLLECTIONS}
+    next_cursors[DELETED] = (started, None)
+    if cursors:
+        kinds = {kind: name for name, kind in COLLECTIONS.items()}
+        tombstones, next_cursors[DELETED] = _page(
+            SyncTombstone.objects.filter(user=user).only('kind', 'object_id', 'deleted_at'),
+            'deleted_at', cursors.get(DELETED), started, limit,
+        )
+        for tombstone in tombstones:
+            deleted[kinds[tombstone.kind]].append(tombstone.object_id)
+
+    result.update({
+        'deleted': deleted,
+        'token': encode_token(next_cursors),
+        'has_more': any(last_id is not None for _, last_id in next_cursors.values()),
+        'reset': reset,
+    })
+    return result
@@ -1,3 +1,369 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import multiprocessing
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import CustomerProfile, User, WorkerProfile
+
+from . import counters, events, exports, geo, ids, ledger, payments, retention, settlement, workflow
+from .models import ArchivedAssignment, ArchivedJob, Assignment, Job, JobResponse, LedgerEntry, OutboxTask, Payment, Transaction
+
+
+class WorkflowTransitionTests(TestCase):
+    """
+    workflow.transition() keeps to a fixed query budget per path. The
+    budgets are for the first change of the day into the target status,
+    when its DailyStats row still has to be created.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email='customer@example.com', username='customer', password='pass', user_type='customer'
+        )
+        cls.worker = User.objects.create_user(
+            email='worker@example.com', username='worker', password='pass', user_type='worker'
+        )
+        CustomerProfile.objects.create(user=cls.customer)
+        WorkerProfile.objects.create(user=cls.worker)
+
+    def create_job(self, assigned=True):
+        job = Job.objects.create(
+            customer=self.customer, title='Fix the sink', category='plumbing',
+            description='Leaking sink', location='Baner, Pune', fixed_amount=Decimal('500.00'),
+        )
+        if assigned:
+            response = JobResponse.objects.create(job=job, worker=self.worker, response_type='accept')
+            Assignment.objects.create(
+                job=job, worker=self.worker, job_response=response, agreed_amount=Decimal('500.00')
+            )
+            job.status = 'accepted'
+            job.save()
+        return workflow.workflow_queryset().get(pk=job.pk)
+
+    def test_worker_starts_job(self):
+        job = self.create_job()
+        with self.assertNumQueries(12):
+            workflow.transition(job, self.worker, 'in_progress')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'in_progress')
+        self.assertEqual(job.assignment.status, 'started')
+        self.assertIsNotNone(job.assignment.started_at)
+
+    def test_customer_completes_job_and_queues_payment(self):
+        job = self.create_job()
+        with self.assertNumQueries(14):
+            workflow.transition(job, self.customer, 'completed')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.assignment.status, 'completed')
+        task = OutboxTask.objects.get()
+        self.assertEqual(task.task, 'record_payment')
+        self.assertEqual(task.payload, {'assignment_id': job.assignment.pk})
+        self.assertEqual(WorkerProfile.objects.get(user=self.worker).total_jobs_completed, 1)
+
+    def test_customer_cancels_open_job(self):
+        job = self.create_job(assigned=False)
+        with self.assertNumQueries(10):
+            workflow.transition(job, self.customer, 'cancelled')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'cancelled')
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_disallowed_transition_is_rejected(self):
+        job = self.create_job()
+        with self.assertNumQueries(0), self.assertRaises(workflow.TransitionError) as raised:
+            workflow.transition(job, self.worker, 'cancelled')
+
+        self.assertEqual(raised.exception.status_code, 400)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'accepted')
+        self.assertEqual(job.assignment.status, 'assigned')
+
+
+class RadiusSearchTests(TestCase):
+    """geo.filter_within_radius() finds every job inside the circle and nothing outside it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email='geo@example.com', username='geo', password='pass', user_type='customer'
+        )
+
+    def create_job(self, title, latitude=None, longitude=None):
+        return Job.objects.create(
+            customer=self.customer, title=title, category='cleaning', description='Deep clean',
+            location='Somewhere', fixed_amount=Decimal('100.00'),
+            latitude=None if latitude is None else Decimal(str(latitude)),
+            longitude=None if longitude is None else Decimal(str(longitude)),
+        )
+
+    def search(self, latitude, longitude, radius_km):
+        jobs = geo.filter_within_radius(Job.objects.all(), latitude, longitude, radius_km)
+        return [job.title for job in jobs.order_by('distance_km')]
+
+    def test_nearest_first_within_radius(self):
+        self.create_job('far', 18.70, 73.85)     # ~20 km north
+        self.create_job('near', 18.54, 73.85)    # ~2 km north
+        self.create_job('here', 18.52, 73.85)
+        self.create_job('nowhere')
+
+        self.assertEqual(self.search(18.52, 73.85, 10), ['here', 'near'])
+        self.assertEqual(self.search(18.52, 73.85, 25), ['here', 'near', 'far'])
+
+    def test_circle_across_the_antimeridian(self):
+        self.create_job('east', 0.0, 179.99)
+        self.create_job('west', 0.0, -179.99)    # ~2.2 km away across 180 degrees
+        self.create_job('outside', 0.0, 179.0)   # ~110 km away
+
+        self.assertEqual(self.search(0.0, 179.995, 5), ['east', 'west'])
+        self.assertEqual(self.search(0.0, -179.995, 5), ['west', 'east'])
+
+    def test_circle_over_a_pole(self):
+        self.create_job('this side', 89.95, 0.0)
+        self.create_job('far side', 89.95, 180.0)   # ~11 km away over the pole
+        self.create_job('outside', 89.0, 90.0)
+
+        self.assertEqual(sorted(self.search(89.95, 0.0, 15)), ['far side', 'this side'])
+
+    def test_bounding_boxes_split_at_the_antimeridian(self):
+        (_, east_min, _, east_max), (_, west_min, _, west_max) = geo.bounding_boxes(0.0, 179.99, 5)
+        self.assertLess(east_min, 179.99)
+        self.assertEqual((east_max, west_min), (180.0, -180.0))
+        self.assertLess(west_max, -179.9)
+
+    def test_bounding_box_over_a_pole_spans_every_longitude(self):
+        [(_, min_lng, max_lat, max_lng)] = geo.bounding_boxes(89.99, 10.0, 5)
+        self.assertEqual((min_lng, max_lat, max_lng), (-180.0, 90.0, 180.0))
+
+
+class LedgerBalanceTests(TestCase):
+    """Every posting balances, so the whole ledger always sums to zero"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email='payer@example.com', username='payer', password='pass', user_type='customer'
+        )
+        cls.worker = User.objects.create_user(
+            email='payee@example.com', username='payee', password='pass', user_type='worker'
+        )
+        CustomerProfile.objects.create(user=cls.customer)
+        WorkerProfile.objects.create(user=cls.worker)
+
+    def setUp(self):
+        job = Job.objects.create(
+            customer=self.customer, title='Paint the fence', category='painting',
+            description='Two coats', location='Kothrud, Pune', fixed_amount=Decimal('1000.00'),
+        )
+        response = JobResponse.objects.create(job=job, worker=self.worker, response_type='accept')
+        self.assignment = Assignment.objects.create(
+            job=job, worker=self.worker, job_response=response, agreed_amount=Decimal('1000.00'),
+            status='completed',
+        )
+
+    def assertBalanced(self):
+        self.assertEqual(LedgerEntry.objects.aggregate(total=Sum('amount'))['total'] or 0, 0)
+        unbalanced = (
+            LedgerEntry.objects.order_by().values('posting_id')
+            .annotate(total=Sum('amount')).exclude(total=0)
+        )
+        self.assertFalse(unbalanced.exists())
+
+    def balances(self):
+        return ledger.balances([
+            (ledger.CUSTOMER, self.customer.pk),
+            (ledger.WORKER_PENDING, self.worker.pk),
+            (ledger.WORKER_PAID, self.worker.pk),
+            (ledger.PLATFORM_FEE, None),
+        ])
+
+    def test_payment_refund_and_settlement_balance(self):
+        payments.record_payment(self.assignment)
+        self.assertBalanced()
+        self.assertEqual(self.balances(), {
+            (ledger.CUSTOMER, self.customer.pk): Decimal('-1000.00'),
+            (ledger.WORKER_PENDING, self.worker.pk): Decimal('900.00'),
+            (ledger.WORKER_PAID, self.worker.pk): Decimal('0.00'),
+            (ledger.PLATFORM_FEE, None): Decimal('100.00'),
+        })
+
+        Transaction.objects.create(
+            assignment=self.assignment, worker=self.worker, customer=self.customer,
+            transaction_type='refund', amount=Decimal('200.00'), net_amount=Decimal('200.00'),
+        )
+        self.assertBalanced()
+
+        self.assertEqual(settlement.settle_pending(), (1, 0, 2))
+        self.assertBalanced()
+        self.assertEqual(self.balances(), {
+            (ledger.CUSTOMER, self.customer.pk): Decimal('-800.00'),
+            (ledger.WORKER_PENDING, self.worker.pk): Decimal('0.00'),
+            (ledger.WORKER_PAID, self.worker.pk): Decimal('700.00'),
+            (ledger.PLATFORM_FEE, None): Decimal('100.00'),
+        })
+
+    def test_settlement_is_idempotent(self):
+        payments.record_payment(self.assignment)
+        self.assertEqual(settlement.settle_pending(), (1, 0, 1))
+        entries = LedgerEntry.objects.count()
+
+        self.assertEqual(settlement.settle_pending(), (0, 0, 0))
+        self.assertEqual(LedgerEntry.objects.count(), entries)
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertBalanced()
+
+    def test_unbalanced_posting_is_rejected(self):
+        with self.assertRaises(ledger.UnbalancedPosting):
+            ledger.post({(ledger.CUSTOMER, self.customer.pk): Decimal('-1.00')})
+        self.assertFalse(LedgerEntry.objects.exists())
+
+
+class EventStreamAuthTests(TestCase):
+    """Browsers open the event stream with a short-lived ticket, never an access token"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='listener@example.com', username='listener', password='pass', user_type='worker'
+        )
+
+    def stream_request(self, **params):
+        return RequestFactory().get('/api/events/stream/', params)
+
+    def test_ticket_from_authenticated_post_opens_the_stream(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        ticket = client.post('/api/events/ticket/').json()['ticket']
+
+        self.assertEqual(events.authenticate(self.stream_request(ticket=ticket)), self.user)
+
+    def test_ticket_requires_authentication(self):
+        self.assertEqual(APIClient().post('/api/events/ticket/').status_code, 401)
+
+    def test_access_token_in_the_url_is_rejected(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertIsNone(events.authenticate(self.stream_request(token=token)))
+        self.assertIsNone(events.authenticate(self.stream_request(ticket=token)))
+
+    @override_settings(JOB_EVENTS_TICKET_SECONDS=-1)
+    def test_expired_ticket_is_rejected(self):
+        ticket = events.issue_ticket(self.user)
+        self.assertIsNone(events.authenticate(self.stream_request(ticket=ticket)))
+
+
+@override_settings(JOB_ARCHIVE_AFTER_DAYS=90)
+class JobArchiveTests(TestCase):
+    """archive_jobs() moves old terminal jobs out of Job, assigned or not"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email='archiver@example.com', username='archiver', password='pass', user_type='customer'
+        )
+        cls.worker = User.objects.create_user(
+            email='archived@example.com', username='archived', password='pass', user_type='worker'
+        )
+        CustomerProfile.objects.create(user=cls.customer)
+        WorkerProfile.objects.create(user=cls.worker)
+
+    def create_completed_job(self, title, age_days):
+        job = Job.objects.create(
+            customer=self.customer, title=title, category='carpentry',
+            description='Fix the door', location='Aundh, Pune', fixed_amount=Decimal('400.00'),
+        )
+        response = JobResponse.objects.create(job=job, worker=self.worker, response_type='accept')
+        assignment = Assignment.objects.create(
+            job=job, worker=self.worker, job_response=response, agreed_amount=Decimal('400.00'),
+            status='completed',
+        )
+        payments.record_payment(assignment)
+        Job.objects.filter(pk=job.pk).update(
+            status='completed', updated_at=timezone.now() - timedelta(days=age_days)
+        )
+        return job, assignment
+
+    def test_completed_assigned_job_leaves_the_live_table(self):
+        job, assignment = self.create_completed_job('Old door', age_days=120)
+        recent, _ = self.create_completed_job('New door', age_days=10)
+
+        self.assertEqual(retention.archive_jobs(), 1)
+
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertFalse(Assignment.objects.filter(pk=assignment.pk).exists())
+        archived = ArchivedAssignment.objects.get(pk=assignment.pk)
+        self.assertEqual((archived.job_id, archived.status), (job.pk, 'completed'))
+        self.assertEqual(ArchivedJob.objects.get(pk=job.pk).title, 'Old door')
+
+        # The payment stays live and still resolves its job through the archive
+        payment = Transaction.objects.filter(assignment_id=assignment.pk)
+        self.assertEqual(list(payment.values_list(Transaction.job_field('title'), flat=True)), ['Old door'])
+        self.assertEqual(Transaction.objects.count(), 2)
+
+        counters.rebuild(worker_ids=[self.worker.pk])
+        self.assertEqual(WorkerProfile.objects.get(user=self.worker).total_jobs_completed, 2)
+
+
+def _make_ids(count):
+    return [ids.new_id() for _ in range(count)]
+
+
+class IdTests(TestCase):
+    """ids.new_id() never repeats, also across forked worker processes"""
+
+    def test_ids_are_unique_and_ordered(self):
+        made = _make_ids(10000)
+        self.assertEqual(len(set(made)), len(made))
+        self.assertEqual(made, sorted(made))
+
+    def test_forked_processes_do_not_collide(self):
+        ids.new_id()  # state the children inherit, as gunicorn workers do
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            made = [generated for batch in pool.map(_make_ids, [20000] * 8) for generated in batch]
+        self.assertEqual(len(set(made)), len(made))
+
+
+class ExportTests(TestCase):
+    """CSV exports keep user-entered text from being run as a spreadsheet formula"""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = User.objects.create_user(
+            email='exporter@example.com', username='exporter', password='pass', user_type='customer'
+        )
+        worker = User.objects.create_user(
+            email='exported@example.com', username='exported', password='pass', user_type='worker'
+        )
+        job = Job.objects.create(
+            customer=customer, title='=HYPERLINK("http://example.com","Paid")', category='cleaning',
+            description='Windows', location='Wakad, Pune', fixed_amount=Decimal('300.00'),
+        )
+        response = JobResponse.objects.create(job=job, worker=worker, response_type='accept')
+        assignment = Assignment.objects.create(
+            job=job, worker=worker, job_response=response, agreed_amount=Decimal('300.00'),
+        )
+        payments.record_payment(assignment)
+
+    def export(self, file_format):
+        queryset = exports.export_queryset('transactions')
+        return ''.join(exports.stream_export('transactions', queryset, file_format))
+
+    def test_csv_quotes_formula_cells(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual(rows[0]['job_title'], '\'=HYPERLINK("http://example.com","Paid")')
+        self.assertEqual(rows[0]['amount'], '300.00')
+
+    def test_jsonl_keeps_values_as_they_are(self):
+        row = json.loads(self.export('jsonl'))
+        self.assertEqual(row['job_title'], '=HYPERLINK("http://example.com","Paid")')
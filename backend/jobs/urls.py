@@ -6,6 +6,8 @@ app_name = 'jobs'
 urlpatterns = [
     # Job endpoints
     path('jobs/', views.JobListCreateView.as_view(), name='job-list-create'),
+    path('jobs/bulk/', views.bulk_create_jobs, name='job-bulk-create'),
+    path('jobs/archived/', views.ArchivedJobListView.as_view(), name='archived-job-list'),
     path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
     path('jobs/<int:job_id>/status/', views.update_job_status, name='job-status-update'),
     
@@ -14,6 +16,7 @@ urlpatterns = [
     path('responses/<int:pk>/', views.JobResponseDetailView.as_view(), name='job-response-detail'),
     path('responses/<int:response_id>/accept/', views.accept_job_response, name='accept-job-response'),
     path('worker/responses/', views.WorkerJobResponseListView.as_view(), name='worker-job-responses'),
+    path('worker/recommended-jobs/', views.recommended_jobs, name='worker-recommended-jobs'),
     
     # Assignment endpoints
     path('assignments/', views.AssignmentListView.as_view(), name='assignment-list'),
@@ -23,7 +26,21 @@ urlpatterns = [
     path('transactions/', views.TransactionListView.as_view(), name='transaction-list'),
     path('earnings/', views.EarningListView.as_view(), name='earning-list'),
     path('earnings/summary/', views.earnings_summary, name='earnings-summary'),
+    path('ledger/balances/', views.ledger_balances, name='ledger-balances'),
     path('transactions/create/', views.create_transaction, name='create-transaction'),
+    path('transactions/export/', views.export_transactions, name='transaction-export'),
+    path('earnings/export/', views.export_earnings, name='earning-export'),
+    
+    # Staff analytics
+    path('analytics/daily/', views.analytics_daily, name='analytics-daily'),
+    path('analytics/breakdown/', views.analytics_breakdown, name='analytics-breakdown'),
+    
+    # Delta sync
+    path('sync/', views.sync_changes, name='sync-changes'),
+    
+    # Push channel
+    path('events/ticket/', views.event_stream_ticket, name='event-stream-ticket'),
+    path('events/stream/', views.event_stream, name='event-stream'),
     
     # Rating endpoints
     path('ratings/', views.RatingListCreateView.as_view(), name='rating-list-create'),
@@ -1,18 +1,37 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Avg, Count
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Sum, Count, Max, Exists, OuterRef, Prefetch
+from django.http import Http404
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from accounts.models import WorkerProfile
 from datetime import datetime, timedelta
-from decimal import Decimal
-from .models import Job, JobResponse, Assignment, Transaction, Payment, Earning, Rating, RatingHelpful
+from . import analytics, events, exports, feed_cache, ledger, ratings, responded
+from .assignments import AcceptError, accept_response
+from .conditional import ConditionalGetMixin, conditional_get
+from .earnings import earnings_summary_for
+from .geo import filter_within_radius, haversine_expression
+from .payments import record_payment
+from .recommendations import recommend_jobs
+from .search import search_jobs
+from .sync import collect_changes
+from .workflow import JOB_STATUS_FOR_ASSIGNMENT, TransitionError, transition, workflow_queryset
+from .models import (
+    Job, JobResponse, Assignment, Transaction, Payment, Earning, Rating, RatingHelpful,
+    ArchivedJob, ArchivedJobResponse,
+)
 from .serializers import (
-    JobSerializer, JobListSerializer, JobDetailSerializer,
-    JobResponseSerializer, AssignmentSerializer, WorkerJobListSerializer,
+    JobSerializer, JobListSerializer, JobDetailSerializer, CustomerJobListSerializer,
+    JobResponseSerializer, AssignmentSerializer, WorkerJobListSerializer, RecommendedJobSerializer,
+    ArchivedJobSerializer,
     TransactionSerializer, PaymentSerializer, EarningSerializer, EarningsSummarySerializer,
     RatingSerializer, RatingListSerializer, RatingHelpfulSerializer, UserRatingSummarySerializer
 )
@@ -32,27 +51,38 @@ class JobListCreateView(generics.ListCreateAPIView):
         if self.request.method == 'GET':
             if self.request.user.user_type == 'worker':
                 return WorkerJobListSerializer
-            # Use JobDetailSerializer for customers to include responses
-            return JobDetailSerializer
+            # Responses and assignment are included on ?expand=
+            return CustomerJobListSerializer
         return JobSerializer
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Job.objects.select_related('customer').prefetch_related('responses')
+        queryset = Job.objects.select_related('customer')
         
         if user.user_type == 'customer':
-            # Customers see only their own jobs
-            queryset = queryset.filter(customer=user)
+            # Customers see only their own jobs; load only what is serialized
+            params = self.request.query_params
+            selected = set(CustomerJobListSerializer.selected_fields(
+                params.get('fields'), params.get('expand')
+            ))
+            queryset = Job.objects.filter(customer=user)
+            if selected & {'customer_name', 'customer_email', 'assignment'}:
+                queryset = queryset.select_related('customer')
+            if 'assignment' in selected:
+                queryset = queryset.select_related('assignment__worker')
+            if 'responses' in selected:
+                queryset = queryset.prefetch_related('responses__worker')
         elif user.user_type == 'worker':
             # Workers see jobs that are open (no assignment yet)
             # This means jobs remain visible until customer accepts a worker
             queryset = queryset.filter(status='open')
             
-            # Exclude jobs where this worker has already responded
-            responded_job_ids = JobResponse.objects.filter(
-                worker=user
-            ).values_list('job_id', flat=True)
-            queryset = queryset.exclude(id__in=responded_job_ids)
+            # Exclude jobs where this worker has already responded.
+            # NOT EXISTS probes the (worker, job) index once per candidate
+            # row, so the cost does not grow with the worker's history.
+            queryset = queryset.filter(
+                ~Exists(JobResponse.objects.filter(worker=user, job=OuterRef('pk')))
+            )
             
             # Optional filtering by category, location, etc.
             category = self.request.query_params.get('category')
@@ -64,24 +94,181 @@ class JobListCreateView(generics.ListCreateAPIView):
                 queryset = queryset.filter(
                     Q(location__icontains=location)
                 )
+            
+            # Full-text search: ?q=
+            query = self.request.query_params.get('q', '').strip()
+            if query:
+                queryset = search_jobs(queryset, query)
+            
+            # Radius search: ?lat=&lng=&radius_km=
+            origin = self.get_search_origin()
+            if origin:
+                lat, lng, radius_km = origin
+                if radius_km is not None:
+                    queryset = filter_within_radius(queryset, lat, lng, radius_km)
+                    return queryset.order_by('distance_km', '-created_at')
+                queryset = queryset.annotate(distance_km=haversine_expression(lat, lng))
+            
+            if query:
+                return queryset.order_by('-search_rank', '-created_at')
         
         return queryset.order_by('-created_at')
     
+    def list(self, request, *args, **kwargs):
+        feed = self.get_cached_feed()
+        if feed is None:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(feed)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(feed)
+    
+    def get_cached_feed(self):
+        """Serve plain radius searches from the shared geocell feed cache"""
+        if self.request.user.user_type != 'worker':
+            return None
+        params = self.request.query_params
+        if params.get('q', '').strip() or params.get('location'):
+            return None
+        origin = self.get_search_origin()
+        if not origin or origin[2] is None:
+            return None
+        lat, lng, radius_km = origin
+        return feed_cache.get_radius_feed(
+            self.request.user, lat, lng, radius_km, category=params.get('category')
+        )
+    
+    def get_search_origin(self):
+        """Parse lat/lng/radius_km query params; None when no origin given"""
+        params = self.request.query_params
+        lat = params.get('lat')
+        lng = params.get('lng')
+        radius_km = params.get('radius_km')
+        
+        if lat is None and lng is None:
+            if radius_km is not None:
+                raise ValidationError({'radius_km': 'lat and lng are required for a radius search.'})
+            return None
+        
+        try:
+            lat = float(lat)
+            lng = float(lng)
+        except (TypeError, ValueError):
+            raise ValidationError({'lat': 'lat and lng must both be valid numbers.'})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValidationError({'lat': 'Coordinates are out of range.'})
+        
+        if radius_km is not None:
+            try:
+                radius_km = float(radius_km)
+            except ValueError:
+                raise ValidationError({'radius_km': 'radius_km must be a number.'})
+            max_radius = float(getattr(settings, 'JOB_SEARCH_MAX_RADIUS_KM', 50))
+            if not 0 < radius_km <= max_radius:
+                raise ValidationError({'radius_km': f'radius_km must be between 0 and {max_radius:g}.'})
+        
+        return lat, lng, radius_km
+    
     def perform_create(self, serializer):
         # Only customers can create jobs
         if self.request.user.user_type != 'customer':
             raise PermissionDenied("Only customers can create jobs.")
         
-        serializer.save(customer=self.request.user)
+        job = serializer.save(customer=self.request.user)
+        events.publish(
+            'job_posted',
+            {'job_id': job.id, 'title': job.title, 'category': job.category},
+            topic=events.category_topic(job.category)
+        )
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_create_jobs(request):
+    """
+    Create many jobs in one request from a list (or {"jobs": [...]}).
+    All or nothing: if any item is invalid nothing is created and
+    ``errors`` holds one entry per item, empty for the valid ones.
+    """
+    if request.user.user_type != 'customer':
+        return Response(
+            {'error': 'Only customers can create jobs.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    items = request.data.get('jobs') if isinstance(request.data, dict) else request.data
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'Expected a non-empty list of jobs.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    max_items = getattr(settings, 'JOB_BULK_MAX_ITEMS', 100)
+    if len(items) > max_items:
+        return Response(
+            {'error': f'At most {max_items} jobs can be posted at once.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = JobSerializer(data=items, many=True, context={'request': request})
+    if not serializer.is_valid():
+        return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    jobs = serializer.save()
+    
+    events.publish_many([
+        (
+            'job_posted',
+            {'job_id': job.id, 'title': job.title, 'category': job.category},
+            (),
+            events.category_topic(job.category),
+        )
+        for job in jobs
+    ])
+    return Response(JobSerializer(jobs, many=True).data, status=status.HTTP_201_CREATED)
+
+
+def archived_jobs_for(user):
+    """Archived jobs visible to ``user``; workers only see their own responses"""
+    queryset = ArchivedJob.objects.select_related('customer')
+    if user.user_type == 'customer':
+        return queryset.filter(customer=user).prefetch_related('responses__worker')
+    elif user.user_type == 'worker':
+        return queryset.filter(responses__worker=user).prefetch_related(
+            Prefetch(
+                'responses',
+                queryset=ArchivedJobResponse.objects.filter(worker=user).select_related('worker')
+            )
+        )
+    return queryset.none()
 
 
-class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ArchivedJobListView(generics.ListAPIView):
+    """
+    Job history that has been moved to the archive (see jobs/retention.py).
+    """
+    serializer_class = ArchivedJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return archived_jobs_for(self.request.user).order_by('-created_at')
+
+
+class JobDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a job instance.
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = JobDetailSerializer
     
+    def get_validators(self, request, *args, **kwargs):
+        # The version covers the job, its responses and its assignment
+        row = self.get_queryset().prefetch_related(None).filter(
+            pk=kwargs['pk']
+        ).values_list('id', 'version', 'updated_at').first()
+        if row is None:
+            return None, None
+        job_id, version, updated_at = row
+        return f'job-{job_id}-v{version}', updated_at
+    
     def get_queryset(self):
         user = self.request.user
         queryset = Job.objects.select_related('customer').prefetch_related(
@@ -97,6 +284,14 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         return queryset.none()
     
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Read through to the archive for jobs moved out of the live table
+            archived = get_object_or_404(archived_jobs_for(request.user), pk=kwargs['pk'])
+            return Response(ArchivedJobSerializer(archived).data)
+    
     def perform_update(self, serializer):
         job = self.get_object()
         
@@ -169,7 +364,13 @@ class JobResponseListCreateView(generics.ListCreateAPIView):
             raise PermissionDenied("You have already responded to this job.")
         
         print(f"DEBUG: About to save job response")
-        serializer.save(job=job, worker=user)
+        job_response = serializer.save(job=job, worker=user)
+        responded.invalidate(user.id)
+        events.publish(
+            'response_created',
+            {'job_id': job.id, 'response_id': job_response.id, 'worker_name': user.username},
+            recipients=[job.customer_id]
+        )
         print(f"DEBUG: Job response saved successfully")
 
 
@@ -225,6 +426,11 @@ class JobResponseDetailView(generics.RetrieveUpdateDestroyAPIView):
             )
         
         serializer.save()
+    
+    def perform_destroy(self, instance):
+        worker_id = instance.worker_id
+        instance.delete()
+        responded.invalidate(worker_id)
 
 
 @api_view(['POST'])
@@ -234,67 +440,13 @@ def accept_job_response(request, response_id):
     Accept a job response and create assignment.
     Only job owner (customer) can accept responses.
     """
-    response_obj = get_object_or_404(JobResponse, id=response_id)
-    user = request.user
-    
-    # Check permissions
-    if user.user_type != 'customer' or response_obj.job.customer != user:
-        return Response(
-            {"error": "Only job owner can accept responses."},
-            status=status.HTTP_403_FORBIDDEN
-        )
-    
-    # Check if job is still open
-    if response_obj.job.status != 'open':
-        return Response(
-            {"error": "Cannot accept response for a closed job."},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Check if job already has an assignment
-    if hasattr(response_obj.job, 'assignment'):
-        return Response(
-            {"error": "Job is already assigned."},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Create assignment
-    # Determine agreed amount based on response type and job budget
-    if response_obj.response_type == 'quote' and response_obj.quote_amount:
-        agreed_amount = response_obj.quote_amount
-    elif response_obj.job.fixed_amount:
-        agreed_amount = response_obj.job.fixed_amount
-    elif response_obj.job.budget_max:
-        # For budget range jobs, use the maximum budget as agreed amount
-        agreed_amount = response_obj.job.budget_max
-    elif response_obj.job.budget_min:
-        # Fallback to minimum budget if max is not set
-        agreed_amount = response_obj.job.budget_min
-    else:
-        return Response(
-            {"error": "Cannot determine agreed amount. Job must have a fixed amount or budget range."},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    assignment = Assignment.objects.create(
-        job=response_obj.job,
-        worker=response_obj.worker,
-        job_response=response_obj,
-        agreed_amount=agreed_amount,
-        status='assigned'
+    response_obj = get_object_or_404(
+        JobResponse.objects.select_related('job__customer', 'worker'), id=response_id
     )
-    
-    # Update job and response status
-    response_obj.job.status = 'accepted'
-    response_obj.job.save()
-    
-    response_obj.status = 'accepted'
-    response_obj.save()
-    
-    # Reject other responses
-    JobResponse.objects.filter(
-        job=response_obj.job
-    ).exclude(id=response_obj.id).update(status='rejected')
+    try:
+        assignment = accept_response(response_obj, request.user)
+    except AcceptError as exc:
+        return Response({"error": exc.message}, status=exc.status_code)
     
     serializer = AssignmentSerializer(assignment)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -306,8 +458,7 @@ def update_job_status(request, job_id):
     """
     Update job status (for workflow management).
     """
-    job = get_object_or_404(Job, id=job_id)
-    user = request.user
+    job = get_object_or_404(workflow_queryset().prefetch_related('responses__worker'), id=job_id)
     new_status = request.data.get('status')
     
     if not new_status:
@@ -316,167 +467,132 @@ def update_job_status(request, job_id):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Check permissions and valid status transitions
-    if user.user_type == 'customer' and job.customer == user:
-        # Customers can cancel their jobs or mark as completed
-        if new_status == 'cancelled':
-            # Customers can cancel jobs in any state except completed
-            if job.status == 'completed':
-                return Response(
-                    {"error": "Cannot cancel a completed job."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            job.status = new_status
-            job.save()
-            
-            # Update assignment if exists
-            if hasattr(job, 'assignment'):
-                assignment = job.assignment
-                assignment.status = 'cancelled'
-                assignment.cancelled_at = timezone.now()
-                assignment.save()
-                
-        elif new_status == 'in_progress':
-            # Customers can start jobs if they have an assignment
-            if not hasattr(job, 'assignment'):
-                return Response(
-                    {"error": "Cannot start a job without an assignment."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            job.status = new_status
-            job.save()
-            
-            assignment = job.assignment
-            assignment.status = 'started'
-            assignment.started_at = timezone.now()
-            assignment.save()
-            
-        elif new_status == 'completed':
-            # Customers can mark jobs as completed if they have an assignment
-            if not hasattr(job, 'assignment'):
-                return Response(
-                    {"error": "Cannot complete a job without an assignment."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            job.status = new_status
-            job.save()
-            
-            assignment = job.assignment
-            assignment.status = 'completed'
-            assignment.completed_at = timezone.now()
-            # If not started yet, mark started time as well
-            if not assignment.started_at:
-                assignment.started_at = timezone.now()
-            assignment.save()
-
-            # Ensure a transaction/earning exists for this completed assignment
-            from decimal import Decimal
-            from django.conf import settings
-            if not Transaction.objects.filter(assignment=assignment).exists():
-                platform_fee_rate = Decimal(getattr(settings, 'PLATFORM_FEE_RATE', '0.10'))
-                gross_amount = assignment.agreed_amount
-                platform_fee = gross_amount * platform_fee_rate
-                net_amount = gross_amount - platform_fee
-
-                transaction = Transaction.objects.create(
-                    assignment=assignment,
-                    worker=assignment.worker,
-                    customer=assignment.job.customer,
-                    transaction_type='payment',
-                    amount=gross_amount,
-                    platform_fee=platform_fee,
-                    payment_method='online',
-                    status='pending',
-                    description=f'Payment for job: {assignment.job.title}'
-                )
+    try:
+        transition(job, request.user, new_status)
+    except TransitionError as exc:
+        return Response({"error": exc.message}, status=exc.status_code)
+    
+    serializer = JobDetailSerializer(job)
+    return Response(serializer.data)
 
-                Earning.objects.create(
-                    worker=assignment.worker,
-                    transaction=transaction,
-                    gross_amount=gross_amount,
-                    platform_fee=platform_fee,
-                    net_amount=net_amount,
-                    final_amount=net_amount,
-                    job_category=assignment.job.category,
-                    job_duration_hours=assignment.duration_hours or 0
-                )
-        else:
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def recommended_jobs(request):
+    """
+    Rank open jobs for the authenticated worker by skill match, distance,
+    urgency, budget fit and recency.
+    """
+    user = request.user
+    
+    if user.user_type != 'worker':
+        return Response(
+            {'error': 'Only workers can access recommendations'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    profile = WorkerProfile.objects.filter(user=user).first()
+    if profile and not profile.is_available:
+        return Response({'results': []})
+    
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), 100)
+    except ValueError:
+        limit = 20
+    
+    origin = None
+    lat = request.query_params.get('lat')
+    lng = request.query_params.get('lng')
+    if lat is not None and lng is not None:
+        try:
+            origin = (float(lat), float(lng))
+        except ValueError:
             return Response(
-                {"error": "Invalid status transition."},
+                {'error': 'lat and lng must be valid numbers'},
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-    elif user.user_type == 'worker' and hasattr(job, 'assignment') and job.assignment.worker == user:
-        # Workers can start or complete their assigned jobs
-        assignment = job.assignment
-        if new_status == 'in_progress' and assignment.status == 'assigned':
-            job.status = 'in_progress'
-            assignment.status = 'started'  # Assignment uses 'started' not 'in_progress'
-            assignment.started_at = timezone.now()
-            job.save()
-            assignment.save()
-        elif new_status == 'completed' and assignment.status in ['started', 'assigned']:
-            job.status = 'completed'
-            assignment.status = 'completed'
-            assignment.completed_at = timezone.now()
-            # If not started yet, mark started time as well
-            if not assignment.started_at:
-                assignment.started_at = timezone.now()
-            job.save()
-            assignment.save()
-            # Ensure a transaction/earning exists when worker marks completed
-            from decimal import Decimal
-            from django.conf import settings
-            if not Transaction.objects.filter(assignment=assignment).exists():
-                platform_fee_rate = Decimal(getattr(settings, 'PLATFORM_FEE_RATE', '0.10'))
-                gross_amount = assignment.agreed_amount
-                platform_fee = gross_amount * platform_fee_rate
-                net_amount = gross_amount - platform_fee
-
-                transaction = Transaction.objects.create(
-                    assignment=assignment,
-                    worker=assignment.worker,
-                    customer=assignment.job.customer,
-                    transaction_type='payment',
-                    amount=gross_amount,
-                    platform_fee=platform_fee,
-                    payment_method='online',
-                    status='pending',
-                    description=f'Payment for job: {assignment.job.title}'
-                )
+    jobs = recommend_jobs(user, profile, origin=origin, limit=max(limit, 1))
+    serializer = RecommendedJobSerializer(jobs, many=True, context={'request': request})
+    return Response({'results': serializer.data})
 
-                Earning.objects.create(
-                    worker=assignment.worker,
-                    transaction=transaction,
-                    gross_amount=gross_amount,
-                    platform_fee=platform_fee,
-                    net_amount=net_amount,
-                    final_amount=net_amount,
-                    job_category=assignment.job.category,
-                    job_duration_hours=assignment.duration_hours or 0
-                )
-        else:
-            return Response(
-                {"error": "Invalid status transition."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-    else:
-        return Response(
-            {"error": "Permission denied."},
-            status=status.HTTP_403_FORBIDDEN
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def event_stream_ticket(request):
+    """
+    Short-lived ticket for opening the event stream from a browser, whose
+    EventSource cannot send the Authorization header.
+    """
+    return Response({
+        'ticket': events.issue_ticket(request.user),
+        'expires_in': getattr(settings, 'JOB_EVENTS_TICKET_SECONDS', 30),
+    })
+
+
+@require_GET
+async def event_stream(request):
+    """
+    Server-Sent Events stream of job, response and assignment updates for
+    the authenticated user. Resumes after the Last-Event-ID header (or
+    ?last_event_id=) when given, otherwise starts with new events only.
+    """
+    user = await sync_to_async(events.authenticate)(request)
+    if user is None:
+        return JsonResponse(
+            {'error': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
         )
     
-    serializer = JobDetailSerializer(job)
-    return Response(serializer.data)
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        after_id = int(last_event_id)
+    except (TypeError, ValueError):
+        after_id = await sync_to_async(events.latest_event_id)()
+    
+    topics = await sync_to_async(events.stream_topics)(user)
+    response = StreamingHttpResponse(
+        events.stream_events(user.id, topics, after_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
-class AssignmentListView(generics.ListAPIView):
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_changes(request):
+    """
+    Delta sync: jobs, responses, assignments, transactions and ratings
+    changed since ?since=<token>, plus deleted ids. Omit the token for a
+    full snapshot; pass the returned token next time.
+    """
+    try:
+        changes = collect_changes(request.user, request.query_params.get('since'))
+    except ValueError:
+        return Response(
+            {'error': 'Invalid sync token.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(changes)
+
+
+class AssignmentListView(ConditionalGetMixin, generics.ListAPIView):
     """
     List assignments for the current user.
     """
     serializer_class = AssignmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_validators(self, request, *args, **kwargs):
+        # Assignment changes bump their job's version; count/last id catch removals
+        stats = self.get_queryset().aggregate(
+            count=Count('id'), last_id=Max('id'), versions=Sum('job__version')
+        )
+        etag = 'assignments-{}-{count}-{last_id}-{versions}'.format(request.user.pk, **stats)
+        return etag, None
+    
     def get_queryset(self):
         user = self.request.user
         queryset = Assignment.objects.select_related('job', 'worker', 'job__customer')
@@ -510,26 +626,37 @@ class AssignmentDetailView(generics.RetrieveUpdateAPIView):
         return queryset.none()
     
     def perform_update(self, serializer):
-        assignment = self.get_object()
+        assignment = serializer.instance
         user = self.request.user
         
         # Only allow specific field updates based on user type
-        if user.user_type == 'customer' and assignment.job.customer == user:
+        if user.user_type == 'customer' and assignment.job.customer_id == user.id:
             # Customers can update notes and cancel
-            allowed_fields = ['notes', 'status', 'cancellation_reason']
-        elif user.user_type == 'worker' and assignment.worker == user:
+            allowed_fields = ['notes', 'cancellation_reason']
+        elif user.user_type == 'worker' and assignment.worker_id == user.id:
             # Workers can update notes and status
-            allowed_fields = ['notes', 'status']
+            allowed_fields = ['notes']
         else:
             raise PermissionDenied("Permission denied.")
         
+        # Status changes go through the job workflow with the job itself
+        new_status = serializer.validated_data.get('status')
+        if new_status and new_status != assignment.status:
+            if new_status not in JOB_STATUS_FOR_ASSIGNMENT:
+                raise ValidationError({'status': "Invalid status transition."})
+            try:
+                transition(assignment.job, user, JOB_STATUS_FOR_ASSIGNMENT[new_status])
+            except TransitionError as exc:
+                if exc.status_code == status.HTTP_403_FORBIDDEN:
+                    raise PermissionDenied(exc.message)
+                raise ValidationError({'status': exc.message})
+        
         # Filter update data to only allowed fields
         update_data = {k: v for k, v in serializer.validated_data.items() if k in allowed_fields}
-        
-        for field, value in update_data.items():
-            setattr(assignment, field, value)
-        
-        assignment.save()
+        if update_data:
+            for field, value in update_data.items():
+                setattr(assignment, field, value)
+            assignment.save(update_fields=[*update_data, 'updated_at'])
 
 
 # Earnings and Transaction Views
@@ -585,98 +712,154 @@ def earnings_summary(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Calculate summary data
-    earnings_qs = Earning.objects.filter(worker=user)
-    
-    # Total earnings
-    total_earnings = earnings_qs.aggregate(
-        total=Sum('final_amount')
-    )['total'] or Decimal('0.00')
-    # Gross total earnings (before fees)
-    gross_total_earnings = earnings_qs.aggregate(
-        total=Sum('gross_amount')
-    )['total'] or Decimal('0.00')
-    
-    # This month earnings
-    current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    this_month_earnings = earnings_qs.filter(
-        earned_at__gte=current_month
-    ).aggregate(
-        total=Sum('final_amount')
-    )['total'] or Decimal('0.00')
-    # This month gross earnings
-    this_month_gross_earnings = earnings_qs.filter(
-        earned_at__gte=current_month
-    ).aggregate(
-        total=Sum('gross_amount')
-    )['total'] or Decimal('0.00')
-    
-    # Pending transactions
-    pending_amount = Transaction.objects.filter(
-        worker=user, 
-        status='pending'
-    ).aggregate(
-        total=Sum('net_amount')
-    )['total'] or Decimal('0.00')
-    
-    # Completed jobs count
-    completed_jobs = Assignment.objects.filter(
-        worker=user, 
-        status='completed'
-    ).count()
-    
-    # Average rating
-    avg_rating = earnings_qs.exclude(
-        customer_rating__isnull=True
-    ).aggregate(
-        avg=Avg('customer_rating')
-    )['avg'] or Decimal('0.00')
-    
-    # Recent transactions (last 10)
-    recent_transactions = Transaction.objects.filter(
-        worker=user
-    ).select_related(
-        'assignment__job', 'customer'
-    ).order_by('-created_at')[:10]
-    
-    # Monthly earnings for the last 12 months
-    monthly_earnings = []
-    for i in range(12):
-        month_start = (timezone.now().replace(day=1) - timedelta(days=32*i)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_total = earnings_qs.filter(
-            earned_at__gte=month_start,
-            earned_at__lte=month_end
-        ).aggregate(
-            total=Sum('final_amount')
-        )['total'] or Decimal('0.00')
-        
-        monthly_earnings.append({
-            'month': month_start.strftime('%Y-%m'),
-            'month_name': month_start.strftime('%B %Y'),
-            'amount': float(month_total)
-        })
-    
-    monthly_earnings.reverse()  # Show oldest to newest
-    
-    # Pass queryset directly; nested serializer will handle representation.
-    summary_data = {
-        'total_earnings': total_earnings,
-        'gross_total_earnings': gross_total_earnings,
-        'this_month_earnings': this_month_earnings,
-        'this_month_gross_earnings': this_month_gross_earnings,
-        'pending_amount': pending_amount,
-        'completed_jobs': completed_jobs,
-        'average_rating': avg_rating,
-        'recent_transactions': recent_transactions,
-        'monthly_earnings': monthly_earnings
-    }
+    summary_data = earnings_summary_for(user)
     
     serializer = EarningsSummarySerializer(summary_data)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def ledger_balances(request):
+    """
+    Ledger balances of the authenticated user's accounts, now or as of
+    ``?at=<ISO 8601 datetime>``.
+    """
+    user = request.user
+    accounts = ledger.USER_ACCOUNTS.get(user.user_type)
+    if not accounts:
+        return Response(
+            {'error': 'Only workers and customers have ledger accounts'}, 
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    at = timezone.now()
+    if request.query_params.get('at'):
+        at = parse_datetime(request.query_params['at'])
+        if at is None:
+            return Response(
+                {'error': 'Invalid "at" timestamp.'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+    
+    found = ledger.balances([(account, user.id) for account in accounts], at=at)
+    return Response({
+        'at': at,
+        'balances': {account: str(found[(account, user.id)]) for account in accounts},
+    })
+
+
+def _export_response(request, kind):
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in exports.FORMATS:
+        return Response(
+            {'error': f'file_format must be one of: {", ".join(exports.FORMATS)}'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        queryset = exports.export_queryset(
+            kind, request.user,
+            start=request.query_params.get('start'),
+            end=request.query_params.get('end'),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    response = StreamingHttpResponse(
+        exports.stream_export(kind, queryset, file_format),
+        content_type=exports.FORMATS[file_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exports.export_filename(kind, file_format)}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_transactions(request):
+    """
+    Stream the authenticated user's transactions as CSV or JSON Lines
+    (``?file_format=csv|jsonl&start=&end=``)
+    """
+    return _export_response(request, 'transactions')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_earnings(request):
+    """
+    Stream the authenticated worker's earnings as CSV or JSON Lines
+    (``?file_format=csv|jsonl&start=&end=``)
+    """
+    return _export_response(request, 'earnings')
+
+
+def _list_param(request, name):
+    return [value for value in request.query_params.get(name, '').split(',') if value]
+
+
+def _analytics_response(request, group_by):
+    if not request.user.is_staff:
+        return Response(
+            {'error': 'Only staff can access analytics'}, 
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    unknown = set(group_by) - set(analytics.DIMENSIONS)
+    if unknown:
+        return Response(
+            {'error': f'Cannot group by: {", ".join(sorted(unknown))}'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    end = timezone.localdate()
+    start = end - timedelta(days=29)
+    try:
+        if request.query_params.get('end'):
+            end = parse_date(request.query_params['end'])
+        if request.query_params.get('start'):
+            start = parse_date(request.query_params['start'])
+    except ValueError:
+        start = end = None
+    if start is None or end is None:
+        return Response(
+            {'error': 'start and end must be dates (YYYY-MM-DD).'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    rows = analytics.query(
+        start, end, group_by,
+        category=_list_param(request, 'category'),
+        city=_list_param(request, 'city'),
+        status=_list_param(request, 'status'),
+    )
+    for row in rows:
+        row['gmv'], row['platform_fees'] = f"{row['gmv']:.2f}", f"{row['platform_fees']:.2f}"
+    return Response({'start': start, 'end': end, 'group_by': group_by, 'results': rows})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def analytics_daily(request):
+    """
+    Staff only: jobs and GMV per day from the DailyStats cube, optionally
+    split further (``?group_by=category,city``) and filtered
+    (``?start=&end=&category=&city=&status=``, comma-separated lists)
+    """
+    return _analytics_response(request, ['day'] + _list_param(request, 'group_by'))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def analytics_breakdown(request):
+    """
+    Staff only: jobs and GMV totals over a date range per category, city
+    and/or status (``?by=category,city``, default category)
+    """
+    return _analytics_response(request, _list_param(request, 'by') or ['category'])
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_transaction(request):
@@ -694,7 +877,7 @@ def create_transaction(request):
         )
     
     try:
-        assignment = Assignment.objects.get(id=assignment_id)
+        assignment = Assignment.objects.select_related('job', 'worker').get(id=assignment_id)
     except Assignment.DoesNotExist:
         return Response(
             {'error': 'Assignment not found'}, 
@@ -715,36 +898,7 @@ def create_transaction(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Create transaction
-    # Read platform fee rate from settings (string), convert to Decimal
-    platform_fee_rate = Decimal(getattr(settings, 'PLATFORM_FEE_RATE', '0.10'))
-    gross_amount = assignment.agreed_amount
-    platform_fee = gross_amount * platform_fee_rate
-    net_amount = gross_amount - platform_fee
-    
-    transaction = Transaction.objects.create(
-        assignment=assignment,
-        worker=assignment.worker,
-        customer=assignment.job.customer,
-        transaction_type='payment',
-        amount=gross_amount,
-        platform_fee=platform_fee,
-        payment_method='online',
-        status='pending',
-        description=f'Payment for job: {assignment.job.title}'
-    )
-    
-    # Create corresponding earning record
-    earning = Earning.objects.create(
-        worker=assignment.worker,
-        transaction=transaction,
-        gross_amount=gross_amount,
-        platform_fee=platform_fee,
-        net_amount=net_amount,
-        final_amount=net_amount,
-        job_category=assignment.job.category,
-        job_duration_hours=assignment.duration_hours or 0
-    )
+    transaction = record_payment(assignment)
     
     return Response(
         TransactionSerializer(transaction).data, 
@@ -853,53 +1007,26 @@ class UserRatingsView(generics.ListAPIView):
         ).order_by('-created_at')
 
 
+def _rating_summary_validators(request, user_id):
+    # Every rating write moves updated_at on the ratee's aggregate rows
+    version, last_modified = ratings.summary_version(user_id)
+    return f'ratings-{user_id}-{version}', last_modified
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@conditional_get(_rating_summary_validators)
 def user_rating_summary(request, user_id):
     """
     Get rating summary for a specific user.
     """
-    try:
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
+    _, summary = ratings.rating_summary(user_id)
+    if summary is None:
         return Response(
             {'error': 'User not found'}, 
             status=status.HTTP_404_NOT_FOUND
         )
-    
-    # Get all ratings for this user as ratee
-    ratings = Rating.objects.filter(ratee=user)
-    
-    if not ratings.exists():
-        return Response({
-            'average_rating': 0,
-            'total_ratings': 0,
-            'rating_distribution': {str(i): 0 for i in range(1, 6)},
-            'recent_ratings': []
-        })
-    
-    # Calculate average rating
-    avg_rating = ratings.aggregate(avg=Avg('rating'))['avg'] or 0
-    
-    # Calculate rating distribution
-    rating_distribution = {}
-    for i in range(1, 6):
-        count = ratings.filter(rating=i).count()
-        rating_distribution[str(i)] = count
-    
-    # Get recent ratings (last 10)
-    recent_ratings = ratings.select_related(
-        'rater', 'assignment__job'
-    ).order_by('-created_at')[:10]
-    
-    return Response({
-        'average_rating': round(avg_rating, 2),
-        'total_ratings': ratings.count(),
-        'rating_distribution': rating_distribution,
-        'recent_ratings': RatingListSerializer(recent_ratings, many=True).data
-    })
+    return Response(summary)
 
 
 @api_view(['GET'])
@@ -909,7 +1036,7 @@ def assignment_ratings(request, assignment_id):
     Get all ratings for a specific assignment.
     """
     try:
-        assignment = Assignment.objects.get(id=assignment_id)
+        assignment = Assignment.objects.select_related('job', 'worker').get(id=assignment_id)
     except Assignment.DoesNotExist:
         return Response(
             {'error': 'Assignment not found'}, 
@@ -940,7 +1067,7 @@ def can_rate_assignment(request, assignment_id):
     Check if the current user can rate a specific assignment.
     """
     try:
-        assignment = Assignment.objects.get(id=assignment_id)
+        assignment = Assignment.objects.select_related('job', 'worker').get(id=assignment_id)
     except Assignment.DoesNotExist:
         return Response(
             {'error': 'Assignment not found'}, 
@@ -0,0 +1,159 @@
+"""
+Job workflow after a response has been accepted.
+
+TRANSITIONS lists every status change a customer or the assigned worker
+may make, as (actor, from job status, to job status); ASSIGNMENT_STATUS
+is what the assignment moves to alongside the job. ``transition()``
+applies one change as a single atomic unit with a fixed query budget
+(pinned in tests.py):
+
+* the job is claimed with a compare-and-set UPDATE on the status it was
+  read with, so two concurrent changes cannot both apply,
+* the assignment, if any, is updated with one UPDATE,
+* completing a job queues the payment records (Transaction + Earning)
+  on the outbox, so they are written by the run_outbox worker,
+* the other party is notified.
+
+Load the job with ``select_related('assignment__worker')`` (see
+``workflow_queryset()``) so deciding who is acting costs no queries.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import counters, events, feed_cache, outbox
+from .models import Assignment, DailyStats, Job
+
+TRANSITIONS = {
+    ('customer', 'open', 'cancelled'),
+    ('customer', 'accepted', 'cancelled'),
+    ('customer', 'in_progress', 'cancelled'),
+    ('customer', 'accepted', 'in_progress'),
+    ('customer', 'accepted', 'completed'),
+    ('customer', 'in_progress', 'completed'),
+    ('worker', 'accepted', 'in_progress'),
+    ('worker', 'accepted', 'completed'),
+    ('worker', 'in_progress', 'completed'),
+}
+
+ASSIGNMENT_STATUS = {
+    'in_progress': 'started',
+    'completed': 'completed',
+    'cancelled': 'cancelled',
+}
+
+# Job status to move to for an assignment status set directly
+JOB_STATUS_FOR_ASSIGNMENT = {value: key for key, value in ASSIGNMENT_STATUS.items()}
+
+# Targets that only make sense once a worker is assigned
+REQUIRES_ASSIGNMENT = {
+    'in_progress': "Cannot start a job without an assignment.",
+    'completed': "Cannot complete a job without an assignment.",
+}
+
+
+class TransitionError(Exception):
+    """The change is not allowed; ``status_code`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def workflow_queryset():
+    return Job.objects.select_related('customer', 'assignment__worker')
+
+
+def assignment_of(job):
+    """The job's assignment or None, without a query when it was select_related"""
+    try:
+        return job.assignment
+    except Assignment.DoesNotExist:
+        return None
+
+
+def actor_for(job, user):
+    """'customer', 'worker' or None for someone with no say over the job"""
+    if user.user_type == 'customer' and job.customer_id == user.id:
+        return 'customer'
+    assignment = assignment_of(job)
+    if user.user_type == 'worker' and assignment is not None and assignment.worker_id == user.id:
+        return 'worker'
+    return None
+
+
+def check_transition(job, user, new_status):
+    """Return the acting role, or raise TransitionError when not allowed"""
+    actor = actor_for(job, user)
+    if actor is None:
+        raise TransitionError("Permission denied.", 403)
+    if actor == 'customer' and new_status == 'cancelled' and job.status == 'completed':
+        raise TransitionError("Cannot cancel a completed job.")
+    if new_status in REQUIRES_ASSIGNMENT and assignment_of(job) is None:
+        raise TransitionError(REQUIRES_ASSIGNMENT[new_status])
+    if (actor, job.status, new_status) not in TRANSITIONS:
+        raise TransitionError("Invalid status transition.")
+    return actor
+
+
+def transition(job, user, new_status):
+    """
+    Move ``job`` (and its assignment) to ``new_status`` on behalf of
+    ``user``. The instances are updated in place; returns the job.
+    """
+    check_transition(job, user, new_status)
+    assignment = assignment_of(job)
+    old_status = job.status
+    now = timezone.now()
+
+    with transaction.atomic():
+        claimed = Job.objects.filter(pk=job.pk, status=old_status).update(
+            status=new_status, version=F('version') + 1, updated_at=now
+        )
+        if not claimed:
+            raise TransitionError("Job status has changed, reload and try again.", 409)
+        if old_status == 'open':
+            # The job left the open feed without going through Job.save()
+            feed_cache.invalidate_job((job.geohash, job.category))
+        DailyStats.apply([job._stats_entry()], [job._stats_entry(new_status)])
+
+        if assignment is not None:
+            changes = _assignment_changes(assignment, ASSIGNMENT_STATUS[new_status], now)
+            Assignment.objects.filter(pk=assignment.pk).update(updated_at=now, **changes)
+            for field, value in changes.items():
+                setattr(assignment, field, value)
+            assignment.updated_at = now
+
+            if new_status == 'completed':
+                counters.add_jobs_completed({assignment.worker_id: 1})
+                outbox.enqueue('record_payment', {'assignment_id': assignment.pk})
+
+        recipients = [job.customer_id]
+        if assignment is not None:
+            recipients.append(assignment.worker_id)
+        events.publish(
+            'job_status_changed',
+            {'job_id': job.pk, 'status': new_status},
+            recipients=[user_id for user_id in recipients if user_id != user.id]
+        )
+
+    job.status = new_status
+    job.updated_at = now
+    job._loaded_feed_entry = job._feed_entry()
+    job._loaded_stats_entry = job._stats_entry()
+    return job
+
+
+def _assignment_changes(assignment, status, now):
+    changes = {'status': status}
+    if status == 'started':
+        changes['started_at'] = now
+    elif status == 'completed':
+        changes['completed_at'] = now
+        # If not started yet, mark started time as well
+        if not assignment.started_at:
+            changes['started_at'] = now
+    elif status == 'cancelled':
+        changes['cancelled_at'] = now
+    return changes
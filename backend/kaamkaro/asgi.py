@@ -2,6 +2,8 @@
 ASGI config for kaamkaro project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it (e.g. ``uvicorn kaamkaro.asgi:application``) when using the
+``/api/events/stream/`` push channel, which holds connections open.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -145,6 +145,87 @@ AUTH_USER_MODEL = 'accounts.User'
 # Example: 0.10 for 10% fee.
 PLATFORM_FEE_RATE = config('PLATFORM_FEE_RATE', default='0.10')
 
+# Largest radius (km) accepted by the worker job feed's radius search
+JOB_SEARCH_MAX_RADIUS_KM = config('JOB_SEARCH_MAX_RADIUS_KM', default=50, cast=float)
+
+# Cache
+# Local memory by default; set REDIS_URL (requires the `redis` package) so
+# all processes share one cache and invalidations reach every worker. The
+# caches below that rely on invalidation are only on by default with Redis:
+# a local-memory cache is invalidated only in the process that took the write.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'kaamkaro',
+        }
+    }
+
+# Cache each worker's responded job ids (see jobs/responded.py)
+JOB_FEED_RESPONDED_CACHE = config('JOB_FEED_RESPONDED_CACHE', default=bool(REDIS_URL), cast=bool)
+
+# Shared geocell cache for radius feeds (see jobs/feed_cache.py)
+JOB_FEED_CACHE_ENABLED = config('JOB_FEED_CACHE_ENABLED', default=bool(REDIS_URL), cast=bool)
+JOB_FEED_CACHE_TIMEOUT = config('JOB_FEED_CACHE_TIMEOUT', default=300, cast=int)
+JOB_FEED_CELL_PRECISIONS = (5, 4, 3)  # geohash lengths of feed cells (~5km, ~40km, ~150km)
+JOB_FEED_CACHE_MAX_CELLS = 9  # cells read per request
+JOB_FEED_CACHE_MAX_JOBS = 500  # open jobs cached per cell before falling back to SQL
+
+# Worker job recommendations (see jobs/recommendations.py)
+JOB_RECOMMENDATION_RADIUS_KM = config('JOB_RECOMMENDATION_RADIUS_KM', default=25, cast=float)
+JOB_RECOMMENDATION_MAX_CANDIDATES = 3000
+
+# Server-Sent Events push channel (see jobs/events.py). Serve it through
+# the ASGI application (e.g. `gunicorn kaamkaro.asgi:application -k
+# uvicorn.workers.UvicornWorker`) so open streams do not pin workers.
+JOB_EVENTS_POLL_SECONDS = 2  # cross-process pickup latency
+JOB_EVENTS_HEARTBEAT_SECONDS = 15
+JOB_EVENTS_STREAM_SECONDS = 300  # clients reconnect with Last-Event-ID
+JOB_EVENTS_RETENTION_DAYS = 7
+JOB_EVENTS_TICKET_SECONDS = 30  # lifetime of a ?ticket= for opening a stream
+
+# Job retention, run from cron: `manage.py expire_jobs` then `manage.py archive_jobs`
+JOB_OPEN_TTL_DAYS = config('JOB_OPEN_TTL_DAYS', default=30, cast=int)  # open jobs expire after this
+JOB_ARCHIVE_AFTER_DAYS = config('JOB_ARCHIVE_AFTER_DAYS', default=90, cast=int)  # terminal jobs move to the archive
+
+# Maximum number of jobs accepted by one POST /api/jobs/bulk/
+JOB_BULK_MAX_ITEMS = 100
+
+# Delta sync (/api/sync/, see jobs/sync.py)
+JOB_SYNC_MAX_ROWS = 500  # per collection, per request
+JOB_SYNC_OVERLAP_SECONDS = 5  # re-read window for writes in flight
+JOB_SYNC_TOMBSTONE_RETENTION_DAYS = 30  # older tokens get a full resync
+
+# Outbox for side effects of writes (see jobs/outbox.py), drained by `manage.py run_outbox`
+JOB_OUTBOX_EAGER = config('JOB_OUTBOX_EAGER', default=False, cast=bool)  # also run tasks in-process on commit
+JOB_OUTBOX_BATCH_SIZE = 100
+JOB_OUTBOX_POLL_SECONDS = 1
+JOB_OUTBOX_LEASE_SECONDS = 300  # a claimed task is retried after this if its worker died
+JOB_OUTBOX_MAX_ATTEMPTS = 8  # then the task is kept as 'failed'
+JOB_OUTBOX_BACKOFF_SECONDS = 5  # doubled after every failed attempt
+JOB_OUTBOX_MAX_BACKOFF_SECONDS = 3600
+
+# Ledger balance snapshots (see jobs/ledger.py), taken by `manage.py snapshot_ledger` from cron
+LEDGER_SNAPSHOT_LAG_SECONDS = 300  # leave recent entries out in case their transaction is still open
+
+# Payout settlement, run nightly with `manage.py settle_payouts` (see jobs/settlement.py)
+PAYOUT_GATEWAY = config('PAYOUT_GATEWAY', default='jobs.settlement.LocalPayoutGateway')
+PAYOUT_BATCH_WORKERS = 1000  # workers (one payout each) per batch
+
+# Cached user rating summaries, invalidated by rating writes (see jobs/ratings.py)
+RATING_SUMMARY_CACHE_TIMEOUT = 300  # seconds; bounds staleness of rater names in recent ratings
+
+# Accounting exports (see jobs/exports.py)
+EXPORT_CHUNK_SIZE = 2000  # rows fetched and written per chunk
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -156,7 +237,7 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'jobs.pagination.KeysetPagination',
     'PAGE_SIZE': 20
 }
 
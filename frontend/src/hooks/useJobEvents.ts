@@ -0,0 +1,77 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { useAuth } from '@/contexts/AuthContext';
+import { jobKeys } from '@/hooks/useJobs';
+import { jobService } from '@/lib/jobs';
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://127.0.0.1:8000/api';
+
+const EVENT_TYPES = [
+  'job_posted',
+  'job_status_changed',
+  'response_created',
+  'response_accepted',
+  'response_rejected',
+] as const;
+
+const RECONNECT_DELAY_MS = 3000;
+
+// Subscribe to the server's job event stream and refresh the affected queries
+// when something changes, instead of polling job lists.
+export const useJobEvents = () => {
+  const { isAuthenticated } = useAuth();
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!isAuthenticated) return;
+
+    let source: EventSource | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let lastEventId = '';
+    let closed = false;
+
+    const handleEvent = (event: MessageEvent) => {
+      lastEventId = event.lastEventId || lastEventId;
+      const data = JSON.parse(event.data);
+      queryClient.invalidateQueries({ queryKey: jobKeys.lists() });
+      if (data.job_id) {
+        queryClient.invalidateQueries({ queryKey: jobKeys.detail(data.job_id) });
+        queryClient.invalidateQueries({ queryKey: jobKeys.responses(data.job_id) });
+      }
+      if (event.type !== 'job_posted') {
+        queryClient.invalidateQueries({ queryKey: jobKeys.assignments() });
+      }
+    };
+
+    const reconnect = () => {
+      source?.close();
+      source = null;
+      if (!closed) reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+    };
+
+    // EventSource cannot send an Authorization header, so the stream is opened
+    // with a short-lived ticket. Tickets expire, so instead of letting the
+    // browser retry the same URL, every reconnect fetches a new ticket and
+    // resumes from the last event seen.
+    const connect = async () => {
+      try {
+        const ticket = await jobService.getEventStreamTicket();
+        if (closed) return;
+        const params = new URLSearchParams({ ticket });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        source = new EventSource(`${API_BASE_URL}/events/stream/?${params}`);
+        EVENT_TYPES.forEach((type) => source!.addEventListener(type, handleEvent));
+        source.onerror = reconnect;
+      } catch {
+        reconnect();
+      }
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      source?.close();
+    };
+  }, [isAuthenticated, queryClient]);
+};
@@ -21,13 +21,15 @@ export const useJobs = (filters?: {
   urgency?: string; 
   status?: string;
   customer?: number;
+  fields?: string;
+  expand?: string;
 }) => {
   const { isAuthenticated } = useAuth();
   
   return useQuery({
     queryKey: jobKeys.list(filters || {}),
     queryFn: () => jobService.getJobs(filters),
-    staleTime: 30 * 1000, // 30 seconds
+    staleTime: 5 * 60 * 1000, // 5 minutes; useJobEvents invalidates on changes
     refetchOnWindowFocus: true,
     enabled: isAuthenticated, // Only run when authenticated
     retry: (failureCount, error: any) => {
@@ -192,7 +194,7 @@ export const useAssignments = (filters?: {
   return useQuery({
     queryKey: jobKeys.assignmentsList(filters || {}),
     queryFn: () => jobService.getAssignments(filters),
-    staleTime: 30 * 1000, // 30 seconds
+    staleTime: 5 * 60 * 1000, // 5 minutes; useJobEvents invalidates on changes
     refetchOnWindowFocus: true,
     enabled: isAuthenticated, // Only run when authenticated
     retry: (failureCount, error: any) => {
@@ -233,8 +235,10 @@ export const useUpdateAssignment = () => {
 export const useCustomerJobs = () => {
   const { user } = useAuth();
   
+  // The dashboard reads job.responses; the list omits them unless expanded
   return useJobs({ 
     customer: user?.id,
+    expand: 'responses',
   });
 };
 
@@ -134,6 +134,8 @@ class JobService {
     urgency?: string; 
     status?: string;
     customer?: number;
+    fields?: string;
+    expand?: string;
   }): Promise<Job[]> {
     const searchParams = new URLSearchParams();
     if (params) {
@@ -390,6 +392,20 @@ class JobService {
     return response.json();
   }
 
+  // Push channel
+  async getEventStreamTicket(): Promise<string> {
+    const response = await this.makeAuthenticatedRequest(`${API_BASE_URL}/events/ticket/`, {
+      method: 'POST',
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to open event stream');
+    }
+
+    const data = await response.json();
+    return data.ticket;
+  }
+
   // Utility methods
   async getNearbyJobs(params?: { 
     city?: string; 
@@ -403,7 +419,7 @@ class JobService {
   }
 
   async getCustomerJobs(customerId: number): Promise<Job[]> {
-    return this.getJobs({ customer: customerId });
+    return this.getJobs({ customer: customerId, expand: 'responses' });
   }
 
   async getWorkerAssignments(workerId: number): Promise<Assignment[]> {
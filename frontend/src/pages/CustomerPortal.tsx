@@ -14,6 +14,7 @@ import { Slider } from "@/components/ui/slider";
 import { useToast } from "@/hooks/use-toast";
 import { useAuth } from "@/contexts/AuthContext";
 import { useCustomerJobs, useCreateJob, useCustomerAssignments, useAcceptJobResponse, useUpdateJobStatus, useUpdateJob, useDeleteJob } from "@/hooks/useJobs";
+import { useJobEvents } from "@/hooks/useJobEvents";
 import { useRatings } from "@/hooks/useRatings";
 import { useWorkerProfileByUserId, useCustomerProfile, useUpdateCustomerProfile } from "@/hooks/useProfile";
 import { CreateJobData, Job } from "@/lib/jobs";
@@ -38,6 +39,7 @@ const CustomerPortal = () => {
   const [activeTab, setActiveTab] = useState("dashboard");
   const [selectedJobId, setSelectedJobId] = useState<number | null>(null);
   const { user } = useAuth();
+  useJobEvents();
   const { toast } = useToast();
 
   // Rating state
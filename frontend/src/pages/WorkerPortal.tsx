@@ -15,6 +15,7 @@ import JobCard from "@/components/JobCard";
 import RatingStars from "@/components/RatingStars";
 import { useAuth } from "@/contexts/AuthContext";
 import { useNearbyJobs, useWorkerAssignments, useCreateJobResponse, useWorkerJobResponses, useUpdateAssignment, useUpdateJobResponse, useDeleteJobResponse } from "@/hooks/useJobs";
+import { useJobEvents } from "@/hooks/useJobEvents";
 import { useWorkerProfile, useUpdateWorkerProfile } from "@/hooks/useProfile";
 import { useEarnings } from "@/hooks/useEarnings";
 import { useRatings } from "@/hooks/useRatings";
@@ -36,6 +37,7 @@ import {
 
 const WorkerPortal = () => {
   const { user } = useAuth();
+  useJobEvents();
   const { toast } = useToast();
   const [activeTab, setActiveTab] = useState("jobs");
   const [isAvailable, setIsAvailable] = useState(true);